@@ -0,0 +1,124 @@
+"""Compare file system event throughput of a watch per resource with a single root-level watch
+(see `FSEventRouter`).
+
+Creates `--resources` local resources, each with a single file, and tracks them in a `LocalFSMap`.
+Each file is then written `--rounds` times and the time until every resource emitted a `STATUS`
+event per write is reported.
+
+Usage:
+    python benchmarks/bench_fs_watchers.py --resources 1000 --rounds 5
+"""
+
+from collections import Counter
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from watchdog.observers import Observer
+import argparse
+import threading
+import time
+
+from hydroshare_on_jupyter.fs_event_handler import (
+    FSEventRouter,
+    fs_event_handler_factory,
+)
+from hydroshare_on_jupyter.fs_events import Events
+from hydroshare_on_jupyter.lib.events.event_broker import EventBroker
+from hydroshare_on_jupyter.lib.filesystem.fs_map import LocalFSMap
+
+
+def create_resources(fs_root: Path, n: int) -> LocalFSMap:
+    for i in range(n):
+        resource_id = f"{i:032x}"
+        contents = fs_root / resource_id / resource_id / "data" / "contents"
+        contents.mkdir(parents=True)
+        (contents / "file").write_text("0")
+    return LocalFSMap.create_map(fs_root)
+
+
+def schedule(mode: str, observer: Observer, local_map: LocalFSMap, factory) -> int:
+    """Schedule watches. Return the number of watches scheduled."""
+    if mode == "root":
+        router = FSEventRouter(local_map.fs_root, local_map.get, factory)
+        observer.schedule(router, str(local_map.fs_root), recursive=True)
+        return 1
+
+    for n, res in enumerate(local_map.values()):
+        try:
+            observer.schedule(factory(res), str(res.contents_path), recursive=True)
+        except OSError as e:
+            print(f"  failed to schedule watch {n + 1}: {e}")
+            return n
+    return len(local_map)
+
+
+def run(mode: str, n_resources: int, rounds: int, timeout: float) -> None:
+    with TemporaryDirectory() as temp:
+        fs_root = Path(temp).resolve()
+        local_map = create_resources(fs_root, n_resources)
+        for res in local_map.values():
+            res.update_resource()
+
+        statuses = Counter()
+        lock = threading.Lock()
+
+        def on_status(resource_id):
+            with lock:
+                statuses[resource_id] += 1
+
+        event_broker = EventBroker(Events)
+        event_broker.subscribe(Events.STATUS, on_status)
+        factory = fs_event_handler_factory(event_broker)
+
+        observer = Observer()
+        observer.start()
+        threads = threading.active_count()
+        start = time.perf_counter()
+        n_watches = schedule(mode, observer, local_map, factory)
+        setup = time.perf_counter() - start
+        threads = threading.active_count() - threads
+
+        try:
+            start = time.perf_counter()
+            for i in range(rounds):
+                for res in local_map.values():
+                    (res.contents_path / "file").write_text(str(i))
+
+            deadline = start + timeout
+            expected = (
+                rounds * n_watches if mode == "resource" else rounds * n_resources
+            )
+            while time.perf_counter() < deadline:
+                with lock:
+                    # a write emits modified and closed events, count one status per write
+                    observed = sum(min(c, rounds) for c in statuses.values())
+                if observed >= expected:
+                    break
+                time.sleep(0.01)
+            elapsed = time.perf_counter() - start
+            total = sum(statuses.values())
+        finally:
+            observer.stop()
+            observer.join()
+
+        print(
+            f"{mode:>8}: {n_watches} watches, {threads} emitter threads, setup {setup:.3f}s, "
+            f"{observed}/{expected} writes observed in {elapsed:.3f}s "
+            f"({total / elapsed:.0f} status events/s)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resources", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--mode", choices=["resource", "root", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["resource", "root"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        run(mode, args.resources, args.rounds, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
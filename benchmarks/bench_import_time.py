@@ -0,0 +1,67 @@
+"""Measure the time loading the server extension adds to Jupyter server start up.
+
+Each measurement runs in a fresh interpreter that has already imported `jupyter_server.serverapp`,
+so only the extension's own cost is reported. `lazy` imports the package and registers its routes,
+as `_load_jupyter_server_extension` does. `eager` also imports the request handlers and parses the
+configuration, which the lazy extension defers until the first request.
+
+Usage:
+    python benchmarks/bench_import_time.py --repeat 5
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+PRELUDE = """
+from types import SimpleNamespace
+import logging
+import time
+import jupyter_server.serverapp
+from tornado.web import Application
+start = time.perf_counter()
+"""
+
+CASES = {
+    "lazy": """
+import hydroshare_on_jupyter
+server_app = SimpleNamespace(web_app=Application(base_url="/"), log=logging.getLogger())
+hydroshare_on_jupyter._load_jupyter_server_extension(server_app)
+""",
+    "eager": """
+import hydroshare_on_jupyter
+from hydroshare_on_jupyter.handlers import get_route_handlers
+from hydroshare_on_jupyter.config_setup import ConfigFile
+ConfigFile()
+""",
+}
+
+EPILOGUE = """
+print(time.perf_counter() - start)
+"""
+
+
+def measure(case: str) -> float:
+    code = PRELUDE + CASES[case] + EPILOGUE
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for case in CASES:
+        times = [measure(case) for _ in range(args.repeat)]
+        print(
+            f"{case:>5}: median {statistics.median(times) * 1e3:.1f}ms "
+            f"min {min(times) * 1e3:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
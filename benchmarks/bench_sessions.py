@@ -0,0 +1,128 @@
+"""Load test a `SessionRegistry` hosting many concurrent users.
+
+Each of `--users` simulated users logs in, lists `--resources` local resources of their own
+(adding them to their sync session's aggregate map and watching them), and logs out once every
+user is logged in. Each user runs on its own thread. HydroShare is not contacted, remote resources
+are empty. Reports login and listing latency percentiles, and the threads and watches used at peak.
+
+With a watch per resource, users share the observer thread but each resource needs an inotify
+instance. With `--root-watcher`, every user's root-level watch of the data directory is merged into
+a single watch.
+
+Usage:
+    python benchmarks/bench_sessions.py --users 24 --resources 4
+    python benchmarks/bench_sessions.py --users 96 --resources 4 --root-watcher
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import argparse
+import statistics
+import threading
+import time
+
+from hydroshare_on_jupyter.fs_events import Events
+from hydroshare_on_jupyter.session import SessionRegistry
+from hydroshare_on_jupyter.session_struct import SessionStruct
+from hydroshare_on_jupyter.testing.stubs import StubHydroShare
+
+
+def create_resources(fs_root: Path, user_id: int, n: int):
+    resource_ids = []
+    for i in range(n):
+        resource_id = f"{user_id:016x}{i:016x}"
+        contents = fs_root / resource_id / resource_id / "data" / "contents"
+        contents.mkdir(parents=True)
+        for j in range(10):
+            (contents / f"file_{j}").write_text(f"{resource_id} {j}")
+        resource_ids.append(resource_id)
+    return resource_ids
+
+
+def percentile(values, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=24)
+    parser.add_argument("--resources", type=int, default=4)
+    parser.add_argument("--root-watcher", action="store_true")
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as temp:
+        fs_root = Path(temp).resolve()
+        resources = {
+            user_id: create_resources(fs_root, user_id, args.resources)
+            for user_id in range(args.users)
+        }
+
+        registry = SessionRegistry()
+        logins, listings, failures = [], [], []
+        peak = {"threads": 0, "watches": 0}
+        lock = threading.Lock()
+        # all users are logged in at once before any logs out
+        all_listed = threading.Barrier(args.users)
+
+        def simulate_user(user_id: int) -> None:
+            cookie = str(user_id).encode()
+            start = time.perf_counter()
+            registry.add(
+                SessionStruct(cookie=cookie, id=user_id, username=str(user_id))
+            )
+            sync_session = registry.new_sync_session(
+                cookie,
+                fs_root,
+                StubHydroShare(),
+                remote_poll=False,
+                root_watcher=args.root_watcher,
+            )
+            login = time.perf_counter() - start
+
+            listing = []
+            for resource_id in resources[user_id]:
+                start = time.perf_counter()
+                try:
+                    sync_session.event_broker.dispatch(
+                        Events.RESOURCE_FILES_LISTED, resource_id
+                    )
+                except OSError as e:
+                    # i.e. inotify instance limit reached
+                    with lock:
+                        failures.append(e)
+                    continue
+                listing.append(time.perf_counter() - start)
+
+            with lock:
+                logins.append(login)
+                listings.extend(listing)
+                peak["threads"] = max(peak["threads"], threading.active_count())
+                peak["watches"] = max(peak["watches"], registry.observer.n_watches)
+            all_listed.wait()
+            registry.remove(cookie)
+
+        threads = threading.active_count()
+        start = time.perf_counter()
+        # every user waits on the barrier, so each needs a thread
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            list(pool.map(simulate_user, range(args.users)))
+        elapsed = time.perf_counter() - start
+        registry.shutdown()
+
+        print(
+            f"{args.users} users, {args.users * args.resources} resources in {elapsed:.3f}s\n"
+            f"  login   p50 {statistics.median(logins) * 1e3:.1f}ms "
+            f"p95 {percentile(logins, 0.95) * 1e3:.1f}ms\n"
+            f"  listing p50 {statistics.median(listings) * 1e3:.1f}ms "
+            f"p95 {percentile(listings, 0.95) * 1e3:.1f}ms\n"
+            f"  peak {peak['threads'] - threads} threads, {peak['watches']} watches, "
+            f"{len(failures)} failed listings"
+        )
+        if failures:
+            print(f"  first failure: {failures[0]}")
+
+
+if __name__ == "__main__":
+    main()
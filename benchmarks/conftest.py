@@ -0,0 +1,192 @@
+"""Fixtures of the pytest-benchmark suite, `benchmarks/test_bench_*.py`.
+
+Benchmarks run against synthetic bagit resource trees. Each tree is a single resource with
+`--bench-files` files of mixed sizes, spread over nested directories. Trees are generated once per
+size and reused by every benchmark; pass `--bench-tree-dir` to also reuse them across runs (a 1M
+file tree takes minutes to generate and ~3GB of disk).
+
+Remote benchmarks, `test_bench_remote.py`, run against a local fake HydroShare server whose network
+conditions are set with `--bench-latency` and `--bench-bandwidth`.
+
+Usage:
+    pytest benchmarks --bench-files 1000,10000 --benchmark-autosave
+    pytest benchmarks/test_bench_remote.py --bench-latency 0.05 --bench-bandwidth 10e6
+    pytest benchmarks --bench-files 1000,10000 --benchmark-compare --benchmark-compare-fail=mean:10%
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+import hashlib
+import os
+import random
+import pytest
+
+from hydroshare_on_jupyter.lib.filesystem.fs_map import LocalFSMap, RemoteFSMap
+from hydroshare_on_jupyter.lib.filesystem.fs_resource_map import RemoteFSResourceMap
+from hydroshare_on_jupyter.lib.filesystem.aggregate_fs_map import AggregateFSMap
+
+# typing imports
+from typing import Dict, List
+
+RESOURCE_ID = "b" * 32
+FILES_PER_DIRECTORY = 100
+# files modified before the digest cache's racy window, so their digests are cached
+MTIME_NS = 1_600_000_000 * 1_000_000_000
+# fraction of files whose remote checksum differs, and of remote only files
+OUT_OF_SYNC = 0.05
+ONLY_REMOTE = 0.02
+SEED = 0
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("hydroshare_on_jupyter benchmarks")
+    group.addoption(
+        "--bench-files",
+        default="1000",
+        help="comma separated number of files of the synthetic resource trees, default 1000",
+    )
+    group.addoption(
+        "--bench-tree-dir",
+        default=None,
+        help="directory where synthetic resource trees are generated and reused across runs",
+    )
+    group.addoption(
+        "--bench-rounds",
+        type=int,
+        default=5,
+        help="rounds of benchmarks that must be set up each round (i.e. cold hashing)",
+    )
+    group.addoption(
+        "--bench-latency",
+        type=float,
+        default=0.0,
+        help="seconds the fake HydroShare server adds to each request, default 0",
+    )
+    group.addoption(
+        "--bench-bandwidth",
+        type=float,
+        default=None,
+        help="bytes per second of the fake HydroShare server, default unlimited",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "n_files" in metafunc.fixturenames:
+        sizes = [int(n) for n in metafunc.config.getoption("bench_files").split(",")]
+        metafunc.parametrize("n_files", sizes, ids=[f"{n}files" for n in sizes])
+
+
+def file_size(rng: random.Random) -> int:
+    """Mostly small files (notebooks, csvs), with a tail of larger ones."""
+    p = rng.random()
+    if p < 0.9:
+        return rng.randint(16, 4 * 1024)
+    if p < 0.99:
+        return rng.randint(4 * 1024, 64 * 1024)
+    return rng.randint(64 * 1024, 256 * 1024)
+
+
+def generate_tree(fs_root: Path, n_files: int) -> Dict[Path, str]:
+    """Write a bagit resource with `n_files` files to `fs_root`. Returns the resource's manifest,
+    file paths relative to the resource base directory to md5 digests."""
+    rng = random.Random(SEED)
+    base_directory = fs_root / RESOURCE_ID / RESOURCE_ID
+    contents = base_directory / "data" / "contents"
+    # files are sliced from a block of random bytes; cheaper than random bytes per file
+    block_size = 256 * 1024
+    block = rng.getrandbits(block_size * 8).to_bytes(block_size, "little") * 2
+
+    manifest = {}
+    for i in range(n_files):
+        # i.e. data/contents/d0003/d0000/file_000301.csv
+        directory = contents / f"d{i // FILES_PER_DIRECTORY ** 2:04d}"
+        directory = directory / f"d{i // FILES_PER_DIRECTORY % FILES_PER_DIRECTORY:04d}"
+        if i % FILES_PER_DIRECTORY == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        file = directory / f"file_{i:07d}.csv"
+        offset = rng.randrange(block_size)
+        data = block[offset : offset + file_size(rng)]
+        file.write_bytes(data)
+        os.utime(file, ns=(MTIME_NS, MTIME_NS))
+        manifest[file.relative_to(base_directory)] = hashlib.md5(data).hexdigest()
+
+    (base_directory / "bagit.txt").write_text(
+        "BagIt-Version: 0.96\nTag-File-Character-Encoding: UTF-8\n"
+    )
+    (base_directory / "manifest-md5.txt").write_text(
+        "".join(f"{digest}  {path.as_posix()}\n" for path, digest in manifest.items())
+    )
+    return manifest
+
+
+def read_manifest(fs_root: Path) -> Dict[Path, str]:
+    manifest = fs_root / RESOURCE_ID / RESOURCE_ID / "manifest-md5.txt"
+    entries = (line.split("  ", 1) for line in manifest.read_text().splitlines())
+    return {Path(path): digest for digest, path in entries}
+
+
+def remote_checksums(manifest: Dict[Path, str]) -> Dict[Path, str]:
+    """Checksums HydroShare would report for a resource: `manifest`, with some files changed and
+    some files only on HydroShare."""
+    rng = random.Random(SEED)
+    checksums = dict(manifest)
+    paths: List[Path] = list(manifest)
+    for path in rng.sample(paths, int(len(paths) * OUT_OF_SYNC)):
+        checksums[path] = hashlib.md5(str(path).encode()).hexdigest()
+    for i in range(int(len(paths) * ONLY_REMOTE)):
+        path = Path("data", "contents", "remote", f"file_{i:07d}.csv")
+        checksums[path] = hashlib.md5(str(path).encode()).hexdigest()
+    return checksums
+
+
+@pytest.fixture(scope="session")
+def tree_dir(request, tmp_path_factory) -> Path:
+    tree_dir = request.config.getoption("bench_tree_dir")
+    if tree_dir is None:
+        return tmp_path_factory.mktemp("trees")
+    return Path(tree_dir).expanduser().resolve()
+
+
+@pytest.fixture(scope="session")
+def _trees():
+    # n_files: (fs_root, manifest)
+    return {}
+
+
+@pytest.fixture
+def tree(n_files, tree_dir, _trees) -> SimpleNamespace:
+    """Synthetic resource tree of `n_files` files. `fs_root` contains a single resource,
+    `resource_id`. `manifest` are the resource's local file digests."""
+    if n_files not in _trees:
+        fs_root = tree_dir / f"files_{n_files}"
+        # a tree is complete once its manifest is written
+        if (fs_root / RESOURCE_ID / RESOURCE_ID / "manifest-md5.txt").exists():
+            manifest = read_manifest(fs_root)
+        else:
+            manifest = generate_tree(fs_root, n_files)
+        _trees[n_files] = (fs_root, manifest)
+    fs_root, manifest = _trees[n_files]
+    return SimpleNamespace(
+        fs_root=fs_root, resource_id=RESOURCE_ID, n_files=n_files, manifest=manifest
+    )
+
+
+@pytest.fixture
+def rounds(request) -> int:
+    return request.config.getoption("bench_rounds")
+
+
+@pytest.fixture
+def aggregate_map(tree) -> AggregateFSMap:
+    """Aggregate map of `tree`, whose local resource map is hashed. Remote checksums are
+    synthesized, see `remote_checksums`; HydroShare is not contacted."""
+    local_map = LocalFSMap(tree.fs_root)
+    local_map.add_resource(tree.resource_id)
+
+    remote_resource_map = RemoteFSResourceMap(
+        SimpleNamespace(resource_id=tree.resource_id)
+    )
+    remote_resource_map.data = remote_checksums(tree.manifest)
+    remote_map = RemoteFSMap(tree.fs_root, hydroshare=None)
+    remote_map.data[tree.resource_id] = remote_resource_map
+    return AggregateFSMap(local_map=local_map, remote_map=remote_map)
@@ -0,0 +1,149 @@
+"""Benchmarks of local resource hashing, sync state computation, and file system event handling
+against synthetic resource trees (see `conftest.py`). Per file memory, and event throughput, are
+recorded in each benchmark's `extra_info`, so they are saved with its timings."""
+
+from functools import partial
+from watchdog.events import FileModifiedEvent
+import gc
+import itertools
+import time
+import tracemalloc
+import pytest
+
+from hydroshare_on_jupyter.fs_event_handler import fs_event_handler_factory
+from hydroshare_on_jupyter.fs_events import Events
+from hydroshare_on_jupyter.lib.events.event_broker import EventBroker
+from hydroshare_on_jupyter.lib.filesystem.aggregate_fs_resource_map_sync_state import (
+    AggregateFSResourceMapSyncState,
+)
+from hydroshare_on_jupyter.lib.filesystem.array_sync_state import compare_resource_maps
+from hydroshare_on_jupyter.lib.filesystem.fs_map import LocalFSMap
+from hydroshare_on_jupyter.lib.filesystem.fs_resource_map import LocalFSResourceMap
+
+pytest.importorskip("pytest_benchmark")
+
+
+def test_create_map(benchmark, tree):
+    fs_map = benchmark(LocalFSMap.create_map, tree.fs_root)
+    assert fs_map.resources == [tree.resource_id]
+
+
+def test_update_resource_cold(benchmark, tree, rounds):
+    """Hash every file of a resource, i.e. the first time a resource is listed."""
+
+    def setup():
+        resource_map = LocalFSResourceMap(tree.fs_root / tree.resource_id)
+        return (resource_map,), {}
+
+    benchmark.pedantic(LocalFSResourceMap.update_resource, setup=setup, rounds=rounds)
+
+
+def test_update_resource_warm(benchmark, tree):
+    """Re-scan a resource whose files are unchanged, their digests are cached."""
+    resource_map = LocalFSResourceMap.from_resource_path(
+        tree.fs_root / tree.resource_id
+    )
+    benchmark(resource_map.update_resource)
+    assert len(resource_map) == tree.n_files
+
+
+def test_update_resource_memory(benchmark, tree):
+    """Memory retained by a hashed resource map, per file."""
+
+    def update_resource():
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            resource_map = LocalFSResourceMap.from_resource_path(
+                tree.fs_root / tree.resource_id
+            )
+            retained = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        return resource_map, retained
+
+    # tracing slows hashing, timings are not comparable with other benchmarks
+    resource_map, retained = benchmark.pedantic(update_resource, rounds=1)
+    benchmark.extra_info["bytes_per_file"] = retained / len(resource_map)
+    benchmark.extra_info["bytes"] = retained
+
+
+def test_from_resource_maps(benchmark, tree, aggregate_map):
+    state = benchmark(
+        AggregateFSResourceMapSyncState.from_resource_maps,
+        local_resource_map=aggregate_map.local_map[tree.resource_id],
+        remote_resource_map=aggregate_map.remote_map[tree.resource_id],
+    )
+    assert len(state.in_sync) + len(state.out_of_sync) == tree.n_files
+
+
+def test_from_resource_maps_after_change(benchmark, tree, aggregate_map):
+    """Re-compare a resource after a single file changes. Folder digests are cached, only the
+    changed file's folders are compared."""
+    local_resource_map = aggregate_map.local_map[tree.resource_id]
+    remote_resource_map = aggregate_map.remote_map[tree.resource_id]
+    compare = partial(
+        AggregateFSResourceMapSyncState.from_resource_maps,
+        local_resource_map=local_resource_map,
+        remote_resource_map=remote_resource_map,
+    )
+    # build folder digests
+    compare()
+    path = next(iter(local_resource_map.data))
+    digests = itertools.cycle(["changed", local_resource_map[path]])
+
+    def change_and_compare():
+        local_resource_map[path] = next(digests)
+        return compare()
+
+    state = benchmark(change_and_compare)
+    assert len(state.in_sync) + len(state.out_of_sync) == tree.n_files
+
+
+def test_compare_resource_maps_arrays(benchmark, tree, aggregate_map):
+    """Compare a resource using the NumPy array representation, regardless of its size."""
+    pytest.importorskip("numpy")
+    ((in_sync, out_of_sync, _, _),) = benchmark(
+        compare_resource_maps,
+        [
+            (
+                aggregate_map.local_map[tree.resource_id],
+                aggregate_map.remote_map[tree.resource_id],
+            )
+        ],
+    )
+    assert len(in_sync) + len(out_of_sync) == tree.n_files
+
+
+def test_sync_state_json(benchmark, aggregate_map):
+    """Serialize the sync state of all resources, as sent to the frontend."""
+    benchmark(lambda: aggregate_map.get_sync_state().json())
+
+
+def test_event_handler_throughput(benchmark, tree):
+    """Dispatch a modified event for every file of a resource. Files are unchanged, so digests are
+    cached; measures event filtering, path handling, and `STATUS` dispatch."""
+    resource_map = LocalFSResourceMap.from_resource_path(
+        tree.fs_root / tree.resource_id
+    )
+    event_broker = EventBroker(Events)
+    statuses = []
+    event_broker.subscribe(Events.STATUS, statuses.append)
+    handler = fs_event_handler_factory(event_broker)(resource_map)
+    events = [
+        FileModifiedEvent(str(resource_map.base_directory / path))
+        for path in resource_map
+    ]
+
+    elapsed = []
+
+    def dispatch():
+        start = time.perf_counter()
+        for event in events:
+            handler.dispatch(event)
+        elapsed.append(time.perf_counter() - start)
+
+    benchmark(dispatch)
+    benchmark.extra_info["events_per_second"] = len(events) / min(elapsed)
+    assert len(statuses) >= len(events)
@@ -0,0 +1,186 @@
+"""Benchmarks of code paths that talk to HydroShare, run against a local fake HydroShare server (see
+`hydroshare_on_jupyter.testing.fake_hydroshare`) serving the synthetic resource tree. The number
+of requests, by route, made per round is recorded in each benchmark's `extra_info`."""
+
+from hsclient import HydroShare
+from pathlib import Path
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
+from tornado.websocket import websocket_connect
+import asyncio
+import json
+import shutil
+import pytest
+
+from hydroshare_on_jupyter.__main__ import get_test_app
+from hydroshare_on_jupyter.lib.filesystem.aggregate_fs_resource_map_sync_state import (
+    AggregateFSResourceMapSyncState,
+)
+from hydroshare_on_jupyter.lib.filesystem.fs_resource_map import (
+    LocalFSResourceMap,
+    RemoteFSResourceMap,
+)
+from hydroshare_on_jupyter.lib.resource_strategies import HydroShareBagDownloadStrategy
+from hydroshare_on_jupyter.lib.transfer.chunked_upload import ChunkedUploader
+from hydroshare_on_jupyter.testing.fake_hydroshare import FakeHydroShare
+
+# typing imports
+from typing import Dict
+
+pytest.importorskip("pytest_benchmark")
+
+# fraction of local files modified before a delta upload
+MODIFIED = 0.01
+
+
+@pytest.fixture
+def server(request):
+    with FakeHydroShare(
+        latency=request.config.getoption("bench_latency"),
+        bandwidth=request.config.getoption("bench_bandwidth"),
+    ) as server:
+        yield server
+
+
+@pytest.fixture
+def remote_files(tree) -> Dict[str, bytes]:
+    """Contents of the tree's files, by path relative to `data/contents`."""
+    base_directory = tree.fs_root / tree.resource_id / tree.resource_id
+    contents = Path("data", "contents")
+    return {
+        path.relative_to(contents).as_posix(): (base_directory / path).read_bytes()
+        for path in tree.manifest
+    }
+
+
+@pytest.fixture
+def remote_resource(server, tree, remote_files):
+    return server.add_resource(
+        remote_files, resource_id=tree.resource_id, title="benchmark"
+    )
+
+
+@pytest.fixture
+def hydroshare(server) -> HydroShare:
+    return HydroShare(**server.credentials, **server.host)
+
+
+def record_requests(benchmark, server: FakeHydroShare, rounds: int) -> None:
+    benchmark.extra_info["requests_per_round"] = {
+        route: count / rounds for route, count in sorted(server.requests.items())
+    }
+
+
+async def login_to_first_status(
+    app, credentials: Dict[str, str], resource_id: str
+) -> None:
+    """Log in, open the event websocket, list a local resource, and wait for its sync status."""
+    sockets = bind_sockets(0, "127.0.0.1")
+    port = sockets[0].getsockname()[1]
+    http_server = HTTPServer(app)
+    http_server.add_sockets(sockets)
+    client = AsyncHTTPClient(force_instance=True)
+    base_url = f"http://127.0.0.1:{port}/syncApi"
+    try:
+        response = await client.fetch(
+            HTTPRequest(
+                f"{base_url}/login",
+                method="POST",
+                body=json.dumps(credentials),
+                headers={"content-type": "application/json"},
+            )
+        )
+        cookie = {"Cookie": response.headers["Set-Cookie"].split(";", 1)[0]}
+
+        ws = await websocket_connect(
+            HTTPRequest(f"ws://127.0.0.1:{port}/syncApi/ws", headers=cookie)
+        )
+        # initial sync state, no resources are tracked yet
+        await ws.read_message()
+
+        await client.fetch(
+            HTTPRequest(f"{base_url}/resources/{resource_id}", headers=cookie)
+        )
+        while resource_id not in await ws.read_message():
+            pass
+        ws.close()
+
+        await client.fetch(
+            HTTPRequest(
+                f"{base_url}/login",
+                method="DELETE",
+                headers={"content-type": "application/json", **cookie},
+            )
+        )
+    finally:
+        client.close()
+        http_server.stop()
+
+
+def test_login_to_first_status(benchmark, server, remote_resource, tree, rounds):
+    app = get_test_app(data_path=tree.fs_root, hydroshare_url=server.url)
+    benchmark.pedantic(
+        lambda: asyncio.run(
+            login_to_first_status(app, server.credentials, tree.resource_id)
+        ),
+        rounds=rounds,
+    )
+    record_requests(benchmark, server, rounds)
+
+
+def test_full_download(
+    benchmark, server, remote_resource, hydroshare, tmp_path, rounds
+):
+    """Download and extract a resource's bag."""
+
+    def setup():
+        shutil.rmtree(tmp_path / remote_resource.resource_id, ignore_errors=True)
+        strategy = HydroShareBagDownloadStrategy(
+            hydroshare.resource(remote_resource.resource_id), str(tmp_path)
+        )
+        return (strategy,), {}
+
+    benchmark.pedantic(
+        HydroShareBagDownloadStrategy.download, setup=setup, rounds=rounds
+    )
+    record_requests(benchmark, server, rounds)
+
+
+def test_delta_upload(
+    benchmark, server, remote_resource, remote_files, hydroshare, tree, tmp_path, rounds
+):
+    """Fetch the remote manifest, re-scan the local copy of a resource, and upload the files that
+    are out of sync; `MODIFIED` of the resource's files."""
+    resource_id = remote_resource.resource_id
+    shutil.copytree(tree.fs_root / resource_id, tmp_path / "data" / resource_id)
+    base_directory = tmp_path / "data" / resource_id / resource_id
+    local_map = LocalFSResourceMap.from_resource_path(base_directory.parent)
+    modified = list(tree.manifest)[:: int(1 / MODIFIED)]
+    round_ = 0
+
+    def setup():
+        nonlocal round_
+        round_ += 1
+        remote_resource.files = dict(remote_files)
+        for path in modified:
+            # new content every round, so chunks are not skipped as previously uploaded
+            (base_directory / path).write_bytes(f"{path} {round_}".encode())
+        return (), {}
+
+    def delta_upload():
+        resource = hydroshare.resource(resource_id)
+        remote_map = RemoteFSResourceMap.from_resource(resource)
+        local_map.update_resource()
+        state = AggregateFSResourceMapSyncState.from_resource_maps(
+            local_resource_map=local_map, remote_resource_map=remote_map
+        )
+        uploader = ChunkedUploader(resource, tmp_path / "upload_state")
+        return uploader.upload(
+            [base_directory / path for path in state.out_of_sync],
+            root=base_directory / "data" / "contents",
+        )
+
+    checksums = benchmark.pedantic(delta_upload, setup=setup, rounds=rounds)
+    assert len(checksums) == len(modified)
+    record_requests(benchmark, server, rounds)
@@ -1,14 +1,19 @@
 """
 Setup jupyterlab server and lab extensions. Add tornado HTTP handlers to jupyter session.
+
+Request handlers, and their dependencies (i.e. hsclient and watchdog), are imported on the first
+request to the extension, not when the Jupyter server starts. See `routing.LazyRouter`.
 """
+
+from functools import lru_cache, partial
 import json
 from pathlib import Path
-from jupyter_server.serverapp import ServerApp
-from jupyter_server.utils import url_path_join
 
-# local imports
-from .config_setup import ConfigFile
-from .handlers import get_route_handlers
+# type hint imports
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from jupyter_server.serverapp import ServerApp
 
 # Constants
 FRONTEND_PATH = "/sync"
@@ -19,13 +24,24 @@ EXTENSION_DIRNAME = "labextension"
 PARENT_DIR = Path(__file__).parent.resolve()
 EXTENSION_METADATA_PATH = PARENT_DIR / f"{EXTENSION_DIRNAME}/package.json"
 
-# read metadata from js extension package metadata file, `package.json`
-extension_metadata = json.loads(EXTENSION_METADATA_PATH.read_text())
-MODULE_NAME = extension_metadata["name"]
+
+@lru_cache(maxsize=None)
+def _extension_metadata() -> Dict[str, Any]:
+    """Read metadata from js extension package metadata file, `package.json`, on first use."""
+    return json.loads(EXTENSION_METADATA_PATH.read_text())
+
+
+def __getattr__(name: str) -> Any:
+    # `extension_metadata` and `MODULE_NAME` are read lazily
+    if name == "extension_metadata":
+        return _extension_metadata()
+    if name == "MODULE_NAME":
+        return _extension_metadata()["name"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def _jupyter_labextension_paths():
-    return [{"src": EXTENSION_DIRNAME, "dest": MODULE_NAME}]
+    return [{"src": EXTENSION_DIRNAME, "dest": _extension_metadata()["name"]}]
 
 
 # def _jupyter_server_extension_paths():
@@ -37,10 +53,11 @@ def _jupyter_server_extension_points():
     Returns a list of dictionaries with metadata describing
     where to find the `_load_jupyter_server_extension` function.
     """
-    return [{"module": MODULE_NAME}]
+    # the server extension is this package
+    return [{"module": __name__}]
 
 
-def _load_jupyter_server_extension(server_app: ServerApp):
+def _load_jupyter_server_extension(server_app: "ServerApp"):
     """Registers the API handler to receive HTTP requests from the frontend extension.
 
     Parameters
@@ -48,15 +65,30 @@ def _load_jupyter_server_extension(server_app: ServerApp):
     server_app: jupyterlab.labapp.LabApp
         JupyterLab application instance
     """
+    from jupyter_server.utils import url_path_join
+    from .routing import LazyRouter
+
     web_app = server_app.web_app
     base_url = web_app.settings["base_url"]
-    handlers = get_route_handlers(
-        url_path_join(base_url, FRONTEND_PATH), url_path_join(base_url, BACKEND_PATH)
+    frontend_url = url_path_join(base_url, FRONTEND_PATH)
+    backend_url = url_path_join(base_url, BACKEND_PATH)
+
+    # handlers are imported and configuration is parsed on first request
+    router = LazyRouter(
+        web_app, partial(_load_handlers, web_app, frontend_url, backend_url)
     )
 
     # `cookie_secret` inherited from `server_app`
-    server_app.web_app.add_handlers(".*$", handlers)
-    server_app.log.info(f"Registered {MODULE_NAME} extension")
+    server_app.web_app.add_handlers(
+        ".*$", [(backend_url + r"(/.*)?", router), (frontend_url + r".*", router)]
+    )
+    server_app.log.info(f"Registered {__name__} extension")
+
+
+def _load_handlers(web_app, frontend_url: str, backend_url: str) -> List[Any]:
+    """Import request handlers and pass configuration to the web app. Returns route handlers."""
+    from .config_setup import ConfigFile
+    from .handlers import get_route_handlers
 
     # parse config file. if env variables present, they take precedence.
     # looks for config in following order:
@@ -65,7 +97,12 @@ def _load_jupyter_server_extension(server_app: ServerApp):
     config = ConfigFile()
 
     # pass config file settings to Tornado Application (web app)
-    server_app.web_app.settings.update(config.dict())
+    web_app.settings.update(config.dict())
+    if config.trace:
+        from .lib.tracing import ChromeTraceExporter, TRACE_FILENAME, tracer
+
+        tracer.configure(ChromeTraceExporter(config.log_path / TRACE_FILENAME))
+    return get_route_handlers(frontend_url, backend_url)
 
 
 # For backward compatibility with the classical notebook
@@ -15,6 +15,7 @@ from pathlib import Path
 from .handlers import get_route_handlers
 from .cli import CommandNamespace, parse
 from .config_setup import ConfigFile
+from .lib.tracing import ChromeTraceExporter, TRACE_FILENAME, tracer
 
 MODULE_DIR = Path(__file__).parent.resolve()
 _ERROR_MESSAGE_PREFIX = "Fatal, cannot link labextension."
@@ -115,6 +116,8 @@ def start_stand_alone_session(
     hostname: str, port: int, debug: bool, config: ConfigFile
 ) -> None:
     app = get_test_app(default_hostname=hostname, debug=debug, **config.dict())
+    if config.trace:
+        tracer.configure(ChromeTraceExporter(config.log_path / TRACE_FILENAME))
 
     logging.info(f"Server starting on {hostname}:{port}")
     logging.info(f"Debugging mode {'enabled' if debug else 'disabled'}")
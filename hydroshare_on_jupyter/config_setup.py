@@ -1,9 +1,24 @@
-from pydantic import BaseSettings, Field, root_validator, validator
+from pydantic import AnyHttpUrl, BaseSettings, Field, root_validator, validator
 import pickle
 from pathlib import Path
-from typing import Optional, Union
+from typing import Any, List, Optional, Union
 from .utilities.pathlib_utils import first_existing_file, expand_and_resolve
 from .models.oauth import OAuthFile
+from .resource_metadata_cache import DEFAULT_RESOURCE_LIST_MAX_AGE
+from .lib.batch_download import DEFAULT_MAX_CONCURRENT_DOWNLOADS
+from .remote_resource_poller import (
+    DEFAULT_REMOTE_POLL_MIN_INTERVAL,
+    DEFAULT_REMOTE_POLL_MAX_INTERVAL,
+)
+from .local_resource_poller import (
+    DEFAULT_LOCAL_POLL_INTERVAL,
+    DEFAULT_LOCAL_POLL_BUDGET,
+)
+from .hydroshare_resource_cache import (
+    DEFAULT_HYDROSHARE_URL,
+    DEFAULT_RESOURCE_CACHE_SIZE,
+    DEFAULT_RESOURCE_CACHE_TTL,
+)
 
 _DEFAULT_CONFIG_FILE_LOCATIONS = (
     "~/.config/hydroshare_on_jupyter/config",
@@ -24,11 +39,80 @@ class ConfigFile(BaseSettings):
     data_path: Path = Field(_DEFAULT_DATA_PATH, env="data")
     log_path: Path = Field(_DEFAULT_LOG_PATH, env="log")
     oauth_path: Union[OAuthFile, str, None] = Field(None, env="oauth")
+    # HydroShare instance users log in to, i.e. a development server
+    hydroshare_url: AnyHttpUrl = Field(DEFAULT_HYDROSHARE_URL, env="hydroshare_url")
+    # maximum number and lifetime (seconds) of cached hsclient Resource objects
+    resource_cache_size: int = Field(
+        DEFAULT_RESOURCE_CACHE_SIZE, env="resource_cache_size", gt=0
+    )
+    resource_cache_ttl: float = Field(
+        DEFAULT_RESOURCE_CACHE_TTL, env="resource_cache_ttl", ge=0
+    )
+    # seconds before the cached list of a user's resources is refreshed in the background
+    resource_list_max_age: float = Field(
+        DEFAULT_RESOURCE_LIST_MAX_AGE, env="resource_list_max_age", ge=0
+    )
+    # after login, add local resources to the sync session in the background
+    warm_up: bool = Field(False, env="warm_up")
+    # poll HydroShare for changes made to local resources outside of this extension. seconds
+    # between polls of a recently changed and an idle resource
+    remote_poll: bool = Field(False, env="remote_poll")
+    remote_poll_min_interval: float = Field(
+        DEFAULT_REMOTE_POLL_MIN_INTERVAL, env="remote_poll_min_interval", gt=0
+    )
+    remote_poll_max_interval: float = Field(
+        DEFAULT_REMOTE_POLL_MAX_INTERVAL, env="remote_poll_max_interval", gt=0
+    )
+    # maximum number of concurrent HydroShare downloads
+    max_concurrent_downloads: int = Field(
+        DEFAULT_MAX_CONCURRENT_DOWNLOADS, env="max_concurrent_downloads", gt=0
+    )
+    # after a resource is downloaded, verify the checksums from its bag manifest in the background
+    verify_downloads: bool = Field(False, env="verify_downloads")
+    # write files that already exist locally, in any resource, from the local file instead of
+    # downloading them. hard link, rather than copy or reflink, the local file
+    local_dedup: bool = Field(True, env="local_dedup")
+    local_dedup_hardlinks: bool = Field(False, env="local_dedup_hardlinks")
+    # watch the data directory once, rather than each resource. use with many local resources
+    root_watcher: bool = Field(False, env="root_watcher")
+    # poll local resources for changes instead of watching file system events (i.e. on NFS).
+    # seconds between polls and files checked for modifications per resource per poll
+    local_poll: bool = Field(False, env="local_poll")
+    local_poll_interval: float = Field(
+        DEFAULT_LOCAL_POLL_INTERVAL, env="local_poll_interval", gt=0
+    )
+    local_poll_budget: int = Field(
+        DEFAULT_LOCAL_POLL_BUDGET, env="local_poll_budget", gt=0
+    )
+    # release resources from memory that have not been accessed for this many seconds, or the least
+    # recently accessed resources beyond this many. unset disables eviction
+    evict_idle_after: Optional[float] = Field(None, env="evict_idle_after", gt=0)
+    evict_max_resources: Optional[int] = Field(None, env="evict_max_resources", gt=0)
+    # maximum number of concurrently logged in sessions hosted by the server. unset is unlimited
+    max_sessions: Optional[int] = Field(None, env="max_sessions", gt=0)
+    # maximum number of concurrently logged in sessions of a single user. unset is unlimited
+    max_sessions_per_user: Optional[int] = Field(
+        None, env="max_sessions_per_user", gt=0
+    )
+    # serve `/syncApi/debug/profile` and `/syncApi/debug/memory` to logged in users
+    debug_endpoints: bool = Field(False, env="debug_endpoints")
+    # write a Chrome trace-event file of requests, file system events, hashing, and HydroShare
+    # calls to `log_path`. see `lib.tracing`
+    trace: bool = Field(False, env="trace")
+    # gitignore-style patterns of local files that are not synced, in addition to the defaults
+    ignore_patterns: List[str] = Field([], env="ignore")
 
     class Config:
         env_file: Union[str, None] = first_existing_file(_DEFAULT_CONFIG_FILE_LOCATIONS)
         env_file_encoding = "utf-8"
 
+        @classmethod
+        def parse_env_var(cls, field_name: str, raw_val: str) -> Any:
+            # comma separated, i.e. `IGNORE=*.tmp,scratch/`
+            if field_name == "ignore_patterns":
+                return [p.strip() for p in raw_val.split(",") if p.strip()]
+            return cls.json_loads(raw_val)
+
     @validator("data_path", "log_path", pre=True)
     def create_paths_if_do_not_exist(cls, v: Path):
         # for key, path in values.items():
@@ -1,4 +1,6 @@
 from watchdog.events import (
+    EVENT_TYPE_MOVED,
+    FileSystemEvent,
     FileSystemEventHandler,
     PatternMatchingEventHandler,
     FileCreatedEvent,
@@ -10,11 +12,17 @@ from watchdog.events import (
 
 from .fs_events import Events
 from .lib.filesystem.fs_resource_map import LocalFSResourceMap
+from .lib.filesystem.types import ResourceId
 from .lib.events.event_broker import EventBroker
+from .lib.tracing import span
 
 from functools import wraps
 from pathlib import Path
 import logging
+import os
+
+# type hint imports
+from typing import Callable, Dict, Optional, Union
 
 # module level log
 logger = logging.getLogger(__name__)
@@ -35,13 +43,29 @@ def fs_event_handler_factory(event_broker: EventBroker) -> FileSystemEventHandle
 
     class FSEventHandler(PatternMatchingEventHandler):
         def __init__(self, local_fs_map: LocalFSResourceMap):
-            # TODO: use pattern kwarg to ignore certain files/file extensions. it would be nice if
-            # this were a configurable.
+            # ignored files are filtered in `dispatch` using the resource map's gitignore-style
+            # patterns, see `LocalFSResourceMap.ignore`
             super().__init__(ignore_directories=True)
 
             # dependency inject local filesystem map
             self._res_map = local_fs_map
 
+        def dispatch(self, event: FileSystemEvent) -> None:
+            # drop events for ignored files (i.e. checkpoints, swap files) before they are hashed
+            # or a status is emitted. a move is dropped only if both paths are ignored
+            paths = [event.src_path]
+            if event.event_type == EVENT_TYPE_MOVED:
+                paths.append(event.dest_path)
+            if all(self._res_map.is_ignored(os.fsdecode(path)) for path in paths):
+                return
+            with span(
+                "FSEventHandler.dispatch",
+                resource_id=self.resource_id,
+                event=event.event_type,
+                path=os.fsdecode(event.src_path),
+            ):
+                super().dispatch(event)
+
         @log_event
         def on_any_event(self, event):
             # log all events
@@ -94,3 +118,73 @@ def fs_event_handler_factory(event_broker: EventBroker) -> FileSystemEventHandle
             return self._res_map.resource_id
 
     return FSEventHandler
+
+
+class FSEventRouter(FileSystemEventHandler):
+    """Route events from a single recursive watch on `fs_root` to resource specific event handlers
+    (see `fs_event_handler_factory`), instead of scheduling a watch per resource. An event's
+    resource id is the first component of its path relative to `fs_root`.
+
+    Resource event handlers are created lazily, when the first event for a resource in the local
+    map is observed. Events for resources that are not in the local map and events outside of a
+    resource's `data/contents` directory are dropped.
+    """
+
+    def __init__(
+        self,
+        fs_root: Union[Path, str],
+        get_resource_map: Callable[[ResourceId], Optional[LocalFSResourceMap]],
+        event_handler_factory: Callable[[LocalFSResourceMap], FileSystemEventHandler],
+    ) -> None:
+        super().__init__()
+        self.fs_root = Path(fs_root).expanduser().resolve()
+        self._root_prefix = f"{self.fs_root}{os.sep}"
+        self._get_resource_map = get_resource_map
+        self._event_handler_factory = event_handler_factory
+        self._handlers: Dict[ResourceId, FileSystemEventHandler] = dict()
+
+    def dispatch(self, event: FileSystemEvent) -> None:
+        if event.is_directory:
+            return
+
+        resource_id = self.resource_id(event.src_path)
+        if event.event_type == EVENT_TYPE_MOVED:
+            dest_resource_id = self.resource_id(event.dest_path)
+            if dest_resource_id != resource_id:
+                # moved between resources, or into or out of a resource's contents
+                self._route(resource_id, FileDeletedEvent(event.src_path))
+                self._route(dest_resource_id, FileCreatedEvent(event.dest_path))
+                return
+
+        self._route(resource_id, event)
+
+    def resource_id(self, path: str) -> Optional[ResourceId]:
+        """Resource id of a path in `{fs_root}/{resource_id}/{resource_id}/data/contents/`. None if
+        the path is not in a resource's contents directory."""
+        path = os.fsdecode(path)
+        if not path.startswith(self._root_prefix):
+            return None
+        # prefix match, avoid comparatively slow pathlib parsing on each event
+        parts = path[len(self._root_prefix) :].split(os.sep, 4)
+        if len(parts) < 5 or parts[1] != parts[0] or parts[2:4] != ["data", "contents"]:
+            return None
+        return parts[0]
+
+    # helpers
+    def _route(self, resource_id: Optional[ResourceId], event: FileSystemEvent) -> None:
+        if resource_id is None:
+            return
+
+        res_map = self._get_resource_map(resource_id)
+        if res_map is None:
+            # resource is not (or no longer) tracked
+            self._handlers.pop(resource_id, None)
+            return
+
+        handler = self._handlers.get(resource_id)
+        # resource map instances are replaced if a resource is removed and re-added
+        if handler is None or handler._res_map is not res_map:
+            handler = self._event_handler_factory(res_map)
+            self._handlers[resource_id] = handler
+
+        handler.dispatch(event)
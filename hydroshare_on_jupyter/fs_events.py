@@ -14,10 +14,15 @@ NOOP = lambda _: ...
 class Events(Enum):
     LOGIN_SUCCESSFUL = auto()  # Callable[[Union[Path, str], HydroShare], None]
     STATUS = auto()  # Callable[[ResourceId], None]
-    RESOURCE_DOWNLOADED = auto()  # Callable[[ResourceId], None]
-    RESOURCE_ENTITY_DOWNLOADED = auto()  # Callable[[ResourceId], None]
-    RESOURCE_ENTITY_UPLOADED = auto()  # Callable[[ResourceId], None]
+    # Callable[[ResourceId, Optional[Path], bool], None]. `manifest` and `verify` kwargs
+    RESOURCE_DOWNLOADED = auto()
+    # Callable[[ResourceId, Optional[Dict[Path, Optional[MD5Hash]]]], None]. `paths` kwarg
+    RESOURCE_ENTITY_DOWNLOADED = auto()
+    # Callable[[ResourceId, Optional[Dict[str, MD5Hash]]], None]. `checksums` kwarg
+    RESOURCE_ENTITY_UPLOADED = auto()
     RESOURCE_FILES_LISTED = auto()  # Callable[[ResourceId], None]
     RESOURCE_STATUS = auto()  # Callable[[ResourceId], None]
+    REMOTE_RESOURCE_CHANGED = auto()  # Callable[[ResourceId], None]
+    RESOURCE_IDLE = auto()  # Callable[[ResourceId], None]
     # TODO: implement below.
     LOGOUT = auto()  # NOOP
@@ -9,11 +9,17 @@ from ..server import (
     UserInfoHandler,
     ListUserHydroShareResources,
     ListHydroShareResourceFiles,
+    ResourceWarmUpHandler,
+    ResourceSyncStateHandler,
     HydroShareResourceHandler,
     LocalResourceEntityHandler,
     HydroShareResourceEntityHandler,
+    BatchDownloadHandler,
+    LocalDedupHandler,
     WebAppHandler,
     UsingOAuth,
+    DebugProfileHandler,
+    DebugMemoryHandler,
 )
 
 
@@ -57,11 +63,20 @@ def get_route_handlers(frontend_url, backend_url):
         (url_path_join(backend_url, "/login"), LoginHandler),
         (url_path_join(backend_url, r"/user"), UserInfoHandler),
         (url_path_join(backend_url, r"/resources"), ListUserHydroShareResources),
+        (url_path_join(backend_url, r"/warm_up"), ResourceWarmUpHandler),
+        (url_path_join(backend_url, r"/batch/download"), BatchDownloadHandler),
+        (url_path_join(backend_url, r"/dedup"), LocalDedupHandler),
+        (url_path_join(backend_url, r"/debug/profile"), DebugProfileHandler),
+        (url_path_join(backend_url, r"/debug/memory"), DebugMemoryHandler),
         # (url_path_join(backend_url, r"/resources/([^/]+)"), ResourceHandler),
         (
             url_path_join(backend_url, r"/resources/([^/]+)"),
             ListHydroShareResourceFiles,
         ),
+        (
+            url_path_join(backend_url, r"/resources/([^/]+)/sync_state"),
+            ResourceSyncStateHandler,
+        ),
         (
             url_path_join(backend_url, r"/resources/([^/]+)/download"),
             HydroShareResourceHandler,
@@ -1,21 +1,78 @@
 from hsclient import HydroShare, Resource
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from typing import Any, Dict, NamedTuple, Optional
+
+from .lib.cache import CacheInfo, LRUCacheWithTTL
+
+DEFAULT_RESOURCE_CACHE_SIZE = 128
+DEFAULT_RESOURCE_CACHE_TTL = 300.0  # seconds
+DEFAULT_HYDROSHARE_URL = "https://www.hydroshare.org"
+
+
+def hydroshare_host(url: str) -> Dict[str, Any]:
+    """`hsclient.HydroShare` host, protocol, and port keyword arguments of a HydroShare url."""
+    parsed = urlparse(url)
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    return {"host": parsed.hostname, "protocol": parsed.scheme, "port": port}
+
+
+class _CachedResource(NamedTuple):
+    resource: Resource
+    # whether the resource's existence was checked (i.e. its metadata retrieved)
+    validated: bool
 
 
 class HydroShareWithResourceCache(HydroShare):
-    """Extends hsclient.HydroShare to include a dictionary of cached resources"""
+    """Extends hsclient.HydroShare to include a bounded, expiring cache of Resource objects. With
+    `validate=True`, creating a Resource object costs a network round trip. Cached objects are
+    shared by all request handlers and RemoteFSMap.
+
+    If given, `connection_pool` is mounted on the underlying `requests.Session`, so connections to
+    HydroShare are pooled across the instances (i.e. users) it is given to."""
 
-    def __init__(self, *args, **kwargs):
+    def __init__(
+        self,
+        *args,
+        cache_maxsize: int = DEFAULT_RESOURCE_CACHE_SIZE,
+        cache_ttl: float = DEFAULT_RESOURCE_CACHE_TTL,
+        connection_pool: Optional[HTTPAdapter] = None,
+        **kwargs,
+    ):
+        self._resource_cache: LRUCacheWithTTL[str, _CachedResource] = LRUCacheWithTTL(
+            maxsize=cache_maxsize, ttl=cache_ttl
+        )
         super().__init__(*args, **kwargs)
-        self._resource_dict = dict()
+        if connection_pool is not None:
+            for prefix in ("https://", "http://"):
+                self._hs_session._session.mount(prefix, connection_pool)
 
     def resource(self, resource_id: str, validate: bool = True) -> Resource:
         """Add Resource object caching"""
-        # Returned if already in cached resources
-        if resource_id in self._resource_dict:
-            return self._resource_dict[resource_id]
+        # Returned if already in cached resources. an entry cached by a `validate=False` caller is
+        # validated before it is returned to a `validate=True` caller
+        cached = self._resource_cache.get(resource_id)
+        if cached is not None and (cached.validated or not validate):
+            return cached.resource
 
-        res = super().resource(resource_id, validate=validate)
+        if cached is not None:
+            res = cached.resource
+        else:
+            # NOTE: hsclient.HydroShare.resource's own cache is unbounded, so it is bypassed
+            res = Resource(
+                "/resource/{}/data/resourcemap.xml".format(resource_id),
+                self._hs_session,
+            )
+        if validate:
+            res.metadata
 
         # Put Resource in cache
-        self._resource_dict[resource_id] = res
+        self._resource_cache.put(resource_id, _CachedResource(res, validate))
         return res
+
+    def invalidate_resource(self, resource_id: str) -> None:
+        """Drop cached Resource object. Use when a resource has changed on HydroShare."""
+        self._resource_cache.invalidate(resource_id)
+
+    def cache_info(self) -> CacheInfo:
+        return self._resource_cache.cache_info()
@@ -0,0 +1,96 @@
+from concurrent.futures import Executor, wait
+from hsclient import Resource
+import logging
+
+# typing imports
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from .filesystem.content_index import ContentIndex
+from .resource_factories import HydroShareEntityDownloadFactory, EntityTypeEnum
+from .resource_strategies import DownloadedFiles
+
+_log = logging.getLogger(__name__)
+
+# default maximum number of concurrent HydroShare downloads shared by all batch download requests
+DEFAULT_MAX_CONCURRENT_DOWNLOADS = 4
+
+
+class DownloadEntry(NamedTuple):
+    resource_id: str
+    # path relative to resource's `data/contents` directory
+    path: str
+    is_folder: bool = False
+
+
+class DownloadResult(NamedTuple):
+    entry: DownloadEntry
+    # None if download succeeded
+    error: Optional[Exception] = None
+    # absolute local paths of files written and, if known, their md5 checksums
+    paths: DownloadedFiles = {}
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+def _download_entry(
+    resource: Resource,
+    data_path: str,
+    entry: DownloadEntry,
+    content_index: Optional[ContentIndex] = None,
+) -> DownloadedFiles:
+    entity_type = EntityTypeEnum.FOLDER if entry.is_folder else EntityTypeEnum.FILE
+    return HydroShareEntityDownloadFactory.download(
+        entity_type, resource, data_path, entry.path, content_index
+    )
+
+
+def batch_download(
+    entries: Iterable[DownloadEntry],
+    get_resource: Callable[[str], Resource],
+    data_path: str,
+    executor: Executor,
+    content_index: Optional[ContentIndex] = None,
+) -> List[DownloadResult]:
+    """Download files and folders from one or more HydroShare resources concurrently using
+    `executor`. Each resource is resolved (`get_resource`) once. Blocks until all downloads finish
+    and returns a result per unique entry, in the order given. A failed entry does not fail others.
+    Files found in `content_index` are copied from local files instead of downloaded.
+    """
+    # drop duplicate entries, retain order
+    entries = list(dict.fromkeys(entries))
+
+    # resolve each resource once, before any downloads are submitted
+    resource_ids = list(dict.fromkeys(entry.resource_id for entry in entries))
+    resource_futures = {
+        resource_id: executor.submit(get_resource, resource_id)
+        for resource_id in resource_ids
+    }
+    wait(resource_futures.values())
+
+    results: Dict[DownloadEntry, DownloadResult] = dict()
+    download_futures = dict()
+    for entry in entries:
+        resource_future = resource_futures[entry.resource_id]
+        if resource_future.exception() is not None:
+            results[entry] = DownloadResult(entry, resource_future.exception())
+            continue
+        download_futures[entry] = executor.submit(
+            _download_entry,
+            resource_future.result(),
+            data_path,
+            entry,
+            content_index,
+        )
+
+    wait(download_futures.values())
+    for entry, future in download_futures.items():
+        error = future.exception()
+        if error is not None:
+            _log.error(f"failed to download {entry}: {error}")
+            results[entry] = DownloadResult(entry, error)
+        else:
+            results[entry] = DownloadResult(entry, paths=future.result())
+
+    return [results[entry] for entry in entries]
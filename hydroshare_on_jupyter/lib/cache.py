@@ -0,0 +1,82 @@
+from collections import OrderedDict
+import threading
+import time
+
+# typing imports
+from typing import Callable, Generic, Hashable, NamedTuple, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCacheWithTTL(Generic[K, V]):
+    """Thread safe, bounded, least recently used cache. Entries expire `ttl` seconds after they are
+    inserted. Hit and miss counts are reported by `cache_info` (a la `functools.lru_cache`).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: float = float("inf"),
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        # key: (insertion time, value)
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._timer = timer
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                inserted, value = entry
+                if self._timer() - inserted < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                # expired
+                del self._data[key]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._data[key] = (self._timer(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                # evict least recently used
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def peek(self, key: K) -> Optional[V]:
+        """Get value without affecting recency or hit and miss counts. Expiration is ignored."""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry[1] if entry is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,6 +1,8 @@
 from typing import Callable, Dict, List
 from enum import Enum
 
+from ..tracing import tracer
+
 
 class EventBroker:
     def __init__(self, event_types: Enum) -> None:
@@ -29,9 +31,20 @@ class EventBroker:
     def dispatch(self, event_name: str, *args, **kwargs) -> None:
         event_name = self._parse_enum(event_name)
 
-        if event_name in self.event_listeners:
+        if event_name not in self.event_listeners:
+            return
+
+        if not tracer.enabled:
             for fn in self.event_listeners[event_name]:
                 fn(*args, **kwargs)
+            return
+
+        # time each listener, resource id (if any) is the first argument
+        attributes = {"resource_id": args[0]} if args else {}
+        with tracer.span("EventBroker.dispatch", event=event_name, **attributes):
+            for fn in self.event_listeners[event_name]:
+                with tracer.span(_listener_name(fn)):
+                    fn(*args, **kwargs)
 
     def unsubscribe_all(self) -> None:
         for listeners in self.event_listeners.values():
@@ -46,3 +59,8 @@ class EventBroker:
         if isinstance(event_name, self._event_types):
             return event_name.name
         return event_name
+
+
+def _listener_name(fn: Callable) -> str:
+    # bound methods and functions have a qualified name, partials and callable objects may not
+    return getattr(fn, "__qualname__", None) or type(fn).__qualname__
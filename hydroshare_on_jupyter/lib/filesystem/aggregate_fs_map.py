@@ -1,41 +1,59 @@
-from dataclasses import dataclass
-from typing import Tuple, Union
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple, Union
 from pathlib import Path
 from hsclient import HydroShare
 
 from .fs_map import IFSMap, IEntityFSMap, LocalFSMap, RemoteFSMap
+from .ignore import DEFAULT_IGNORE_PATTERNS
 from .types import ResourceId, T
 from .exceptions import AggregateFSMapResourceMembershipError
 from .aggregate_fs_resource_map_sync_state import (
     AggregateFSResourceMapSyncState,
     AggregateFSResourceMapSyncStateCollection,
 )
+from .sync_state_tree import FolderSyncCounts, ResourceSyncStateTree
+from .content_index import ContentIndex
 
 
 @dataclass
 class AggregateFSMap(IFSMap, IEntityFSMap):
     local_map: LocalFSMap
     remote_map: RemoteFSMap
+    # folder level sync state trees, built when a resource's folders are first queried
+    _sync_trees: Dict[ResourceId, ResourceSyncStateTree] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    # index of local files by digest, built when first consulted before a download
+    _content_index: Optional[ContentIndex] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     # IFSMap implementations
 
     @classmethod
     def create_empty_map(
-        cls, fs_root: Union[Path, str], hydroshare: HydroShare
+        cls,
+        fs_root: Union[Path, str],
+        hydroshare: HydroShare,
+        ignore_patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS,
+        state_path: Optional[Union[Path, str]] = None,
     ) -> "AggregateFSMap":
         # create local and remote map instances
         remote_map = RemoteFSMap(fs_root, hydroshare)
-        local_map = LocalFSMap(fs_root)
+        local_map = LocalFSMap(fs_root, ignore_patterns, state_path)
 
         return cls(local_map=local_map, remote_map=remote_map)
 
     @classmethod
     def create_map(
-        cls, fs_root: Union[Path, str], hydroshare: HydroShare
+        cls,
+        fs_root: Union[Path, str],
+        hydroshare: HydroShare,
+        ignore_patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS,
     ) -> "AggregateFSMap":
         # create local and remote map instances
         remote_map = RemoteFSMap.create_map(fs_root, hydroshare)
-        local_map = LocalFSMap(fs_root)
+        local_map = LocalFSMap(fs_root, ignore_patterns)
 
         # `remote_map` only contains resources that user owns and are local in fs_root.
         # Add those resources to local map
@@ -50,12 +68,21 @@ class AggregateFSMap(IFSMap, IEntityFSMap):
 
     def delete_resource(self, resource_id: ResourceId) -> None:
         """Remove resource from local and remote FSMap instances"""
+        self._close_sync_tree(resource_id)
         self._map_fn(lambda o: o.delete_resource(resource_id))
 
     def update_resource(self, resource_id: ResourceId) -> None:
         """Update a local and remote resource"""
         self._map_fn(lambda o: o.update_resource(resource_id))
 
+    def evict_resource(self, resource_id: ResourceId) -> None:
+        """Release a resource from memory. Unlike `delete_resource`, local file digests are persisted
+        so a subsequent `add_resource` does not re-hash unchanged files. See
+        `LocalFSMap.evict_resource`."""
+        self._close_sync_tree(resource_id)
+        self.local_map.evict_resource(resource_id)
+        self.remote_map.delete_resource(resource_id)
+
     # IEntityFSMap implementations
 
     def add_resource_file(
@@ -102,7 +129,48 @@ class AggregateFSMap(IFSMap, IEntityFSMap):
         )
         raise AggregateFSMapResourceMembershipError(error_message)
 
+    def get_folder_sync_state(
+        self, resource_id: ResourceId, folder: str = ""
+    ) -> Optional[FolderSyncCounts]:
+        """Get sync status counts of a resource folder, relative to `data/contents`, and of its
+        immediate child folders. None if the folder does not contain any local or remote files.
+        See `ResourceSyncStateTree`."""
+        if resource_id not in self.local_map or resource_id not in self.remote_map:
+            error_message = (
+                f"ResourceID: {resource_id}, does not exist in local_map or remote_map.\n"
+                f"{self.local_map.keys()=}\n"
+                f"{self.remote_map.keys()=}"
+            )
+            raise AggregateFSMapResourceMembershipError(error_message)
+
+        local_resource = self.local_map[resource_id]
+        remote_resource = self.remote_map[resource_id]
+        tree = self._sync_trees.get(resource_id)
+        # resource maps are replaced when a resource is re-added
+        if (
+            tree is None
+            or tree.local_map is not local_resource
+            or tree.remote_map is not remote_resource
+        ):
+            self._close_sync_tree(resource_id)
+            tree = self._sync_trees[resource_id] = ResourceSyncStateTree(
+                local_resource, remote_resource
+            )
+        return tree.folder(folder)
+
+    def get_content_index(self, hardlinks: bool = False) -> ContentIndex:
+        """Get the index of local files, in all resources, by digest. See `ContentIndex`."""
+        if self._content_index is None:
+            self._content_index = ContentIndex(self.local_map)
+        self._content_index.hardlinks = hardlinks
+        return self._content_index
+
     # helper methods
+    def _close_sync_tree(self, resource_id: ResourceId) -> None:
+        tree = self._sync_trees.pop(resource_id, None)
+        if tree is not None:
+            tree.close()
+
     def _map_fn(self, fn, *args, **kwargs) -> Tuple[T]:
         """Map a function call over the LocalFSMap and RemoteFSMap. Results returned in that order."""
         res = []
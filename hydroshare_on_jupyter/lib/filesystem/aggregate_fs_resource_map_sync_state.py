@@ -3,6 +3,8 @@ from pydantic import BaseModel
 from pathlib import Path
 from typing import Set, List, TYPE_CHECKING
 from .fs_resource_map import LocalFSResourceMap, RemoteFSResourceMap
+from .array_sync_state import compare_resource_maps, use_arrays
+from ..tracing import traced
 
 # Avoid cyclic import
 if TYPE_CHECKING:
@@ -29,6 +31,7 @@ class AggregateFSResourceMapSyncState(BaseModel):
     in_sync: Set[Path]
 
     @classmethod
+    @traced()
     def from_resource_maps(
         cls,
         *,
@@ -39,19 +42,17 @@ class AggregateFSResourceMapSyncState(BaseModel):
         assert local_resource_map.resource_id == remote_resource_map.resource_id
         resource_id = local_resource_map.resource_id
 
-        local = set(local_resource_map.keys())
-        remote = set(remote_resource_map.keys())
-
-        only_local = local - remote
-        only_remote = remote - local
-
-        intersection = local & remote
-        out_of_sync = {
-            item
-            for item in intersection
-            if local_resource_map[item] != remote_resource_map[item]
-        }
-        in_sync = intersection - out_of_sync
+        if use_arrays(local_resource_map, remote_resource_map):
+            ((in_sync, out_of_sync, only_local, only_remote),) = compare_resource_maps(
+                [(local_resource_map, remote_resource_map)]
+            )
+        else:
+            # compare folder digests, only descending into folders whose contents differ
+            in_sync, out_of_sync, only_local, only_remote = (
+                local_resource_map.folder_digests.diff(
+                    remote_resource_map.folder_digests
+                )
+            )
 
         return cls(
             resource_id=resource_id,
@@ -74,11 +75,32 @@ class AggregateFSResourceMapSyncStateCollection(BaseModel):
 
         res_intersection = set(lm) & set(rm)
 
-        return cls.parse_obj(
-            [
-                AggregateFSResourceMapSyncState.from_resource_maps(
-                    local_resource_map=lm[res_id], remote_resource_map=rm[res_id]
-                )
-                for res_id in res_intersection
-            ]
+        # large resources are compared in one batch, see `compare_resource_maps`
+        batch = [
+            res_id for res_id in res_intersection if use_arrays(lm[res_id], rm[res_id])
+        ]
+        batch_sync_sets = (
+            compare_resource_maps([(lm[res_id], rm[res_id]) for res_id in batch])
+            if batch
+            else []
+        )
+
+        states = [
+            AggregateFSResourceMapSyncState(
+                resource_id=res_id,
+                in_sync=in_sync,
+                out_of_sync=out_of_sync,
+                only_local=only_local,
+                only_remote=only_remote,
+            )
+            for res_id, (in_sync, out_of_sync, only_local, only_remote) in zip(
+                batch, batch_sync_sets
+            )
+        ]
+        states.extend(
+            AggregateFSResourceMapSyncState.from_resource_maps(
+                local_resource_map=lm[res_id], remote_resource_map=rm[res_id]
+            )
+            for res_id in res_intersection - set(batch)
         )
+        return cls.parse_obj(states)
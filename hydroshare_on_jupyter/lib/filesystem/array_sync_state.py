@@ -0,0 +1,187 @@
+"""Vectorized comparison of large resource maps, using NumPy if it is installed.
+
+Each side (local or remote) of a batch of resources is stored as arrays sorted by path id, a 64 bit
+integer derived from the file path's hash and its resource's index in the batch. Files present on
+both sides are matched with `np.searchsorted`, and their MD5 digests compared as 16 byte values,
+so Python code only builds the arrays and the resulting sets of paths.
+
+Path ids may collide. Matched files' paths are compared to rule out false matches, and a batch
+whose ids collide is compared using sets instead.
+"""
+
+from pathlib import Path
+
+# typing imports
+from typing import List, Sequence, Set, Tuple, TYPE_CHECKING
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if TYPE_CHECKING:
+    from .fs_resource_map import FSResourceMap
+
+HAS_NUMPY = np is not None
+
+# resources with fewer files are compared using folder digests (see `FolderDigestTree`), their
+# arrays cost more to build than they save
+MIN_ARRAY_FILES = 50_000
+
+# paths of files (in_sync, out_of_sync, only_local, only_remote)
+FileSyncSets = Tuple[Set[Path], Set[Path], Set[Path], Set[Path]]
+
+# mixes a file's resource index into its path id, 2**64 / golden ratio
+_RESOURCE_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+class _PathIdCollision(Exception):
+    pass
+
+
+def use_arrays(
+    local_resource_map: "FSResourceMap", remote_resource_map: "FSResourceMap"
+) -> bool:
+    """Whether a resource should be compared using `compare_resource_maps`."""
+    return HAS_NUMPY and (
+        max(len(local_resource_map), len(remote_resource_map)) >= MIN_ARRAY_FILES
+    )
+
+
+class _ResourceMapArrays:
+    """Files of one side of a batch of resource maps, sorted by path id."""
+
+    __slots__ = ("ids", "resources", "paths", "digests")
+
+    def __init__(self, resource_maps: Sequence["FSResourceMap"]) -> None:
+        paths: List[Path] = []
+        digests: List[str] = []
+        sizes = []
+        for resource_map in resource_maps:
+            # copy, maps may be updated by other threads
+            data = dict(resource_map.data)
+            paths.extend(data)
+            digests.extend(data.values())
+            sizes.append(len(data))
+
+        resources = np.repeat(np.arange(len(sizes), dtype=np.uint64), sizes)
+        # paths cache their hash
+        ids = np.fromiter(map(hash, paths), dtype=np.int64, count=len(paths))
+        ids = ids.view(np.uint64) ^ (resources * np.uint64(_RESOURCE_MULTIPLIER))
+
+        order = np.argsort(ids)
+        self.ids = ids[order]
+        if np.any(self.ids[1:] == self.ids[:-1]):
+            raise _PathIdCollision
+        self.resources = resources[order]
+        self.paths = _object_array(paths)[order]
+        self.digests = _object_array(digests)[order]
+
+
+def compare_resource_maps(
+    resource_map_pairs: Sequence[Tuple["FSResourceMap", "FSResourceMap"]],
+) -> List[FileSyncSets]:
+    """Compare a batch of (local, remote) resource map pairs in one vectorized pass. Returns the
+    sync sets of each pair, in order. Requires NumPy."""
+    if np is None:
+        raise RuntimeError("comparing resource maps with arrays requires numpy")
+
+    n_resources = len(resource_map_pairs)
+    try:
+        local = _ResourceMapArrays([local for local, _ in resource_map_pairs])
+        remote = _ResourceMapArrays([remote for _, remote in resource_map_pairs])
+    except _PathIdCollision:
+        return [_compare_sets(local, remote) for local, remote in resource_map_pairs]
+
+    # index of each remote file's match in the local arrays, if it exists
+    n_local = len(local.ids)
+    matches = np.minimum(np.searchsorted(local.ids, remote.ids), max(n_local - 1, 0))
+    if n_local:
+        in_local = local.ids[matches] == remote.ids
+    else:
+        in_local = np.zeros(len(remote.ids), dtype=bool)
+    matches = matches[in_local]
+    if not (
+        np.array_equal(local.resources[matches], remote.resources[in_local])
+        and np.array_equal(
+            _path_strings(local.paths[matches]), _path_strings(remote.paths[in_local])
+        )
+    ):
+        # path ids collided
+        return [_compare_sets(local, remote) for local, remote in resource_map_pairs]
+
+    in_remote = np.zeros(n_local, dtype=bool)
+    in_remote[matches] = True
+
+    # compare digests of files on both sides
+    local_digests, remote_digests = _encode_digests(
+        local.digests[matches], remote.digests[in_local]
+    )
+    in_sync = np.zeros(n_local, dtype=bool)
+    in_sync[matches[np.all(local_digests == remote_digests, axis=1)]] = True
+
+    return list(
+        zip(
+            _split_by_resource(local, in_sync, n_resources),
+            _split_by_resource(local, in_remote & ~in_sync, n_resources),
+            _split_by_resource(local, ~in_remote, n_resources),
+            _split_by_resource(remote, ~in_local, n_resources),
+        )
+    )
+
+
+# helpers
+
+
+def _encode_digests(*digests: "np.ndarray") -> Tuple["np.ndarray", ...]:
+    """Encode arrays of hexadecimal MD5 digests as (n, 2) arrays of 64 bit integers, so digests
+    are compared as 16 byte values. Digests that are not all lowercase hexadecimal MD5 digests
+    are compared as strings."""
+    joined = ["".join(d) for d in digests]
+    if all(len(j) == 32 * len(d) and j.lower() == j for j, d in zip(joined, digests)):
+        try:
+            return tuple(
+                np.frombuffer(bytes.fromhex(j), dtype=np.uint64).reshape(-1, 2)
+                for j in joined
+            )
+        except ValueError:
+            pass
+    return tuple(np.array(d.tolist(), dtype=str).reshape(-1, 1) for d in digests)
+
+
+def _object_array(values: List) -> "np.ndarray":
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _path_strings(paths: "np.ndarray") -> "np.ndarray":
+    # compared as strings, `Path.__eq__` is slower
+    return np.array(list(map(str, paths)), dtype=str)
+
+
+def _split_by_resource(
+    arrays: _ResourceMapArrays, mask: "np.ndarray", n_resources: int
+) -> List[Set[Path]]:
+    """Paths of selected files, grouped by resource."""
+    resources = arrays.resources[mask]
+    order = np.argsort(resources, kind="stable")
+    selected = arrays.paths[mask][order]
+    bounds = np.searchsorted(
+        resources[order], np.arange(n_resources + 1, dtype=np.uint64)
+    )
+    return [set(selected[start:end].tolist()) for start, end in zip(bounds, bounds[1:])]
+
+
+def _compare_sets(
+    local_resource_map: "FSResourceMap", remote_resource_map: "FSResourceMap"
+) -> FileSyncSets:
+    local = set(local_resource_map.keys())
+    remote = set(remote_resource_map.keys())
+    intersection = local & remote
+    out_of_sync = {
+        path
+        for path in intersection
+        if local_resource_map[path] != remote_resource_map[path]
+    }
+    return intersection - out_of_sync, out_of_sync, local - remote, remote - local
@@ -0,0 +1,201 @@
+"""Content addressed index of local resource files, so files that already exist locally, in any
+resource, are not downloaded from HydroShare again.
+
+`ContentIndex` maps MD5 digests to the files of every local resource map. It is built on first use
+and kept up to date by observing the resource maps (see `FSResourceMap.subscribe`). Before a file is
+downloaded, `ContentIndex.materialize` writes it from an identical local file: a hard link (if
+enabled), a reflink (copy on write clone, i.e. btrfs and xfs), or a copy.
+"""
+
+from functools import partial
+from pathlib import Path
+import logging
+import os
+import shutil
+import sys
+import threading
+
+# typing imports
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .types import MD5Hash, ResourceId
+from ...models.api_models import DedupStatistics
+
+if TYPE_CHECKING:
+    from .fs_map import LocalFSMap
+    from .fs_resource_map import FileChangeObserver, LocalFSResourceMap
+
+_log = logging.getLogger(__name__)
+
+# linux ioctl that clones a file's extents into another file
+_FICLONE = 0x40049409 if sys.platform.startswith("linux") else None
+
+# how a file was written from a local file with the same contents
+EXISTING = "existing"
+HARDLINK = "hardlink"
+REFLINK = "reflink"
+COPY = "copy"
+
+
+# `DedupStatistics` counter of each method
+_METHOD_COUNTERS = {
+    EXISTING: "existing",
+    HARDLINK: "hardlinked",
+    REFLINK: "reflinked",
+    COPY: "copied",
+}
+
+
+class ContentIndex:
+    """Index of the files of a `LocalFSMap`'s resources by MD5 digest.
+
+    Resource maps added to, or removed from, the `LocalFSMap` are indexed, or dropped, the next time
+    the index is queried. Indexed digests may be stale (i.e. a file modified since it was hashed),
+    so a candidate file's digest is checked before it is used.
+    """
+
+    def __init__(self, local_map: "LocalFSMap", hardlinks: bool = False) -> None:
+        self.local_map = local_map
+        # hard link files instead of copying them. hard linked files share their contents, an
+        # in-place modification of one modifies the other
+        self.hardlinks = hardlinks
+        self.statistics = DedupStatistics()
+        # digest: (resource id, path relative to the resource's base directory) of local files
+        self._files: Dict[MD5Hash, Set[Tuple[ResourceId, Path]]] = dict()
+        self._resource_maps: Dict[
+            ResourceId, Tuple["LocalFSResourceMap", "FileChangeObserver"]
+        ] = dict()
+        # resource maps are changed by watchdog observer threads
+        self._lock = threading.Lock()
+
+    def find(self, md5: MD5Hash) -> List[Tuple["LocalFSResourceMap", Path]]:
+        """Indexed files whose digest is `md5`, as (resource map, path relative to its base
+        directory)."""
+        with self._lock:
+            self._refresh()
+            return [
+                (self._resource_maps[resource_id][0], path)
+                for resource_id, path in self._files.get(md5, ())
+            ]
+
+    def materialize(self, md5: MD5Hash, destination: Path) -> Optional[str]:
+        """Write a file whose digest is `md5` to `destination` from an identical local file.
+        Returns how the file was written (`EXISTING`, `HARDLINK`, `REFLINK`, or `COPY`), or None if
+        no local file has the same contents."""
+        destination = Path(destination)
+        for resource_map, path in self.find(md5):
+            if resource_map.current_digest(path) != md5:
+                continue
+            source = resource_map.base_directory / path
+            try:
+                size = source.stat().st_size
+                if destination.exists() and os.path.samefile(source, destination):
+                    method = EXISTING
+                else:
+                    method = _clone(source, destination, self.hardlinks)
+            except OSError as e:
+                _log.warning(f"could not write {destination} from {source}: {e}")
+                continue
+
+            with self._lock:
+                self._record(method, size)
+            _log.info(f"{destination} written from {source} ({method}), not downloaded")
+            return method
+        return None
+
+    def close(self) -> None:
+        """Stop observing the indexed resource maps."""
+        with self._lock:
+            for resource_id in list(self._resource_maps):
+                self._drop(resource_id)
+
+    # helpers
+
+    def _record(self, method: str, size: int) -> None:
+        statistics = self.statistics
+        statistics.files += 1
+        statistics.bytes_avoided += size
+        counter = _METHOD_COUNTERS[method]
+        setattr(statistics, counter, getattr(statistics, counter) + 1)
+
+    def _refresh(self) -> None:
+        resource_maps = dict(self.local_map.data)
+        for resource_id, (resource_map, _) in list(self._resource_maps.items()):
+            if resource_maps.get(resource_id) is not resource_map:
+                self._drop(resource_id)
+        for resource_id, resource_map in resource_maps.items():
+            if resource_id not in self._resource_maps:
+                self._index(resource_id, resource_map)
+
+    def _index(
+        self, resource_id: ResourceId, resource_map: "LocalFSResourceMap"
+    ) -> None:
+        observer = partial(self._changed, resource_id)
+        self._resource_maps[resource_id] = (resource_map, observer)
+        # subscribe before reading the map's files. changes made while the map is indexed wait for
+        # the lock, and are applied afterwards
+        resource_map.subscribe(observer)
+        for path, digest in dict(resource_map.data).items():
+            self._files.setdefault(digest, set()).add((resource_id, path))
+
+    def _drop(self, resource_id: ResourceId) -> None:
+        resource_map, observer = self._resource_maps.pop(resource_id)
+        resource_map.unsubscribe(observer)
+        for path, digest in dict(resource_map.data).items():
+            self._discard(digest, (resource_id, path))
+
+    def _changed(
+        self,
+        resource_id: ResourceId,
+        path: Path,
+        previous: Optional[MD5Hash],
+        digest: Optional[MD5Hash],
+    ) -> None:
+        with self._lock:
+            if previous is not None:
+                self._discard(previous, (resource_id, path))
+            if digest is not None:
+                self._files.setdefault(digest, set()).add((resource_id, path))
+
+    def _discard(self, digest: MD5Hash, entry: Tuple[ResourceId, Path]) -> None:
+        entries = self._files.get(digest)
+        if entries is not None:
+            entries.discard(entry)
+            if not entries:
+                del self._files[digest]
+
+
+def _clone(source: Path, destination: Path, hardlink: bool) -> str:
+    """Write `source`'s contents to `destination`. Returns how it was written."""
+    # replace, rather than write through, an existing destination. it may be a hard link
+    if destination.exists() or destination.is_symlink():
+        destination.unlink()
+    if hardlink:
+        try:
+            os.link(source, destination)
+            return HARDLINK
+        except OSError:
+            # i.e. source on a different file system
+            pass
+    if _reflink(source, destination):
+        return REFLINK
+    shutil.copyfile(source, destination)
+    return COPY
+
+
+def _reflink(source: Path, destination: Path) -> bool:
+    """Clone `source` to `destination`, sharing their data blocks until either is modified. False
+    if the file system does not support it."""
+    if fcntl is None or _FICLONE is None:
+        return False
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,169 @@
+from hashlib import md5
+from pathlib import Path
+import threading
+
+# typing imports
+from typing import Dict, Iterator, Mapping, Optional, Set, Tuple, TYPE_CHECKING
+
+from .types import MD5Hash
+
+if TYPE_CHECKING:
+    from .fs_resource_map import FSResourceMap
+
+
+class _Folder:
+    __slots__ = ("files", "folders", "digest")
+
+    def __init__(self) -> None:
+        # immediate child files, keyed by their path in the resource map
+        self.files: Dict[Path, MD5Hash] = dict()
+        self.folders: Dict[str, "_Folder"] = dict()
+        # digest of the folder's entries, None if a descendant changed since it was computed
+        self.digest: Optional[str] = None
+
+    def compute_digest(self) -> str:
+        """Folder digest, derived from the name and digest of each child file and folder. Only
+        folders that changed since their digest was last computed are re-hashed."""
+        if self.digest is None:
+            entries = [f"f/{path.name}/{digest}" for path, digest in self.files.items()]
+            entries.extend(
+                f"d/{name}/{folder.compute_digest()}"
+                for name, folder in self.folders.items()
+            )
+            entries.sort()
+            self.digest = md5("\n".join(entries).encode("utf-8")).hexdigest()
+        return self.digest
+
+    def iter_files(self) -> Iterator[Path]:
+        yield from self.files
+        for folder in self.folders.values():
+            yield from folder.iter_files()
+
+
+class FolderDigestTree:
+    """Merkle tree over the files of a resource map (file path: MD5 digest). Each folder's digest
+    is derived from the names and digests of its files and folders, so two trees' folders with
+    equal digests have identical contents.
+
+    File changes invalidate the digests of the file's ancestor folders only, O(depth); digests
+    are re-computed lazily. `diff` compares two trees, descending only into folders whose digests
+    differ, so comparing resource maps is proportional to the amount of change, not the number of
+    files.
+
+    Use `FolderDigestTree.observing` to maintain a tree as a resource map changes.
+    """
+
+    def __init__(self, files: Optional[Mapping[Path, MD5Hash]] = None) -> None:
+        self._root = _Folder()
+        self._lock = threading.Lock()
+        for path, digest in (files or {}).items():
+            self._set(path, digest)
+
+    @classmethod
+    def observing(cls, resource_map: "FSResourceMap") -> "FolderDigestTree":
+        """Build a tree of a resource map's files, that is updated as the map changes."""
+        tree = cls()
+        with tree._lock:
+            # subscribe before reading the map's files. changes made while the tree is built wait
+            # for the lock, and are applied afterwards
+            resource_map.subscribe(tree._changed)
+            for path, digest in dict(resource_map.data).items():
+                tree._set(path, digest)
+        return tree
+
+    @property
+    def digest(self) -> str:
+        """Digest of the whole tree."""
+        with self._lock:
+            return self._root.compute_digest()
+
+    def set(self, path: Path, digest: Optional[MD5Hash]) -> None:
+        """Add or update a file. A `digest` of None removes the file."""
+        with self._lock:
+            self._set(path, digest)
+
+    def diff(
+        self, other: "FolderDigestTree"
+    ) -> Tuple[Set[Path], Set[Path], Set[Path], Set[Path]]:
+        """Compare with another tree. Returns the paths of files (in_sync, out_of_sync, only_self,
+        only_other)."""
+        in_sync, out_of_sync, only_self, only_other = set(), set(), set(), set()
+        if other is self:
+            with self._lock:
+                in_sync.update(self._root.iter_files())
+            return in_sync, out_of_sync, only_self, only_other
+
+        # lock order is arbitrary but consistent, so concurrent diffs of the same trees cannot
+        # deadlock
+        first, second = sorted((self, other), key=id)
+        with first._lock, second._lock:
+            pending = [(self._root, other._root)]
+            while pending:
+                folder, other_folder = pending.pop()
+                if folder.compute_digest() == other_folder.compute_digest():
+                    in_sync.update(folder.iter_files())
+                    continue
+
+                files, other_files = folder.files, other_folder.files
+                for path, digest in files.items():
+                    other_digest = other_files.get(path)
+                    if other_digest is None:
+                        only_self.add(path)
+                    elif other_digest == digest:
+                        in_sync.add(path)
+                    else:
+                        out_of_sync.add(path)
+                only_other.update(path for path in other_files if path not in files)
+
+                for name, child in folder.folders.items():
+                    other_child = other_folder.folders.get(name)
+                    if other_child is None:
+                        only_self.update(child.iter_files())
+                    else:
+                        pending.append((child, other_child))
+                for name, other_child in other_folder.folders.items():
+                    if name not in folder.folders:
+                        only_other.update(other_child.iter_files())
+
+        return in_sync, out_of_sync, only_self, only_other
+
+    # helpers
+
+    def _changed(
+        self, path: Path, previous: Optional[MD5Hash], digest: Optional[MD5Hash]
+    ) -> None:
+        self.set(path, digest)
+
+    def _set(self, path: Path, digest: Optional[MD5Hash]) -> None:
+        ancestors = [self._root]
+        for part in path.parent.parts:
+            folder = ancestors[-1].folders.get(part)
+            if folder is None:
+                if digest is None:
+                    # removed file is not in the tree
+                    return
+                folder = ancestors[-1].folders[part] = _Folder()
+            ancestors.append(folder)
+
+        files = ancestors[-1].files
+        if digest is None:
+            if files.pop(path, None) is None:
+                return
+        elif files.get(path) == digest:
+            return
+        else:
+            files[path] = digest
+
+        for folder in ancestors:
+            folder.digest = None
+
+        # prune folders that no longer contain files
+        if digest is None:
+            for parent, part, folder in zip(
+                reversed(ancestors[:-1]),
+                reversed(path.parent.parts),
+                reversed(ancestors[1:]),
+            ):
+                if folder.files or folder.folders:
+                    break
+                del parent.folders[part]
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from collections import UserDict
 from pathlib import Path
-from typing import List, Union
+from typing import Dict, Iterable, List, Optional, Union
 from hsclient import HydroShare
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -10,7 +10,9 @@ from .fs_resource_map import (
     LocalFSResourceMap,
 )
 
-from .types import ResourceId
+from .ignore import DEFAULT_IGNORE_PATTERNS
+from .resource_state import EvictedResourceState
+from .types import MD5Hash, ResourceId
 
 
 # Abstract Interfaces
@@ -102,19 +104,34 @@ class LocalFSMap(FSMap, IEntityFSMap):
     """Class representing the relationship between *local* HydroShare resources', resource files,
     and resource MD5 Hashes."""
 
-    def __init__(self, fs_root: Union[str, Path]) -> None:
+    def __init__(
+        self,
+        fs_root: Union[str, Path],
+        ignore_patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS,
+        state_path: Optional[Union[str, Path]] = None,
+    ) -> None:
         super().__init__()
         self.fs_root = Path(fs_root).expanduser().resolve()
+        # gitignore-style patterns of files that are not tracked, see `IgnoreMatcher`
+        self.ignore_patterns = tuple(ignore_patterns)
+        # directory where the file digests of evicted resources are persisted, see `evict_resource`
+        self.state_path = Path(state_path) if state_path is not None else None
 
     # override
     @classmethod
-    def create_map(cls, fs_root: Union[Path, str]) -> "LocalFSMap":
+    def create_map(
+        cls,
+        fs_root: Union[Path, str],
+        ignore_patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS,
+    ) -> "LocalFSMap":
         # create class instance
-        fs_map = cls(fs_root)
+        fs_map = cls(fs_root, ignore_patterns)
 
         for resource in fs_map._get_resource_ids():
             # create new instance of LocalFSResourceMap
-            fs_map[resource] = LocalFSResourceMap(fs_map.fs_root / resource)
+            fs_map[resource] = LocalFSResourceMap(
+                fs_map.fs_root / resource, fs_map.ignore_patterns
+            )
 
         return fs_map
 
@@ -123,11 +140,50 @@ class LocalFSMap(FSMap, IEntityFSMap):
         be direct child directory of `fs_root`."""
         if resource_id not in self.data:
             # create new local resource map
-            r_map = LocalFSResourceMap.from_resource_path(self.fs_root / resource_id)
+            r_map = LocalFSResourceMap(self.fs_root / resource_id, self.ignore_patterns)
+            # reuse digests of unchanged files if the resource was previously evicted
+            state = self._pop_evicted_state(resource_id)
+            if state is not None:
+                r_map.restore_digest_state(state.files)
+            r_map.update_resource()
 
             # add local resource map to dictionary
             self.data[resource_id] = r_map
 
+    def evict_resource(self, resource_id: ResourceId) -> None:
+        """Remove LocalFSResourceMap instance, persisting its cached file digests to `state_path`
+        (if set) so the resource is re-added quickly by `add_resource`."""
+        r_map = self.data.pop(resource_id, None)
+        if r_map is None or self.state_path is None:
+            return
+        state = EvictedResourceState(
+            resource_id=resource_id, files=r_map.digest_state()
+        )
+        self.state_path.mkdir(parents=True, exist_ok=True)
+        state.save(self._evicted_state_file(resource_id))
+
+    def seed_resource(
+        self, resource_id: ResourceId, manifest: Dict[Path, MD5Hash]
+    ) -> List[Path]:
+        """Add or update a LocalFSResourceMap using the digests from a bag manifest. Existing
+        LocalFSResourceMap instances are updated in place. Returns the seeded file paths. See
+        `LocalFSResourceMap.seed_from_manifest`."""
+        if resource_id not in self.data:
+            self.data[resource_id] = LocalFSResourceMap(
+                self.fs_root / resource_id, self.ignore_patterns
+            )
+        return self.data[resource_id].seed_from_manifest(manifest)
+
+    def set_resource_file_digest(
+        self,
+        resource_id: ResourceId,
+        relative_resource_file: Union[Path, str],
+        digest: MD5Hash,
+    ) -> None:
+        """Add or update a file in a LocalFSResourceMap using a known md5 digest."""
+        if resource_id in self.data:
+            self.data[resource_id].set_file_digest(relative_resource_file, digest)
+
     def add_resource_file(
         self, resource_id: ResourceId, relative_resource_file: Union[Path, str]
     ) -> None:
@@ -148,6 +204,25 @@ class LocalFSMap(FSMap, IEntityFSMap):
         if resource_id in self.data:
             self.data[resource_id].delete_file(relative_resource_file)
 
+    def _evicted_state_file(self, resource_id: ResourceId) -> Path:
+        return self.state_path / f"{resource_id}.json"
+
+    def _pop_evicted_state(
+        self, resource_id: ResourceId
+    ) -> Optional[EvictedResourceState]:
+        if self.state_path is None:
+            return None
+        state_file = self._evicted_state_file(resource_id)
+        state = EvictedResourceState.load(state_file)
+        # state is only valid for a single rehydration, the map is the source of truth afterwards
+        try:
+            state_file.unlink()
+        except FileNotFoundError:
+            pass
+        if state is None or state.resource_id != resource_id:
+            return None
+        return state
+
 
 class RemoteFSMap(FSMap):
     """Class representing the relationship between remote HydroShare resource's, resource files, and
@@ -215,3 +290,11 @@ class RemoteFSMap(FSMap):
             res_map = RemoteFSResourceMap.from_resource(res)
 
             self.data[resource_id] = res_map
+
+    def apply_resource_checksums(
+        self, resource_id: ResourceId, checksums: Dict[str, MD5Hash]
+    ) -> None:
+        """Optimistically update a RemoteFSResourceMap with known file checksums. See
+        `RemoteFSResourceMap.apply_checksums`."""
+        if resource_id in self.data:
+            self.data[resource_id].apply_checksums(checksums)
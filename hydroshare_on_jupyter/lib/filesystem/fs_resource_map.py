@@ -1,11 +1,26 @@
 from abc import ABC, abstractmethod
 from collections import UserDict
-from typing import List, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from hsclient import Resource
 from pathlib import Path
+from urllib.parse import quote
+import os
+import time
 
 # local imports
 from .utilities import compute_file_md5_hexdigest, get_resource_checksums
+from .folder_digests import FolderDigestTree
+from .ignore import DEFAULT_IGNORE_PATTERNS, IGNORE_FILENAME, IgnoreMatcher
+from .types import MD5Hash
+from ..tracing import span
+
+# files modified within this many nanoseconds of being hashed may be modified again without their
+# mtime changing. their digests are not cached (see `LocalFSResourceMap._remember_digest`)
+_RACY_WINDOW_NS = 2_000_000_000
+
+# called with a file's path, previous digest, and new digest after the file changes in a resource
+# map. the previous digest of an added file, and the new digest of a removed file, are None
+FileChangeObserver = Callable[[Path, Optional[MD5Hash], Optional[MD5Hash]], None]
 
 
 # abstract interfaces
@@ -39,11 +54,75 @@ class IEntityFSResourceMap(ABC):
 
 
 class FSResourceMap(UserDict, IFSResourceMap):
+    """File path to MD5 digest mapping. File changes made through the mapping interface, or by
+    replacing `data`, are reported to observers (see `subscribe`)."""
+
+    # see `subscribe`. replaced, not mutated, so observers can be notified from any thread
+    _observers: Tuple[FileChangeObserver, ...] = ()
+    # see `folder_digests`
+    _folder_digests: Optional[FolderDigestTree] = None
+
     @property
     def files(self) -> List[Path]:
         """Return list of files in resource."""
         return list(self.data.keys())
 
+    @property
+    def folder_digests(self) -> FolderDigestTree:
+        """Merkle tree of the resource's folder digests. Built on first access, then updated as
+        files change."""
+        if self._folder_digests is None:
+            self._folder_digests = FolderDigestTree.observing(self)
+        return self._folder_digests
+
+    # `data` is stored in the instance dictionary, under its own name, as `UserDict` expects
+    @property
+    def data(self) -> Dict[Path, MD5Hash]:
+        return self.__dict__["data"]
+
+    @data.setter
+    def data(self, data: Dict[Path, MD5Hash]) -> None:
+        previous = self.__dict__.get("data")
+        self.__dict__["data"] = data
+        if self._observers and previous is not None:
+            # report the difference, files whose digests are unchanged are not reported
+            for path, digest in data.items():
+                previous_digest = previous.get(path)
+                if previous_digest != digest:
+                    self._notify(path, previous_digest, digest)
+            for path, previous_digest in previous.items():
+                if path not in data:
+                    self._notify(path, previous_digest, None)
+
+    def __setitem__(self, path: Path, digest: MD5Hash) -> None:
+        data = self.data
+        previous_digest = data.get(path)
+        data[path] = digest
+        if self._observers and previous_digest != digest:
+            self._notify(path, previous_digest, digest)
+
+    def __delitem__(self, path: Path) -> None:
+        previous_digest = self.data.pop(path)
+        if self._observers:
+            self._notify(path, previous_digest, None)
+
+    def subscribe(self, observer: FileChangeObserver) -> None:
+        """Call `observer` after each file is added, removed, or its digest changes. Observers are
+        called on the thread that changed the map."""
+        self._observers = (*self._observers, observer)
+
+    def unsubscribe(self, observer: FileChangeObserver) -> None:
+        self._observers = tuple(o for o in self._observers if o != observer)
+
+    def _notify(
+        self,
+        path: Path,
+        previous_digest: Optional[MD5Hash],
+        digest: Optional[MD5Hash],
+    ) -> None:
+        for observer in self._observers:
+            observer(path, previous_digest, digest)
+
 
 # concrete implementations
 
@@ -51,44 +130,172 @@ class FSResourceMap(UserDict, IFSResourceMap):
 class LocalFSResourceMap(FSResourceMap, IEntityFSResourceMap):
     """Concrete class representing the relationship between a local file (not directory) path to the file's MD5 Hash."""
 
-    def __init__(self, resource_path: Union[Path, str]) -> None:
+    def __init__(
+        self,
+        resource_path: Union[Path, str],
+        ignore_patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS,
+    ) -> None:
         super().__init__()
         self.resource_path = Path(resource_path).expanduser().resolve()
         self.resource_id = resource_path.name
+        # global ignore patterns, extended by the resource's ignore file
+        self.ignore_patterns = tuple(ignore_patterns)
+        self.ignore = self._load_ignore()
+        # relative file path: (size, mtime_ns, digest). file digests are reused if stat is unchanged
+        self._digest_cache: Dict[Path, Tuple[int, int, MD5Hash]] = dict()
 
     @classmethod
     def from_resource_path(
-        cls, resource_path: Union[Path, str]
+        cls,
+        resource_path: Union[Path, str],
+        ignore_patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS,
     ) -> "LocalFSResourceMap":
         # create class instance
-        fsresource_map = cls(resource_path)
+        fsresource_map = cls(resource_path, ignore_patterns)
 
         fsresource_map.update_resource()
         return fsresource_map
 
     def add_file(self, relative_resource_file: Union[Path, str]) -> None:
+        if self._is_ignore_file(relative_resource_file):
+            # ignored files may now be included, included files may now be ignored
+            self.update_resource()
+            return
         if self._valid_resource_file(relative_resource_file) and not self._is_member(
             relative_resource_file
         ):
             self._insert(relative_resource_file)
 
     def update_file(self, relative_resource_file: Union[Path, str]) -> None:
+        if self._is_ignore_file(relative_resource_file):
+            self.update_resource()
+            return
         if self._is_member(relative_resource_file):
             self._insert(relative_resource_file)
 
     def delete_file(self, relative_resource_file: Union[Path, str]) -> None:
+        if self._is_ignore_file(relative_resource_file):
+            self.update_resource()
+            return
         if self._is_member(relative_resource_file):
             relative_resource_file = self._as_child_of_base_directory(
                 relative_resource_file
             )
-            del self.data[relative_resource_file]
+            # digest cache entry is retained, a file may be deleted and re-created (i.e. editor
+            # atomic saves) without its contents changing
+            del self[relative_resource_file]
 
     def update_resource(self) -> None:
-        # clear data dictionary
-        self.data = dict()
-        for resource_file in self.contents_path.glob("**/*"):
-            # insert relative file path to contents_path and md5 digest
-            self._insert(resource_file)
+        with span("LocalFSResourceMap.update_resource", resource_id=self.resource_id):
+            self.ignore = self._load_ignore()
+            # replace data dictionary once built, so observers only see files that changed
+            data = dict()
+            for resource_file in self._iter_files():
+                # relative file path to contents_path and md5 digest
+                entry = self._digest_entry(resource_file)
+                if entry is not None:
+                    data[entry[0]] = entry[1]
+            self.data = data
+            self._prune_digest_cache()
+
+    def set_file_digest(
+        self, relative_resource_file: Union[Path, str], digest: MD5Hash
+    ) -> None:
+        """Add or update a file using a known md5 digest (i.e. computed while the file was
+        downloaded) instead of reading the file."""
+        abs_path = self._abs_path(relative_resource_file)
+        if not self._valid_resource_file(abs_path):
+            return
+        truncated_path = abs_path.relative_to(self.base_directory)
+        self._remember_digest(truncated_path, abs_path.stat(), digest, trusted=True)
+        self[truncated_path] = digest
+
+    def seed_from_manifest(self, manifest: Dict[Path, MD5Hash]) -> List[Path]:
+        """Update entire resource map, trusting the digests of files listed in a bag manifest
+        (relative file path: MD5 checksum) instead of reading them. Use directly after a resource
+        bag is extracted. Local files not listed in the manifest are hashed. Returns the relative
+        paths of the seeded, unverified, files."""
+        self.ignore = self._load_ignore()
+        data = dict()
+        seeded = []
+        for resource_file in self._iter_files():
+            if not self._valid_resource_file(resource_file):
+                continue
+            truncated_path = self._as_child_of_base_directory(resource_file)
+            stat = resource_file.stat()
+            digest = manifest.get(truncated_path)
+            if digest is None:
+                digest = compute_file_md5_hexdigest(resource_file)
+                self._remember_digest(truncated_path, stat, digest)
+            else:
+                # cached with the file's stat, so later updates do not re-hash the file
+                self._remember_digest(truncated_path, stat, digest, trusted=True)
+                seeded.append(truncated_path)
+            data[truncated_path] = digest
+
+        self.data = data
+        self._prune_digest_cache()
+        return seeded
+
+    def verify_files(self, relative_resource_files: Iterable[Path]) -> List[Path]:
+        """Re-hash files and update digests that differ from the map. Returns the relative paths of
+        files whose digest changed."""
+        changed = []
+        for resource_file in relative_resource_files:
+            digest = self.data.get(resource_file)
+            if digest is None or not self._valid_resource_file(resource_file):
+                continue
+            abs_path = self._abs_path(resource_file)
+            actual = compute_file_md5_hexdigest(abs_path)
+            if actual != digest:
+                self._remember_digest(resource_file, abs_path.stat(), actual)
+                self[resource_file] = actual
+                changed.append(resource_file)
+        return changed
+
+    def file_size(self, relative_resource_file: Path) -> Optional[int]:
+        """Size in bytes of a file in the map (path relative to the base directory). Read from the
+        file's cached digest if it is current, otherwise from the file system. None if the file
+        does not exist."""
+        entry = self._digest_cache.get(relative_resource_file)
+        if entry is not None and self.data.get(relative_resource_file) == entry[2]:
+            return entry[0]
+        try:
+            return (self.base_directory / relative_resource_file).stat().st_size
+        except OSError:
+            return None
+
+    def current_digest(self, relative_resource_file: Path) -> Optional[MD5Hash]:
+        """Digest of a file's current contents (path relative to the base directory). Read from
+        the file's cached digest if its size and mtime are unchanged, otherwise the file is hashed.
+        None if the file does not exist."""
+        abs_path = self.base_directory / relative_resource_file
+        try:
+            stat = abs_path.stat()
+        except OSError:
+            return None
+        digest = self._cached_digest(relative_resource_file, stat)
+        if digest is None:
+            try:
+                digest = MD5Hash(compute_file_md5_hexdigest(abs_path))
+            except OSError:
+                return None
+        return digest
+
+    def digest_state(self) -> Dict[str, Tuple[int, int, MD5Hash]]:
+        """Return the cached digests of files in the map as (size, mtime_ns, digest), keyed by posix
+        path relative to the base directory. See `restore_digest_state`."""
+        return {
+            path.as_posix(): entry
+            for path, entry in self._digest_cache.items()
+            if self.data.get(path) == entry[2]
+        }
+
+    def restore_digest_state(self, state: Dict[str, Tuple[int, int, MD5Hash]]) -> None:
+        """Restore cached digests returned by `digest_state`. Entries are only used for files whose
+        size and mtime are unchanged; call before `update_resource`."""
+        for path, (size, mtime_ns, digest) in state.items():
+            self._digest_cache[Path(path)] = (size, mtime_ns, MD5Hash(digest))
 
     @property
     def base_directory(self) -> Path:
@@ -103,7 +310,36 @@ class LocalFSResourceMap(FSResourceMap, IEntityFSResourceMap):
         """Return assumed path to resource data (i.e. `/some/path/{resource_id}/{resource_id}/data/contents`)"""
         return self.base_directory / "data" / "contents"
 
+    def is_ignored(self, resource_file: Union[Path, str]) -> bool:
+        """Return True if a file matches the resource's ignore patterns. Files outside of the
+        resource's `data/contents` directory are not ignored."""
+        try:
+            relative_path = self._as_child_of_contents_path(resource_file)
+        except ValueError:
+            return False
+        return self.ignore.matches(relative_path.as_posix())
+
     # Helper methods
+    def _load_ignore(self) -> IgnoreMatcher:
+        return IgnoreMatcher.from_file(
+            self.contents_path / IGNORE_FILENAME, self.ignore_patterns
+        )
+
+    def _is_ignore_file(self, resource_file: Union[Path, str]) -> bool:
+        return self._abs_path(resource_file) == self.contents_path / IGNORE_FILENAME
+
+    def _iter_files(self) -> Iterator[Path]:
+        """Walk files in `contents_path`, skipping ignored directories."""
+        for root, dirs, files in os.walk(self.contents_path):
+            relative_root = Path(root).relative_to(self.contents_path).as_posix()
+            prefix = "" if relative_root == "." else f"{relative_root}/"
+            # prune ignored directories, their contents are never read
+            dirs[:] = [
+                d for d in dirs if not self.ignore.matches(f"{prefix}{d}", is_dir=True)
+            ]
+            for file in files:
+                yield Path(root) / file
+
     def _abs_path(self, resource_file: Union[Path, str]) -> Path:
         resource_file = Path(resource_file)
         return (
@@ -124,6 +360,7 @@ class LocalFSResourceMap(FSResourceMap, IEntityFSResourceMap):
             abs_path.is_file()
             and not abs_path.is_symlink()
             and self._is_child_of_contents_path(abs_path)
+            and not self.is_ignored(abs_path)
         )
 
     def _as_child_of(
@@ -147,16 +384,68 @@ class LocalFSResourceMap(FSResourceMap, IEntityFSResourceMap):
             return False
 
     def _insert(self, resource_file: Union[Path, str]) -> None:
+        entry = self._digest_entry(resource_file)
+        if entry is not None:
+            # insert into collection
+            self[entry[0]] = entry[1]
+
+    def _digest_entry(
+        self, resource_file: Union[Path, str]
+    ) -> Optional[Tuple[Path, MD5Hash]]:
+        """Path relative to the base directory and md5 digest of a file. None if the file is not a
+        valid resource file."""
         abs_path = self._abs_path(resource_file)
 
-        if self._valid_resource_file(abs_path):
-            # path relative to resource base directory. For comparison, this is how files are listed
-            # in any resource's `manifest-md5.txt` file.
-            truncated_path = abs_path.relative_to(self.base_directory)
-            # compute file md5 hex digest
-            digest = compute_file_md5_hexdigest(abs_path)
-            # insert into collection
-            self.data[truncated_path] = digest
+        if not self._valid_resource_file(abs_path):
+            return None
+        # path relative to resource base directory. For comparison, this is how files are listed
+        # in any resource's `manifest-md5.txt` file.
+        truncated_path = abs_path.relative_to(self.base_directory)
+        stat = abs_path.stat()
+        # compute file md5 hex digest, unless the file is unchanged since last computed
+        digest = self._cached_digest(truncated_path, stat)
+        if digest is None:
+            with span(
+                "LocalFSResourceMap.hash",
+                resource_id=self.resource_id,
+                path=truncated_path,
+                size=stat.st_size,
+            ):
+                digest = compute_file_md5_hexdigest(abs_path)
+            self._remember_digest(truncated_path, stat, digest)
+        return truncated_path, digest
+
+    def _cached_digest(
+        self, truncated_path: Path, stat: os.stat_result
+    ) -> Optional[MD5Hash]:
+        entry = self._digest_cache.get(truncated_path)
+        if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime_ns):
+            return entry[2]
+        return None
+
+    def _remember_digest(
+        self,
+        truncated_path: Path,
+        stat: os.stat_result,
+        digest: MD5Hash,
+        trusted: bool = False,
+    ) -> None:
+        """Cache a file digest by its stat. Untrusted digests (read from disk) of recently modified
+        files are not cached, the file could change again within the filesystem's mtime resolution.
+        """
+        if trusted or time.time_ns() - stat.st_mtime_ns > _RACY_WINDOW_NS:
+            self._digest_cache[truncated_path] = (
+                stat.st_size,
+                stat.st_mtime_ns,
+                digest,
+            )
+        else:
+            self._digest_cache.pop(truncated_path, None)
+
+    def _prune_digest_cache(self) -> None:
+        self._digest_cache = {
+            k: v for k, v in self._digest_cache.items() if k in self.data
+        }
 
 
 class RemoteFSResourceMap(FSResourceMap):
@@ -174,10 +463,19 @@ class RemoteFSResourceMap(FSResourceMap):
         return fsresource_map
 
     def update_resource(self) -> None:
-        # clear instance data dictionary
-        self.data = dict()
-
         # force resource to re-fetch manifest-md5.txt from hs
         self.resource._parsed_checksums = None
 
-        self.data = get_resource_checksums(self.resource)
+        # replace instance data dictionary once fetched. resources may be updated in a background
+        # thread, readers should not observe an empty map in the meantime
+        with span("RemoteFSResourceMap.update_resource", resource_id=self.resource_id):
+            self.data = get_resource_checksums(self.resource)
+
+    def apply_checksums(self, checksums: Dict[str, MD5Hash]) -> None:
+        """Optimistically add or update file checksums known to be on HydroShare (i.e. computed
+        while the files were uploaded), without fetching the resource's manifest. File paths are
+        relative to the resource base directory (i.e. `data/contents/file`)."""
+        data = dict(self.data)
+        # hsclient quotes manifest file paths
+        data.update((Path(quote(path)), digest) for path, digest in checksums.items())
+        self.data = data
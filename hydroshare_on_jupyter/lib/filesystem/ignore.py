@@ -0,0 +1,168 @@
+from functools import lru_cache
+from pathlib import Path
+import logging
+import re
+
+# typing imports
+from typing import Iterable, List, NamedTuple, Optional, Pattern, Tuple, Union
+
+_log = logging.getLogger(__name__)
+
+# name of per-resource ignore file, located in a resource's `data/contents` directory
+IGNORE_FILENAME = ".hsignore"
+
+# transient files that are never worth syncing. negate (i.e. `!__pycache__/`) to include
+DEFAULT_IGNORE_PATTERNS = (
+    ".ipynb_checkpoints/",
+    "__pycache__/",
+    "*.py[cod]",
+    # editor swap, backup, and lock files
+    "*.swp",
+    "*.swo",
+    "*~",
+    ".~lock.*#",
+    ".DS_Store",
+    # partial downloads
+    "*.part",
+    "*.crdownload",
+)
+
+
+class _Rule(NamedTuple):
+    regex: Pattern
+    negate: bool
+    dir_only: bool
+
+
+def _translate(pattern: str) -> str:
+    """Translate gitignore-style glob to regular expression body."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            # zero or more directories
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+                continue
+            body = pattern[i + 1 : end]
+            if body[0] == "!":
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+            i = end + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+@lru_cache(maxsize=None)
+def _compile(pattern: str) -> Optional[_Rule]:
+    pattern = pattern.rstrip("\n")
+    # trailing spaces are ignored unless escaped
+    if not pattern.endswith("\\ "):
+        pattern = pattern.rstrip(" ")
+    if not pattern or pattern.startswith("#"):
+        return None
+
+    negate = pattern.startswith("!")
+    if negate:
+        pattern = pattern[1:]
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    if not pattern:
+        return None
+
+    # patterns with a separator are relative to the ignore root, others match at any depth
+    anchored = "/" in pattern
+    body = _translate(pattern.lstrip("/"))
+    regex = f"^{body}$" if anchored else f"^(?:.*/)?{body}$"
+    return _Rule(re.compile(regex), negate, dir_only)
+
+
+class IgnoreMatcher:
+    """Match paths against gitignore-style patterns. Paths are relative to the ignore root (i.e. a
+    resource's `data/contents` directory) and `/` separated. Later patterns take precedence, `!`
+    negates a pattern, and a trailing `/` only matches directories. A file in an ignored directory
+    is ignored, regardless of negated patterns.
+
+    Patterns are compiled once. Without negated patterns, all patterns are combined into a single
+    regular expression.
+    """
+
+    def __init__(self, patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS) -> None:
+        self.patterns: Tuple[str, ...] = tuple(patterns)
+        self._rules: List[_Rule] = [
+            rule for rule in map(_compile, self.patterns) if rule is not None
+        ]
+
+        self._any: Optional[Pattern] = None
+        self._files: Optional[Pattern] = None
+        if not any(rule.negate for rule in self._rules):
+            self._any = self._combine(self._rules)
+            self._files = self._combine(r for r in self._rules if not r.dir_only)
+
+    @classmethod
+    def from_file(
+        cls, ignore_file: Union[Path, str], patterns: Iterable[str] = ()
+    ) -> "IgnoreMatcher":
+        """Create matcher from `patterns` followed by the patterns in `ignore_file`, if it exists."""
+        patterns = list(patterns)
+        try:
+            patterns.extend(Path(ignore_file).read_text().splitlines())
+        except FileNotFoundError:
+            ...
+        except (OSError, UnicodeDecodeError) as e:
+            _log.warning(f"could not read ignore file {ignore_file}: {e}")
+        return cls(patterns)
+
+    def __bool__(self) -> bool:
+        return bool(self._rules)
+
+    def matches(self, path: str, is_dir: bool = False) -> bool:
+        """Return True if a relative path, or any of its parent directories, is ignored."""
+        if not self._rules:
+            return False
+        parts = path.strip("/").split("/")
+        for i in range(1, len(parts)):
+            if self._match("/".join(parts[:i]), True):
+                return True
+        return self._match("/".join(parts), is_dir)
+
+    # helpers
+    def _match(self, path: str, is_dir: bool) -> bool:
+        if self._any is not None:
+            regex = self._any if is_dir else self._files
+            return regex is not None and regex.match(path) is not None
+
+        ignored = False
+        for rule in self._rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.match(path) is not None:
+                ignored = not rule.negate
+        return ignored
+
+    @staticmethod
+    def _combine(rules: Iterable[_Rule]) -> Optional[Pattern]:
+        regexes = [rule.regex.pattern for rule in rules]
+        if not regexes:
+            return None
+        return re.compile("|".join(f"(?:{regex})" for regex in regexes))
@@ -0,0 +1,214 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+import base64
+import json
+import threading
+
+# typing imports
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from ..cache import LRUCacheWithTTL
+
+CONTENTS_PREFIX = "data/contents/"
+
+# upper bound for strings that start with some prefix
+_PREFIX_SENTINEL = "\U0010ffff"
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+class FolderEntry(NamedTuple):
+    name: str
+    # path relative to resource base directory (i.e. `data/contents/dir/file`)
+    path: str
+    is_folder: bool
+    # number of files that are descendants of a folder. None for files
+    file_count: Optional[int]
+
+
+def encode_cursor(o) -> str:
+    return base64.urlsafe_b64encode(json.dumps(o).encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError as e:
+        raise InvalidCursorError(f"invalid cursor: {cursor}") from e
+
+
+def _prefix_range(
+    items: List[str], prefix: str, after: Optional[str]
+) -> Tuple[int, int]:
+    """Index range of sorted `items` that start with `prefix` and are greater than `after`."""
+    start = bisect_left(items, prefix)
+    if after is not None:
+        start = max(start, bisect_right(items, after))
+    stop = bisect_left(items, prefix + _PREFIX_SENTINEL)
+    return start, max(start, stop)
+
+
+class ResourceDirectoryIndex:
+    """Directory index over the files in a resource's `data/contents/` directory. Built once from a
+    resource's manifest (i.e. `Resource._checksums` keys), supports listing a single folder level
+    with aggregated descendant file counts and listing files by path prefix. Both listings are
+    paginated using opaque cursors."""
+
+    def __init__(self, files: Iterable[str]) -> None:
+        # files relative to `data/contents/`
+        self._files: List[str] = sorted(files)
+
+        # folder -> name of child folders
+        self._folders: Dict[str, set] = defaultdict(set)
+        # folder -> name of child files
+        self._folder_files: Dict[str, List[str]] = defaultdict(list)
+        # folder -> number of descendant files
+        self._file_counts: Dict[str, int] = defaultdict(int)
+
+        for file in self._files:
+            parts = file.split("/")
+            folder = ""
+            for part in parts[:-1]:
+                self._file_counts[folder] += 1
+                self._folders[folder].add(part)
+                folder = f"{folder}/{part}" if folder else part
+            self._file_counts[folder] += 1
+            # files are visited in sorted order, so lists are sorted
+            self._folder_files[folder].append(parts[-1])
+
+        self._sorted_folders: Dict[str, List[str]] = {
+            folder: sorted(children) for folder, children in self._folders.items()
+        }
+
+    @classmethod
+    def from_checksums(cls, checksums: Dict[str, str]) -> "ResourceDirectoryIndex":
+        """Create index from mapping of manifest file paths (relative to resource base directory)
+        to md5 checksums. Only files in `data/contents/` are indexed."""
+        n = len(CONTENTS_PREFIX)
+        return cls(k[n:] for k in checksums.keys() if k.startswith(CONTENTS_PREFIX))
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def is_folder(self, folder: str) -> bool:
+        return folder.strip("/") in self._file_counts
+
+    def file_count(self, folder: str = "") -> int:
+        return self._file_counts.get(folder.strip("/"), 0)
+
+    def count_files(self, prefix: str = "") -> int:
+        """Number of files whose path relative to `data/contents/` starts with `prefix`."""
+        start, stop = _prefix_range(self._files, prefix, None)
+        return stop - start
+
+    def list_files(
+        self,
+        prefix: str = "",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[str], Optional[str]]:
+        """List files (relative to resource base directory) whose path relative to `data/contents/`
+        starts with `prefix`. Return page of files and cursor to the next page (None if last).
+        """
+        after = decode_cursor(cursor) if cursor is not None else None
+        if after is not None and not isinstance(after, str):
+            raise InvalidCursorError(f"invalid cursor: {cursor}")
+        start, stop = _prefix_range(self._files, prefix, after)
+
+        if limit is not None and stop - start > limit:
+            stop = start + limit
+            next_cursor = encode_cursor(self._files[stop - 1])
+        else:
+            next_cursor = None
+
+        files = [f"{CONTENTS_PREFIX}{f}" for f in self._files[start:stop]]
+        return files, next_cursor
+
+    def list_folder(
+        self,
+        folder: str = "",
+        prefix: str = "",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[FolderEntry], Optional[str]]:
+        """List the immediate children of a folder (relative to `data/contents/`) whose name starts
+        with `prefix`. Folders are listed before files, each in lexicographic order. Return page of
+        entries and cursor to the next page (None if last)."""
+        folder = folder.strip("/")
+        folders = self._sorted_folders.get(folder, [])
+        files = self._folder_files.get(folder, [])
+
+        # cursor is last returned entry: [is_folder, name]
+        after_folder, after_file = None, None
+        if cursor is not None:
+            try:
+                last_is_folder, last_name = decode_cursor(cursor)
+            except (TypeError, ValueError) as e:
+                raise InvalidCursorError(f"invalid cursor: {cursor}") from e
+            if last_is_folder:
+                after_folder = last_name
+            else:
+                # all folders were already listed
+                after_folder, after_file = _PREFIX_SENTINEL, last_name
+
+        folder_range = _prefix_range(folders, prefix, after_folder)
+        file_range = _prefix_range(files, prefix, after_file)
+
+        candidates = [(True, name) for name in folders[slice(*folder_range)]]
+        if limit is None or len(candidates) < limit:
+            remaining = None if limit is None else limit - len(candidates)
+            candidates.extend(
+                (False, name) for name in files[slice(*file_range)][:remaining]
+            )
+        else:
+            candidates = candidates[:limit]
+
+        n_matches = (folder_range[1] - folder_range[0]) + (
+            file_range[1] - file_range[0]
+        )
+        next_cursor = (
+            encode_cursor(list(candidates[-1]))
+            if candidates and n_matches > len(candidates)
+            else None
+        )
+
+        base = f"{folder}/" if folder else ""
+        entries = [
+            FolderEntry(
+                name=name,
+                path=f"{CONTENTS_PREFIX}{base}{name}",
+                is_folder=is_folder,
+                file_count=self._file_counts[f"{base}{name}"] if is_folder else None,
+            )
+            for is_folder, name in candidates
+        ]
+        return entries, next_cursor
+
+
+class ResourceDirectoryIndexCache:
+    """Bounded cache of ResourceDirectoryIndex instances keyed by resource id. An index is rebuilt
+    if the resource's parsed manifest changed since the index was built (i.e. the manifest was
+    re-fetched from HydroShare)."""
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self._cache: LRUCacheWithTTL[
+            str, Tuple[Dict[str, str], ResourceDirectoryIndex]
+        ] = LRUCacheWithTTL(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def get(
+        self, resource_id: str, checksums: Dict[str, str]
+    ) -> ResourceDirectoryIndex:
+        with self._lock:
+            entry = self._cache.get(resource_id)
+            if entry is not None and entry[0] is checksums:
+                return entry[1]
+
+            index = ResourceDirectoryIndex.from_checksums(checksums)
+            self._cache.put(resource_id, (checksums, index))
+            return index
+
+    def invalidate(self, resource_id: str) -> None:
+        self._cache.invalidate(resource_id)
@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from pathlib import Path
+import logging
+
+# typing imports
+from typing import Dict, Optional, Tuple, Union
+
+_log = logging.getLogger(__name__)
+
+
+class EvictedResourceState(BaseModel):
+    """Cached file digests of a local resource, persisted when the resource is evicted from memory.
+    Restoring them lets the resource be re-added without re-hashing unchanged files."""
+
+    resource_id: str
+    # posix path relative to resource base directory: (size, mtime_ns, md5 digest)
+    files: Dict[str, Tuple[int, int, str]] = {}
+
+    @classmethod
+    def load(cls, path: Union[Path, str]) -> Optional["EvictedResourceState"]:
+        """Load persisted state. None is returned if the state does not exist or is corrupt."""
+        path = Path(path)
+        if not path.is_file():
+            return None
+        try:
+            return cls.parse_file(path)
+        except ValueError:
+            _log.warning(f"ignoring corrupt resource state file: {path}")
+            return None
+
+    def save(self, path: Union[Path, str]) -> None:
+        # write then rename, so a crash mid-write does not corrupt existing state
+        path = Path(path)
+        tmp = path.with_suffix(f"{path.suffix}.tmp")
+        tmp.write_text(self.json())
+        tmp.replace(path)
@@ -0,0 +1,182 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+import os
+
+# typing imports
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+# (size, mtime_ns)
+FileSignature = Tuple[int, int]
+
+
+class SnapshotChanges(NamedTuple):
+    # absolute file paths
+    created: List[Path]
+    modified: List[Path]
+    deleted: List[Path]
+
+    def __bool__(self) -> bool:
+        return bool(self.created or self.modified or self.deleted)
+
+
+@dataclass
+class _Directory:
+    mtime_ns: int
+    # file name: signature
+    files: Dict[str, FileSignature] = field(default_factory=dict)
+    # child directory names
+    dirs: List[str] = field(default_factory=list)
+
+
+def _join(parent: str, name: str) -> str:
+    return f"{parent}/{name}" if parent else name
+
+
+class IncrementalSnapshot:
+    """Snapshot of the files in a directory tree, updated incrementally using `os.scandir`.
+
+    A directory is only re-listed if its mtime changed, i.e. an entry was added, removed, or
+    renamed. Modifications to files in unchanged directories do not change a directory's mtime, so
+    at most `budget` of those files are stat-ed per update, round-robin. Each file is checked at
+    least once every `ceil(n_files / budget)` updates.
+
+    `ignore` is called with a path relative to `root` and whether the path is a directory. Ignored
+    directories are not listed.
+    """
+
+    def __init__(
+        self, root: Path, ignore: Optional[Callable[[str, bool], bool]] = None
+    ) -> None:
+        self.root = Path(root)
+        self._ignore = ignore
+        # directory path relative to root ("" is root): directory state
+        self._dirs: Dict[str, _Directory] = dict()
+        # round-robin position of the file modification check
+        self._cursor = 0
+
+    def files(self) -> Iterator[Path]:
+        """Absolute paths of all files in the snapshot."""
+        for rel, directory in self._dirs.items():
+            for name in directory.files:
+                yield self._abs(_join(rel, name))
+
+    def update(self, budget: Optional[int] = None) -> SnapshotChanges:
+        """Update the snapshot and return files that were created, modified, or deleted since the
+        last update. `budget` is the maximum number of files in unchanged directories that are
+        checked for modifications, None checks all files."""
+        changes = SnapshotChanges([], [], [])
+        relisted: Set[str] = set()
+        seen: Set[str] = set()
+
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            try:
+                mtime_ns = os.stat(self._abs(rel)).st_mtime_ns
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            previous = self._dirs.get(rel)
+            if previous is not None and previous.mtime_ns == mtime_ns:
+                seen.add(rel)
+                # entries unchanged, no need to list directory
+                stack.extend(_join(rel, name) for name in previous.dirs)
+                continue
+
+            current = self._list(rel, mtime_ns)
+            if current is None:
+                continue
+            seen.add(rel)
+            relisted.add(rel)
+            self._diff(rel, previous, current, changes)
+            self._dirs[rel] = current
+            stack.extend(_join(rel, name) for name in current.dirs)
+
+        # directories that were removed, renamed, or are now ignored
+        for rel in self._dirs.keys() - seen:
+            directory = self._dirs.pop(rel)
+            changes.deleted.extend(
+                self._abs(_join(rel, name)) for name in directory.files
+            )
+
+        if budget is None or budget > 0:
+            self._check_files(relisted, budget, changes)
+        return changes
+
+    # helpers
+    def _abs(self, rel: str) -> Path:
+        return self.root / rel if rel else self.root
+
+    def _ignored(self, rel: str, is_dir: bool) -> bool:
+        return self._ignore is not None and self._ignore(rel, is_dir)
+
+    def _list(self, rel: str, mtime_ns: int) -> Optional[_Directory]:
+        directory = _Directory(mtime_ns)
+        try:
+            with os.scandir(self._abs(rel)) as entries:
+                for entry in entries:
+                    child = _join(rel, entry.name)
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self._ignored(child, True):
+                                directory.dirs.append(entry.name)
+                        elif entry.is_file(follow_symlinks=False):
+                            if not self._ignored(child, False):
+                                stat = entry.stat(follow_symlinks=False)
+                                directory.files[entry.name] = (
+                                    stat.st_size,
+                                    stat.st_mtime_ns,
+                                )
+                    except FileNotFoundError:
+                        # removed while listing
+                        continue
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return directory
+
+    def _diff(
+        self,
+        rel: str,
+        previous: Optional[_Directory],
+        current: _Directory,
+        changes: SnapshotChanges,
+    ) -> None:
+        previous_files = previous.files if previous is not None else dict()
+        for name, signature in current.files.items():
+            previous_signature = previous_files.get(name)
+            if previous_signature is None:
+                changes.created.append(self._abs(_join(rel, name)))
+            elif previous_signature != signature:
+                changes.modified.append(self._abs(_join(rel, name)))
+        for name in previous_files.keys() - current.files.keys():
+            changes.deleted.append(self._abs(_join(rel, name)))
+
+    def _check_files(
+        self, relisted: Set[str], budget: Optional[int], changes: SnapshotChanges
+    ) -> None:
+        """stat files in directories that were not re-listed, round-robin."""
+        candidates = [
+            (rel, name)
+            for rel, directory in self._dirs.items()
+            if rel not in relisted
+            for name in directory.files
+        ]
+        if not candidates:
+            return
+        if budget is not None and budget < len(candidates):
+            start = self._cursor % len(candidates)
+            candidates = (candidates[start:] + candidates[:start])[:budget]
+            self._cursor = start + budget
+
+        for rel, name in candidates:
+            files = self._dirs[rel].files
+            path = self._abs(_join(rel, name))
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                del files[name]
+                changes.deleted.append(path)
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if files[name] != signature:
+                files[name] = signature
+                changes.modified.append(path)
@@ -0,0 +1,176 @@
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+import threading
+
+# typing imports
+from typing import Dict, List, Optional, Tuple
+
+from .fs_resource_map import LocalFSResourceMap, RemoteFSResourceMap
+from .types import MD5Hash
+
+# folder queries are relative to a resource's `data/contents` directory
+CONTENTS_PARTS = ("data", "contents")
+
+# index of a file's sync status in a folder's counts
+IN_SYNC, OUT_OF_SYNC, ONLY_LOCAL, ONLY_REMOTE = range(4)
+# index of the bytes of local files in a folder's counts
+_BYTES = 4
+
+
+@dataclass
+class SyncCounts:
+    """Number of files, in a folder and its descendants, by sync status. `bytes` is the size of the
+    local files."""
+
+    in_sync: int = 0
+    out_of_sync: int = 0
+    only_local: int = 0
+    only_remote: int = 0
+    bytes: int = 0
+
+    @classmethod
+    def _from_counts(cls, counts: List[int]) -> "SyncCounts":
+        return cls(*counts)
+
+    @property
+    def files(self) -> int:
+        return self.in_sync + self.out_of_sync + self.only_local + self.only_remote
+
+    @property
+    def synced(self) -> bool:
+        return self.files == self.in_sync
+
+
+@dataclass
+class FolderSyncCounts(SyncCounts):
+    # folder path relative to `data/contents`, "" for the `data/contents` directory
+    folder: str = ""
+    # counts of the folder's immediate child folders, by name
+    folders: Dict[str, SyncCounts] = field(default_factory=dict)
+
+
+class _Folder:
+    __slots__ = ("children", "counts")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Folder"] = dict()
+        # [in_sync, out_of_sync, only_local, only_remote, bytes]
+        self.counts = [0, 0, 0, 0, 0]
+
+
+def _status(local: Optional[MD5Hash], remote: Optional[MD5Hash]) -> Optional[int]:
+    if local is None:
+        return None if remote is None else ONLY_REMOTE
+    if remote is None:
+        return ONLY_LOCAL
+    return IN_SYNC if local == remote else OUT_OF_SYNC
+
+
+class ResourceSyncStateTree:
+    """Directory tree over the files of a resource's local and remote maps, that maintains the
+    number of files of each sync status (and the bytes of local files) in every folder.
+
+    The tree observes both maps (see `FSResourceMap.subscribe`). A file change updates the counts
+    of the file's ancestor folders only, O(depth), so the status of any folder can be queried
+    without comparing every file of the resource. Call `close` to stop observing the maps.
+    """
+
+    def __init__(
+        self, local_map: LocalFSResourceMap, remote_map: RemoteFSResourceMap
+    ) -> None:
+        self.local_map = local_map
+        self.remote_map = remote_map
+        self._root = _Folder()
+        # file path: (sync status, bytes) counted in the file's ancestor folders
+        self._files: Dict[Path, Tuple[int, int]] = dict()
+        # maps may be changed on different threads (i.e. watchdog observer and IOLoop)
+        self._lock = threading.Lock()
+
+        with self._lock:
+            local_map.subscribe(self._local_changed)
+            remote_map.subscribe(self._remote_changed)
+            for path in set(local_map.data) | set(remote_map.data):
+                self._update(path)
+
+    def close(self) -> None:
+        self.local_map.unsubscribe(self._local_changed)
+        self.remote_map.unsubscribe(self._remote_changed)
+
+    def folder(self, folder: str = "") -> Optional[FolderSyncCounts]:
+        """Counts of a folder (relative to `data/contents`) and of its immediate child folders.
+        None if the folder does not contain any local or remote files."""
+        parts = [*CONTENTS_PARTS, *PurePosixPath(folder.strip("/")).parts]
+        with self._lock:
+            node = self._root
+            for part in parts:
+                node = node.children.get(part)
+                if node is None:
+                    return None
+            return FolderSyncCounts(
+                *node.counts,
+                folder=folder.strip("/"),
+                folders={
+                    name: SyncCounts._from_counts(child.counts)
+                    for name, child in sorted(node.children.items())
+                },
+            )
+
+    # observers
+
+    def _local_changed(
+        self, path: Path, previous: Optional[MD5Hash], digest: Optional[MD5Hash]
+    ) -> None:
+        with self._lock:
+            self._update(path)
+
+    def _remote_changed(
+        self, path: Path, previous: Optional[MD5Hash], digest: Optional[MD5Hash]
+    ) -> None:
+        with self._lock:
+            self._update(path)
+
+    # helpers
+
+    def _update(self, path: Path) -> None:
+        """Re-compute a file's sync status and update the counts of its ancestors."""
+        local = self.local_map.data.get(path)
+        status = _status(local, self.remote_map.data.get(path))
+        size = 0
+        if local is not None:
+            size = self.local_map.file_size(path) or 0
+
+        previous = self._files.get(path)
+        current = None if status is None else (status, size)
+        if previous == current:
+            return
+        if current is None:
+            del self._files[path]
+        else:
+            self._files[path] = current
+
+        # walk the file's ancestors, creating missing folders
+        ancestors = [self._root]
+        for part in path.parent.parts:
+            node = ancestors[-1].children.get(part)
+            if node is None:
+                node = ancestors[-1].children[part] = _Folder()
+            ancestors.append(node)
+
+        for node in ancestors:
+            counts = node.counts
+            if previous is not None:
+                counts[previous[0]] -= 1
+                counts[_BYTES] -= previous[1]
+            if current is not None:
+                counts[current[0]] += 1
+                counts[_BYTES] += current[1]
+
+        # prune folders that no longer contain files
+        if current is None:
+            for parent, (part, node) in zip(
+                reversed(ancestors[:-1]),
+                reversed(list(zip(path.parent.parts, ancestors[1:]))),
+            ):
+                if any(node.counts[:_BYTES]):
+                    break
+                del parent.children[part]
@@ -25,6 +25,31 @@ def get_resource_checksums(resource: Resource) -> Dict[Path, MD5Hash]:
     }
 
 
+def read_manifest(manifest: Union[str, Path]) -> Dict[Path, MD5Hash]:
+    """Return dictionary of file path: MD5 checksum from a bagit payload manifest (i.e. a resource
+    bag's `manifest-md5.txt`). Only files that are children of 'data/contents/' are included. File
+    paths are relative to the bag's base directory.
+
+    Args:
+        manifest (Union[str, Path]): path to manifest file
+
+    Returns:
+        Dict[Path, MD5Hash]: relative file path as Path, MD5 checksum
+    """
+    checksums = dict()
+    with open(manifest, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\r\n").split(maxsplit=1)
+            if len(fields) != 2:
+                continue
+            digest, file = fields
+            # bagit spec percent-encodes CR, LF, and % in file paths
+            file = file.replace("%0D", "\r").replace("%0A", "\n").replace("%25", "%")
+            if file.startswith("data/contents/"):
+                checksums[Path(file)] = MD5Hash(digest.lower())
+    return checksums
+
+
 def compute_file_md5_hexdigest(file: Union[str, Path]) -> str:
     """Compute a file's md5 hexdigest. Read file as chunks to conserve memory usage.
 
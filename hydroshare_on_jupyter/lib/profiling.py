@@ -0,0 +1,155 @@
+"""Diagnostics of a running server: a sampling profiler of all threads, whose output is in the
+collapsed stack format read by flamegraph tools (i.e. `flamegraph.pl`, speedscope, and
+https://www.speedscope.app), and memory reports.
+
+The profiler samples the stack of every thread (the IOLoop, watchdog observers, hashing and
+download workers) from a background thread using `sys._current_frames`, so profiled code is not
+instrumented and a profile can be taken of a live server.
+"""
+
+from collections import Counter
+from pathlib import Path
+from types import CodeType, FrameType, FunctionType, ModuleType
+import gc
+import sys
+import threading
+import time
+import tracemalloc
+
+# typing imports
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from ..models.api_models import ModuleMemory, ResourceMapMemory
+
+if TYPE_CHECKING:
+    from .filesystem.aggregate_fs_map import AggregateFSMap
+
+# samples per second
+DEFAULT_SAMPLE_RATE = 100
+# objects not counted by `deep_sizeof`. they are shared, not owned by the measured object
+_SHARED_TYPES = (type, ModuleType, FunctionType, CodeType, FrameType)
+
+
+class SamplingProfiler:
+    """Periodically sample the call stack of every thread. Samples are counted by stack, each
+    stack is rooted at its thread's name."""
+
+    def __init__(self, sample_rate: float = DEFAULT_SAMPLE_RATE) -> None:
+        self.interval = 1 / sample_rate
+        self.samples: Counter = Counter()
+        self.n_samples = 0
+        # frame label by code object. code objects live as long as their function
+        self._labels: Dict[CodeType, str] = dict()
+
+    def run(self, seconds: float) -> "SamplingProfiler":
+        """Sample the calling thread's process for `seconds`. Blocks; the calling thread is not
+        sampled."""
+        deadline = time.monotonic() + seconds
+        next_sample = time.monotonic()
+        while next_sample < deadline:
+            self.sample()
+            next_sample += self.interval
+            time.sleep(max(next_sample - time.monotonic(), 0))
+        return self
+
+    def sample(self) -> None:
+        current = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == current:
+                continue
+            stack = [names.get(ident, f"thread-{ident}")]
+            stack.extend(reversed(self._walk(frame)))
+            self.samples[";".join(stack)] += 1
+        self.n_samples += 1
+
+    def collapsed(self) -> str:
+        """Samples in collapsed stack format, one `thread;outer;...;inner count` line per stack."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in sorted(self.samples.items())
+        )
+
+    def _walk(self, frame: Optional[FrameType]) -> List[str]:
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                name = getattr(code, "co_qualname", code.co_name)
+                label = f"{name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+                # `;` separates frames of a collapsed stack
+                label = self._labels[code] = label.replace(";", ":")
+            labels.append(label)
+            frame = frame.f_back
+        return labels
+
+
+def deep_sizeof(*objects: Any) -> int:
+    """Approximate bytes of memory retained by `objects` and everything they reference, counting
+    shared objects once. Types, modules, functions, and frames are not counted."""
+    seen = set()
+    size = 0
+    pending = list(objects)
+    while pending:
+        unseen = []
+        for obj in pending:
+            if isinstance(obj, _SHARED_TYPES) or id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            size += sys.getsizeof(obj)
+            unseen.append(obj)
+        pending = gc.get_referents(*unseen)
+    return size
+
+
+def resource_map_memory(aggregate_fs_map: "AggregateFSMap") -> List[ResourceMapMemory]:
+    """Approximate memory of each resource's local and remote map, largest first. Only file paths
+    and digests (and cached digests of local files) are counted; hsclient objects are shared.
+    """
+    local_map = aggregate_fs_map.local_map
+    remote_map = aggregate_fs_map.remote_map
+    report = []
+    for resource_id in set(local_map) | set(remote_map):
+        local = local_map.get(resource_id)
+        remote = remote_map.get(resource_id)
+        report.append(
+            ResourceMapMemory(
+                resource_id=resource_id,
+                local_files=0 if local is None else len(local),
+                local_size=(
+                    0 if local is None else deep_sizeof(local.data, local._digest_cache)
+                ),
+                remote_files=0 if remote is None else len(remote),
+                remote_size=0 if remote is None else deep_sizeof(remote.data),
+            )
+        )
+    return sorted(report, key=lambda m: m.local_size + m.remote_size, reverse=True)
+
+
+def memory_by_module(
+    snapshot: tracemalloc.Snapshot, limit: Optional[int] = None
+) -> List[ModuleMemory]:
+    """Group a tracemalloc snapshot's allocations by the module that made them, largest first.
+    Allocations in files that are not an imported module are grouped by file name."""
+    modules_by_file = _modules_by_file()
+    sizes: Counter = Counter()
+    counts: Counter = Counter()
+    for stat in snapshot.statistics("filename"):
+        filename = stat.traceback[0].filename
+        module = modules_by_file.get(filename, filename)
+        sizes[module] += stat.size
+        counts[module] += stat.count
+    return [
+        ModuleMemory(module=module, size=size, count=counts[module])
+        for module, size in sizes.most_common(limit)
+    ]
+
+
+def _modules_by_file() -> Dict[str, str]:
+    modules = dict()
+    # copy, modules may be imported by other threads
+    for name, module in list(sys.modules.items()):
+        filename = getattr(module, "__file__", None)
+        if filename is not None:
+            modules[filename] = name
+    return modules
@@ -1,6 +1,12 @@
 from enum import Enum, auto
 from hsclient import Resource
+
+# typing imports
+from typing import Optional
+
+from .filesystem.content_index import ContentIndex
 from .resource_strategies import (
+    DownloadedFiles,
     HydroShareFileDownloadStrategy,
     HydroShareFolderDownloadStrategy,
 )
@@ -31,10 +37,13 @@ class HydroShareEntityDownloadFactory:
         resource: Resource,
         data_path: str,
         path: str,
-    ):
+        content_index: Optional[ContentIndex] = None,
+    ) -> DownloadedFiles:
+        """Download entity using the strategy for its type. Returns the local paths written. Files
+        found in `content_index` are copied from local files instead of downloaded."""
         cls = HydroShareEntityDownloadFactory._CHOICES.get(entity_type, None)
         if cls is None:
             raise InvalidEntityTypeException(entity_type)
 
-        downloader = cls(resource, data_path)
+        downloader = cls(resource, data_path, content_index)
         return downloader.download(path)
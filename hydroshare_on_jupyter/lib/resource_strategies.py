@@ -1,57 +1,178 @@
 from abc import ABC, abstractmethod
-import shutil
+import logging
+import time
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from hsclient import Resource
+from urllib.parse import quote
 from zipfile import ZipFile
 
+# typing imports
+from typing import Dict, Optional
+
+from .filesystem.content_index import ContentIndex
+from .filesystem.types import MD5Hash
+from .transfer.exceptions import ChecksumMismatchError
+from .transfer.resumable_download import ResumableDownloader, hydroshare_url
+from ..utilities.pathlib_utils import app_state_path
+
+_log = logging.getLogger(__name__)
+
+# absolute local path of each file written: its md5 checksum, if computed during the download
+DownloadedFiles = Dict[Path, Optional[MD5Hash]]
+
+# application state subdirectory where partial downloads are staged
+DOWNLOAD_STAGING_DIRNAME = ("transfers", "downloads")
+
 
 class AbstractHydroShareEntityDownloadStrategy(ABC):
-    def __init__(self, resource: Resource, data_path: str):
+    def __init__(
+        self,
+        resource: Resource,
+        data_path: str,
+        content_index: Optional[ContentIndex] = None,
+    ):
         self.resource = resource
         self.data_path = data_path
+        # consulted for identical local files before files are downloaded
+        self.content_index = content_index
+        self.downloader = ResumableDownloader.from_resource(
+            resource, app_state_path(data_path, *DOWNLOAD_STAGING_DIRNAME)
+        )
 
     @abstractmethod
-    def download(self, path: str):
-        """Interface for HydroShare file system entity download"""
+    def download(self, path: str) -> DownloadedFiles:
+        """Interface for HydroShare file system entity download. Returns the absolute local paths of
+        the files written and, if known, their md5 checksums."""
 
     def create_intermediary_directories(self, path: Path) -> Path:
         """Handles the creation of {data_path}/{resource_id}/{resource_id}/data/contents"""
         contents_path = (
-            Path(self.data_path) / self.resource.resource_id / self.resource.resource_id / "data/contents" / path
+            Path(self.data_path)
+            / self.resource.resource_id
+            / self.resource.resource_id
+            / "data/contents"
+            / path
         )
         contents_path.mkdir(parents=True, exist_ok=True)
         return contents_path
 
+    @staticmethod
+    def extract(zip_file: Path, destination: Path) -> DownloadedFiles:
+        """Extract zip archive into destination. Returns the absolute paths of extracted files."""
+        with ZipFile(zip_file, "r") as zr:
+            zr.extractall(destination)
+            names = zr.namelist()
+        return {destination / name: None for name in names if not name.endswith("/")}
+
+    def hydroshare_contents_path(self, path: str) -> str:
+        """HydroShare path to a resource entity relative to the resource's `data/contents` directory"""
+        return f"{self.resource._resource_path}/data/contents/{path}"
+
 
 # Concrete strategies
 
 
 class HydroShareFileDownloadStrategy(AbstractHydroShareEntityDownloadStrategy):
-    def download(self, path: str):
-        """Download file from HydroShare and move to {data_path}/{resource_id}/data/contents"""
+    def download(self, path: str) -> DownloadedFiles:
+        """Download file from HydroShare and move to {data_path}/{resource_id}/data/contents. The
+        file's md5 is computed as it is written and verified against the resource manifest. If a
+        local file (in any resource) matches the manifest md5, it is copied instead.
+        """
+        path = Path(path)
+        fn = path.name
+        parent_dir = path.parent
+        contents_path = self.create_intermediary_directories(parent_dir)
 
-        with TemporaryDirectory() as temp_dir:
-            downloaded_file = self.resource.file_download(
-                path, save_path=temp_dir, zipped=False
+        if self.content_index is not None:
+            expected_md5 = self._manifest_md5(path)
+            if (
+                expected_md5 is not None
+                and self.content_index.materialize(
+                    MD5Hash(expected_md5), contents_path / fn
+                )
+                is not None
+            ):
+                return {contents_path / fn: MD5Hash(expected_md5)}
+
+        url = hydroshare_url(
+            self.resource, self.hydroshare_contents_path(path.as_posix())
+        )
+
+        try:
+            # partially downloaded file is resumed from staging area if it exists
+            downloaded_file = self.downloader.download(
+                url, contents_path / fn, expected_md5=self._manifest_md5(path)
+            )
+        except ChecksumMismatchError as e:
+            # the manifest may predate a change to the file on HydroShare. re-fetch manifest and
+            # try once more. mismatch against a fresh manifest indicates corruption.
+            _log.warning(f"{e}. retrying with updated manifest.")
+            self.resource._parsed_checksums = None
+            downloaded_file = self.downloader.download(
+                url, contents_path / fn, expected_md5=self._manifest_md5(path)
             )
-            path = Path(path)
-            fn = path.name
-            parent_dir = path.parent
-            contents_path = self.create_intermediary_directories(parent_dir)
 
-            shutil.move(downloaded_file, contents_path / fn)
+        return {downloaded_file.path: MD5Hash(downloaded_file.md5)}
+
+    def _manifest_md5(self, path: Path) -> Optional[str]:
+        """md5 checksum of a file in the resource's manifest. None if it cannot be determined."""
+        try:
+            checksums = self.resource._checksums
+        except Exception as e:
+            _log.warning(f"could not retrieve manifest, skipping verification: {e}")
+            return None
+        # hsclient quotes manifest file paths
+        return checksums.get(quote(f"data/contents/{path.as_posix()}"))
 
 
 class HydroShareFolderDownloadStrategy(AbstractHydroShareEntityDownloadStrategy):
-    def download(self, path: str):
+    def download(self, path: str) -> DownloadedFiles:
         """Download folder from HydroShare"""
+        # HydroShare zips folder in a background task. wait until task completes.
+        download_path = self._request_zipped_folder(path)
 
         with TemporaryDirectory() as temp_dir:
-            downloaded_folder = self.resource.folder_download(path, save_path=temp_dir)
+            downloaded_folder = self.downloader.download(
+                hydroshare_url(self.resource, download_path),
+                Path(temp_dir) / Path(download_path).name,
+            ).path
             parent_dir = Path(path).parent
+            # NOTE: returns {data_path}/{resource_id}/{resource_id}/data/contents/{parent_dir}
             contents_path = self.create_intermediary_directories(parent_dir)
 
+            # unzip folder into its parent directory
+            return self.extract(downloaded_folder, contents_path)
+
+    def _request_zipped_folder(self, path: str) -> str:
+        """Request HydroShare zip a folder and return the path the zip can be downloaded from."""
+        hs_session = self.resource._hs_session
+        response = hs_session.get(
+            self.hydroshare_contents_path(path),
+            status_code=200,
+            allow_redirects=True,
+            params={"zipped": "true"},
+        ).json()
+
+        if response["zip_status"] == "Not ready":
+            while hs_session.check_task(response["task_id"]) != "true":
+                time.sleep(1)
+        return response["download_path"]
+
+
+class HydroShareBagDownloadStrategy(AbstractHydroShareEntityDownloadStrategy):
+    def download(self, path: str = "") -> DownloadedFiles:
+        """Download resource bag from HydroShare and extract to {data_path}/{resource_id}"""
+        resource_id = self.resource.resource_id
+
+        with TemporaryDirectory() as temp_dir:
+            # bags are created on request. a non-zip response indicates bag is not ready
+            downloaded_zip = self.downloader.download(
+                hydroshare_url(self.resource, self.resource._hsapi_path),
+                Path(temp_dir) / f"{resource_id}.zip",
+                content_type="application/zip",
+            ).path
             # unzip resource
-            with ZipFile(downloaded_folder, "r") as zr:
-                zr.extractall(contents_path / parent_dir)
+            # respect HydroShare baggit file structure convention
+            # data_path / resource_id / resource_id / ...
+            return self.extract(downloaded_zip, Path(self.data_path) / resource_id)
@@ -0,0 +1,243 @@
+"""Lightweight span based tracing of where time goes between a change (a request, a file system
+event) and the resulting status update.
+
+A span times a block of code. Spans opened while another span is active, in the same thread or
+asyncio task, are its children; the active span is tracked with a `ContextVar`, so it propagates
+through coroutines and, with `contextvars.copy_context`, to callbacks scheduled on other threads.
+Finished spans are passed to the tracer's exporter, i.e. `ChromeTraceExporter`, whose output can be
+opened with chrome://tracing or https://ui.perfetto.dev.
+
+Tracing is disabled until an exporter is configured. While disabled, `span` returns a shared no-op
+context manager, so instrumented code pays for a single attribute check.
+
+Usage:
+    tracer.configure(ChromeTraceExporter(log_path / TRACE_FILENAME))
+
+    with span("LocalFSResourceMap.update_resource", resource_id=resource_id):
+        ...
+"""
+
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+
+# typing imports
+from typing import Any, Callable, ContextManager, Dict, Optional, Set, TypeVar, Union
+
+# default name of the trace file written to the configured `log_path`
+TRACE_FILENAME = "trace.json"
+
+_log = logging.getLogger(__name__)
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+# innermost active span of the current thread or asyncio task
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+# returned by `Tracer.span` while tracing is disabled
+_NO_SPAN = nullcontext()
+
+
+class Span:
+    """A timed, named block of code. Created by `Tracer.span`; use as a context manager."""
+
+    __slots__ = (
+        "name",
+        "attributes",
+        "span_id",
+        "parent_id",
+        "trace_id",
+        "thread_id",
+        "thread_name",
+        "start_ns",
+        "end_ns",
+        "_tracer",
+        "_token",
+    )
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.attributes = attributes
+        self.span_id = next(_span_ids)
+        self.parent_id: Optional[int] = None
+        self.trace_id = self.span_id
+        self.start_ns = self.end_ns = 0
+        self._tracer = tracer
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+    def __enter__(self) -> "Span":
+        parent = _current_span.get()
+        if parent is not None:
+            self.parent_id = parent.span_id
+            self.trace_id = parent.trace_id
+        thread = threading.current_thread()
+        # `native_id` requires python 3.8
+        self.thread_id = getattr(thread, "native_id", thread.ident)
+        self.thread_name = thread.name
+        self._token = _current_span.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.end_ns = time.perf_counter_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self._tracer._export(self)
+
+
+class SpanExporter(ABC):
+    """Receives finished spans. `export` is called from any thread that finishes a span."""
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        """Record a finished span."""
+
+    def close(self) -> None:
+        """Flush and release resources. No spans are exported after the exporter is closed."""
+
+
+class ChromeTraceExporter(SpanExporter):
+    """Write spans as Chrome trace event format "complete" events to a JSON array file. Events are
+    flushed as they are exported, so a trace of a running server can be inspected; the array is
+    terminated when the exporter is closed (trace viewers accept an unterminated array).
+
+    Span ids, and their parent and trace ids, are written to each event's `args`.
+    """
+
+    def __init__(self, path: Union[Path, str]) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write("[")
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._named_threads: Set[int] = set()
+        self._empty = True
+
+    def export(self, span: Span) -> None:
+        event = {
+            "name": span.name,
+            "cat": span.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": span.start_ns / 1000,
+            "dur": span.duration_ns / 1000,
+            "pid": self._pid,
+            "tid": span.thread_id,
+            "args": {
+                **span.attributes,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "trace_id": span.trace_id,
+            },
+        }
+        with self._lock:
+            if self._file.closed:
+                return
+            if span.thread_id not in self._named_threads:
+                self._named_threads.add(span.thread_id)
+                self._write(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": self._pid,
+                        "tid": span.thread_id,
+                        "args": {"name": span.thread_name},
+                    }
+                )
+            self._write(event)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.write("\n]\n")
+                self._file.close()
+
+    def _write(self, event: Dict[str, Any]) -> None:
+        separator = "\n" if self._empty else ",\n"
+        self._empty = False
+        self._file.write(separator + json.dumps(event, default=str))
+
+
+class Tracer:
+    """Creates spans and passes finished spans to an exporter. Disabled while no exporter is
+    configured."""
+
+    def __init__(self) -> None:
+        self._exporter: Optional[SpanExporter] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._exporter is not None
+
+    def configure(self, exporter: Optional[SpanExporter]) -> None:
+        """Export spans to `exporter`, closing the previously configured exporter. None disables
+        tracing."""
+        previous, self._exporter = self._exporter, exporter
+        if previous is not None:
+            previous.close()
+
+    def shutdown(self) -> None:
+        self.configure(None)
+
+    def span(self, name: str, **attributes: Any) -> ContextManager[Optional[Span]]:
+        """Context manager timing a block of code. Yields the `Span`, or None if tracing is
+        disabled."""
+        if self._exporter is None:
+            return _NO_SPAN
+        return Span(self, name, attributes)
+
+    def traced(self, name: Optional[str] = None) -> Callable[[_F], _F]:
+        """Decorator, trace each call of a function. The span name defaults to the function's
+        qualified name."""
+
+        def decorator(fn: _F) -> _F:
+            span_name = name or fn.__qualname__
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if self._exporter is None:
+                    return fn(*args, **kwargs)
+                with Span(self, span_name, {}):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _export(self, span: Span) -> None:
+        exporter = self._exporter
+        if exporter is None:
+            # disabled while the span was active
+            return
+        try:
+            exporter.export(span)
+        except Exception:
+            # tracing must not break the traced code
+            _log.exception(f"failed to export span {span.name}")
+
+
+def current_span() -> Optional[Span]:
+    """Innermost active span of the current thread or asyncio task."""
+    return _current_span.get()
+
+
+# process wide tracer
+tracer = Tracer()
+span = tracer.span
+traced = tracer.traced
@@ -0,0 +1,232 @@
+import hashlib
+import logging
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from zipfile import ZipFile, ZipInfo
+import requests
+from hsclient import Resource
+from notebook.utils import url_path_join
+
+# typing imports
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from ..filesystem.ignore import IgnoreMatcher
+from .exceptions import TransferError
+from .transfer_state import UploadState, remove, transfer_key
+
+_log = logging.getLogger(__name__)
+
+# (absolute file path, archive name)
+ArchiveMember = Tuple[Path, str]
+
+# bytes read from a file at a time while it is written to an archive
+_READ_SIZE = 1 << 20
+
+
+def unzip_on_hydroshare(resource: Resource, filename: str, location: str = "") -> None:
+    """Unpack a zip archive that was uploaded to a HydroShare resource. The archive is removed by
+    HydroShare after it is unpacked. Existing files are overwritten."""
+    unzip_path = url_path_join(
+        resource._hsapi_path,
+        "functions",
+        "unzip",
+        "data",
+        "contents",
+        location,
+        filename,
+    )
+    # post job to HydroShare
+    resource._hs_session.post(
+        unzip_path,
+        status_code=200,
+        data={"overwrite": "true", "ingest_metadata": "true"},
+    )
+
+
+def expand_archive_members(
+    files: Iterable[Path], root: Path, ignore: Optional[IgnoreMatcher] = None
+) -> List[ArchiveMember]:
+    """Expand directories into the files they contain. Archive names are relative to `root`. Files
+    matched by `ignore` are excluded."""
+    members = []
+    for file in files:
+        children = sorted(file.glob("**/*")) if file.is_dir() else [file]
+        for child in children:
+            if not child.is_file():
+                continue
+            arcname = child.relative_to(root).as_posix()
+            if ignore is not None and ignore.matches(arcname):
+                _log.debug(f"skipping ignored file {arcname}")
+                continue
+            members.append((child, arcname))
+    return members
+
+
+def partition_members(
+    members: List[ArchiveMember], chunk_size: int
+) -> List[List[ArchiveMember]]:
+    """Greedily partition archive members into chunks of at most `chunk_size` bytes. A file larger
+    than `chunk_size` is placed in a chunk of its own."""
+    chunks = []
+    chunk, chunk_bytes = [], 0
+    for member in members:
+        size = member[0].stat().st_size
+        if chunk and chunk_bytes + size > chunk_size:
+            chunks.append(chunk)
+            chunk, chunk_bytes = [], 0
+        chunk.append(member)
+        chunk_bytes += size
+
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def write_archive(zip_file: Path, members: List[ArchiveMember]) -> Dict[str, str]:
+    """Write members to a zip archive, computing the md5 of each file as it is read. Returns the
+    md5 hexdigest of each member by archive name."""
+    checksums = dict()
+    with ZipFile(zip_file, "w") as zipped:
+        for file, arcname in members:
+            digest = hashlib.md5()
+            with open(file, "rb") as src, zipped.open(
+                ZipInfo.from_file(file, arcname), "w"
+            ) as dst:
+                for block in iter(lambda: src.read(_READ_SIZE), b""):
+                    digest.update(block)
+                    dst.write(block)
+            checksums[arcname] = digest.hexdigest()
+    return checksums
+
+
+class ChunkedUploader:
+    """Upload local files to an existing HydroShare resource as a sequence of zip archive chunks.
+    Each chunk is uploaded and unpacked independently, so a dropped connection only requires the
+    failed chunk to be retried.
+
+    The set of completed chunks is persisted in a state directory. Re-issuing an upload of the same,
+    unmodified files (e.g. after a server restart) skips chunks that were already uploaded.
+    """
+
+    _ZIP_FILENAME = "__zip_{}.zip"
+
+    def __init__(
+        self,
+        resource: Resource,
+        state_path: Union[Path, str],
+        *,
+        chunk_size: int = 64 << 20,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+    ) -> None:
+        self.resource = resource
+        self.state_path = Path(state_path)
+        self.state_path.mkdir(parents=True, exist_ok=True)
+
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def upload(
+        self,
+        files: Iterable[Path],
+        root: Union[Path, str],
+        ignore: Optional[IgnoreMatcher] = None,
+    ) -> Dict[str, str]:
+        """Upload files and directories, maintaining their structure relative to `root`.
+
+        Args:
+            files (Iterable[Path]): absolute paths to files and/or directories to upload
+            root (Union[Path, str]): local directory that corresponds to a resource's
+                `data/contents/` directory on HydroShare
+            ignore (Optional[IgnoreMatcher]): files matched, relative to `root`, are not uploaded
+
+        Raises:
+            TransferError: a chunk could not be uploaded after `max_retries` attempts.
+
+        Returns:
+            Dict[str, str]: md5 hexdigest of each uploaded file by path relative to `root`. Files in
+                chunks skipped because they were previously uploaded are not included.
+        """
+        members = expand_archive_members(files, Path(root), ignore)
+        chunks = partition_members(members, self.chunk_size)
+
+        resource_id = self.resource.resource_id
+        state_file = self.state_path / f"{self._upload_key(resource_id, members)}.json"
+
+        state = UploadState.load(state_file)
+        if state is None or state.n_chunks != len(chunks):
+            state = UploadState(resource_id=resource_id, n_chunks=len(chunks))
+
+        checksums = dict()
+        with TemporaryDirectory() as temp_dir:
+            for idx, chunk in enumerate(chunks):
+                if idx in state.completed_chunks:
+                    _log.info(
+                        f"skipping previously uploaded chunk {idx} of {resource_id}"
+                    )
+                    continue
+
+                checksums.update(
+                    self._upload_chunk_with_retries(Path(temp_dir), idx, chunk)
+                )
+
+                state.completed_chunks.add(idx)
+                state.save(state_file)
+
+        remove(state_file)
+        return checksums
+
+    def _upload_chunk_with_retries(
+        self, temp_dir: Path, idx: int, chunk: List[ArchiveMember]
+    ) -> Dict[str, str]:
+        zip_file = temp_dir / self._ZIP_FILENAME.format(idx)
+        # files are hashed as they are packed, not read a second time
+        checksums = write_archive(zip_file, chunk)
+
+        # upload and unzip are retried separately. re-uploading an archive that was uploaded, but
+        # not unzipped, would leave a duplicate archive in the resource
+        self._with_retries(
+            f"upload of chunk {idx}", lambda: self.resource.file_upload(zip_file)
+        )
+        self._with_retries(
+            f"unzip of chunk {idx}",
+            lambda: unzip_on_hydroshare(self.resource, zip_file.name),
+        )
+
+        zip_file.unlink()
+        return checksums
+
+    def _with_retries(self, action: str, fn: Callable[[], None]) -> None:
+        """Call `fn`, retrying HydroShare request failures with exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return fn()
+            except Exception as e:
+                if not _is_request_error(e):
+                    raise
+                if attempt == self.max_retries:
+                    raise TransferError(
+                        f"{action} failed after {self.max_retries} retries."
+                    ) from e
+                _log.warning(f"{action} failed, retrying: {e}")
+                time.sleep(self.backoff * 2**attempt)
+
+    @staticmethod
+    def _upload_key(resource_id: str, members: List[ArchiveMember]) -> str:
+        # files that change between attempts invalidate the persisted state
+        descriptors = []
+        for file, arcname in members:
+            stat = file.stat()
+            descriptors.append(f"{arcname}:{stat.st_size}:{stat.st_mtime_ns}")
+        return transfer_key(resource_id, *descriptors)
+
+
+def _is_request_error(error: Exception) -> bool:
+    """Whether `error` is a failed HydroShare request: a transport error, or an unexpected HTTP
+    status, for which hsclient raises `Exception` itself."""
+    return (
+        isinstance(error, requests.exceptions.RequestException)
+        or type(error) is Exception
+    )
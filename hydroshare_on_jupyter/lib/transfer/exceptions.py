@@ -0,0 +1,20 @@
+class TransferError(Exception):
+    """Raised when a transfer cannot be completed after exhausting all retries. Partial progress
+    is retained, so a subsequent transfer of the same entity resumes where this one stopped.
+    """
+
+
+class IncompleteTransferError(Exception):
+    """Raised when a server closes a response before all expected bytes were received."""
+
+
+class ChecksumMismatchError(TransferError):
+    """Raised when the MD5 checksum of a downloaded file does not match the expected checksum. The
+    corrupt download is discarded."""
+
+    def __init__(self, url: str, expected: str, actual: str) -> None:
+        self.expected = expected
+        self.actual = actual
+        super().__init__(
+            f"checksum mismatch downloading {url}. expected md5 {expected}, got {actual}"
+        )
@@ -0,0 +1,269 @@
+import hashlib
+import logging
+import re
+import shutil
+import time
+from pathlib import Path
+import requests
+from hsclient import Resource
+from hsclient.utils import encode_resource_url
+
+# typing imports
+from typing import Dict, NamedTuple, Optional, Union
+
+from .exceptions import ChecksumMismatchError, IncompleteTransferError, TransferError
+from .transfer_state import DownloadState, remove, transfer_key
+
+_log = logging.getLogger(__name__)
+
+# Content-Range: bytes 100-199/1000
+CONTENT_RANGE_TOTAL_RE = re.compile(r"^bytes \d+-\d+/(\d+)$")
+
+# exceptions that indicate a transient network issue. these trigger a retry
+_RETRYABLE_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.Timeout,
+    IncompleteTransferError,
+)
+
+
+class CompletedDownload(NamedTuple):
+    path: Path
+    # md5 hexdigest of the downloaded file, computed while it was written
+    md5: str
+
+
+class _StreamingMD5:
+    """MD5 of the bytes appended to a file so far."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    @classmethod
+    def from_file(cls, path: Path) -> "_StreamingMD5":
+        digest = cls()
+        if path.exists():
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        return digest
+
+    def reset(self) -> None:
+        self._hash = hashlib.md5()
+        self.size = 0
+
+    def update(self, chunk: bytes) -> None:
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def hydroshare_url(resource: Resource, path: str) -> str:
+    """Build absolute, encoded url to a HydroShare path (e.g. `/resource/{id}/data/contents/file`)."""
+    return encode_resource_url(resource._hs_session._build_url(path))
+
+
+class ResumableDownloader:
+    """Download a url to a destination path using HTTP Range requests to resume partially
+    downloaded files after a dropped connection.
+
+    Partially downloaded files are written to a staging directory alongside a json state file
+    describing the transfer. Both are named after a hash of the url, so a download of the same url
+    issued after a server restart resumes from the bytes already on disk.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        staging_path: Union[Path, str],
+        *,
+        chunk_size: int = 1 << 20,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        timeout: float = 60.0,
+        poll_interval: float = 1.0,
+    ) -> None:
+        self._session = session
+        self.staging_path = Path(staging_path)
+        self.staging_path.mkdir(parents=True, exist_ok=True)
+
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    @classmethod
+    def from_resource(
+        cls, resource: Resource, staging_path: Union[Path, str], **kwargs
+    ) -> "ResumableDownloader":
+        """Create downloader using a HydroShare resource's authenticated session."""
+        return cls(resource._hs_session._session, staging_path, **kwargs)
+
+    def download(
+        self,
+        url: str,
+        destination: Union[Path, str],
+        *,
+        params: Optional[Dict[str, str]] = None,
+        content_type: Optional[str] = None,
+        expected_md5: Optional[str] = None,
+    ) -> CompletedDownload:
+        """Download `url` to `destination`, resuming a previous partial download if one exists.
+        The file's MD5 is computed as it is written.
+
+        Args:
+            url (str): absolute url
+            destination (Union[Path, str]): file path the completed download is moved to
+            params (Optional[Dict[str, str]]): query parameters
+            content_type (Optional[str]): if provided, responses of a different content type are
+                treated as "not ready" and polled (e.g. HydroShare bags are generated on request).
+            expected_md5 (Optional[str]): if provided, the downloaded file's MD5 is verified
+                before it is moved to `destination`.
+
+        Raises:
+            TransferError: download could not be completed in `max_retries` consecutive attempts.
+            ChecksumMismatchError: downloaded file does not match `expected_md5`.
+
+        Returns:
+            CompletedDownload: destination path and MD5 hexdigest
+        """
+        key = transfer_key(
+            url, *(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        )
+        part_path = self.staging_path / f"{key}.part"
+        state_path = self.staging_path / f"{key}.json"
+
+        state = DownloadState.load(state_path)
+        if state is None or state.url != url:
+            state = DownloadState(url=url)
+            remove(part_path)
+
+        digest = _StreamingMD5()
+        failures = 0
+        while True:
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            if digest.size != offset:
+                # resuming a download started by another downloader instance
+                digest = _StreamingMD5.from_file(part_path)
+            try:
+                if self._fetch(
+                    url, params, content_type, part_path, state, state_path, digest
+                ):
+                    break
+                # not ready, poll
+                time.sleep(self.poll_interval)
+                continue
+            except _RETRYABLE_EXCEPTIONS as e:
+                received = part_path.stat().st_size if part_path.exists() else 0
+                # only consecutive attempts that made no progress count against retries
+                failures = 0 if received > offset else failures + 1
+                if failures > self.max_retries:
+                    raise TransferError(
+                        f"failed to download {url} after {self.max_retries} retries. "
+                        f"{received} bytes retained for resuming."
+                    ) from e
+
+                _log.warning(f"download of {url} interrupted at {received} bytes: {e}")
+                time.sleep(self.backoff * 2 ** max(failures - 1, 0))
+
+        if not part_path.exists():
+            # empty response body
+            part_path.touch()
+        if digest.size != part_path.stat().st_size:
+            digest = _StreamingMD5.from_file(part_path)
+        md5 = digest.hexdigest()
+
+        if expected_md5 is not None and md5 != expected_md5.lower():
+            # do not resume a corrupt download
+            remove(part_path)
+            remove(state_path)
+            raise ChecksumMismatchError(url, expected_md5, md5)
+
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(part_path), destination)
+        remove(state_path)
+        return CompletedDownload(destination, md5)
+
+    def _fetch(
+        self,
+        url: str,
+        params: Optional[Dict[str, str]],
+        content_type: Optional[str],
+        part_path: Path,
+        state: DownloadState,
+        state_path: Path,
+        digest: _StreamingMD5,
+    ) -> bool:
+        """Make a single (range) request, appending received bytes to `part_path` and `digest`.
+        Return False if the resource is not yet ready to be downloaded."""
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            if state.etag:
+                # server responds with the full entity if it changed since the first request
+                headers["If-Range"] = state.etag
+
+        with self._session.get(
+            url,
+            params=params,
+            headers=headers,
+            stream=True,
+            allow_redirects=True,
+            timeout=self.timeout,
+        ) as response:
+            if (
+                response.status_code == 416
+                and state.total_size is not None
+                and offset == state.total_size
+            ):
+                # nothing left to download
+                return True
+
+            if response.status_code not in (200, 206):
+                raise TransferError(
+                    f"Failed GET {url}, status_code {response.status_code}, message {response.content}"
+                )
+
+            if (
+                content_type is not None
+                and response.status_code == 200
+                and response.headers.get("Content-Type") != content_type
+            ):
+                return False
+
+            if response.status_code == 200:
+                # range not supported or entity changed, start from the beginning
+                offset = 0
+                state.total_size = _int_or_none(response.headers.get("Content-Length"))
+            else:
+                match = CONTENT_RANGE_TOTAL_RE.match(
+                    response.headers.get("Content-Range", "")
+                )
+                state.total_size = int(match.group(1)) if match else None
+
+            state.etag = response.headers.get("ETag", state.etag)
+            state.save(state_path)
+
+            if not offset:
+                digest.reset()
+            with open(part_path, "ab" if offset else "wb") as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+                    digest.update(chunk)
+
+        received = part_path.stat().st_size
+        if state.total_size is not None and received < state.total_size:
+            raise IncompleteTransferError(
+                f"received {received} of {state.total_size} bytes"
+            )
+        return True
+
+
+def _int_or_none(value: Optional[str]) -> Optional[int]:
+    return int(value) if value is not None and value.isdigit() else None
@@ -0,0 +1,59 @@
+from pydantic import BaseModel
+from pathlib import Path
+import hashlib
+import logging
+
+# typing imports
+from typing import Optional, Set, Type, TypeVar, Union
+
+_log = logging.getLogger(__name__)
+
+S = TypeVar("S", bound="TransferState")
+
+
+class TransferState(BaseModel):
+    """Progress of a transfer persisted to disk, so it survives a server restart."""
+
+    @classmethod
+    def load(cls: Type[S], path: Union[Path, str]) -> Optional[S]:
+        """Load persisted state. None is returned if the state does not exist or is corrupt."""
+        path = Path(path)
+        if not path.is_file():
+            return None
+        try:
+            return cls.parse_file(path)
+        except ValueError:
+            _log.warning(f"ignoring corrupt transfer state file: {path}")
+            return None
+
+    def save(self, path: Union[Path, str]) -> None:
+        # write then rename, so a crash mid-write does not corrupt existing state
+        path = Path(path)
+        tmp = path.with_suffix(f"{path.suffix}.tmp")
+        tmp.write_text(self.json())
+        tmp.replace(path)
+
+
+class DownloadState(TransferState):
+    url: str
+    total_size: Optional[int] = None
+    etag: Optional[str] = None
+
+
+class UploadState(TransferState):
+    resource_id: str
+    n_chunks: int
+    completed_chunks: Set[int] = set()
+
+
+def transfer_key(*parts: str) -> str:
+    """Stable identifier for a transfer derived from the values that describe it."""
+    return hashlib.md5("\0".join(parts).encode()).hexdigest()
+
+
+def remove(path: Union[Path, str]) -> None:
+    """Delete `path`, if it exists. (`Path.unlink(missing_ok=True)` requires python 3.8)"""
+    try:
+        Path(path).unlink()
+    except FileNotFoundError:
+        pass
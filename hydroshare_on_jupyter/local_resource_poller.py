@@ -0,0 +1,128 @@
+import logging
+import threading
+
+# typing imports
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .lib.filesystem.fs_map import LocalFSMap
+from .lib.filesystem.fs_resource_map import LocalFSResourceMap
+from .lib.filesystem.ignore import IGNORE_FILENAME
+from .lib.filesystem.snapshot import IncrementalSnapshot
+from .lib.filesystem.types import ResourceId
+
+_log = logging.getLogger(__name__)
+
+# seconds between polls of all local resources
+DEFAULT_LOCAL_POLL_INTERVAL = 2.0
+# maximum number of files in unchanged directories checked for modifications, per resource per poll
+DEFAULT_LOCAL_POLL_BUDGET = 1000
+
+
+class LocalResourcePoller:
+    """Poll local resources for file changes in a background thread, as an alternative to watchdog
+    observers. Intended for network file systems (i.e. NFS) where inotify does not observe changes
+    made on other hosts.
+
+    Each resource in the local map has an `IncrementalSnapshot` of its `data/contents` directory.
+    Detected changes are applied directly to the resource's `LocalFSResourceMap` and `on_change` is
+    called once per changed resource. `budget` bounds the number of files checked for in-place
+    modifications per resource per poll.
+    """
+
+    def __init__(
+        self,
+        local_map: LocalFSMap,
+        on_change: Callable[[ResourceId], None],
+        interval: float = DEFAULT_LOCAL_POLL_INTERVAL,
+        budget: Optional[int] = DEFAULT_LOCAL_POLL_BUDGET,
+    ) -> None:
+        self._local_map = local_map
+        self._on_change = on_change
+        self.interval = interval
+        self.budget = budget
+
+        self._snapshots: Dict[
+            ResourceId, Tuple[LocalFSResourceMap, IncrementalSnapshot]
+        ] = dict()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="local-resource-poller", daemon=True
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+
+    def poll(self) -> List[ResourceId]:
+        """Poll each resource in the local map once. Return ids of changed resources."""
+        tracked = dict(self._local_map.items())
+        for resource_id in self._snapshots.keys() - tracked.keys():
+            del self._snapshots[resource_id]
+
+        changed = []
+        for resource_id, res_map in tracked.items():
+            try:
+                if self._poll_resource(resource_id, res_map):
+                    changed.append(resource_id)
+            except Exception:
+                _log.exception(f"failed to poll local resource {resource_id}")
+
+        for resource_id in changed:
+            self._on_change(resource_id)
+        return changed
+
+    # helpers
+    def _poll_resource(
+        self, resource_id: ResourceId, res_map: LocalFSResourceMap
+    ) -> bool:
+        entry = self._snapshots.get(resource_id)
+        # resource maps are replaced if a resource is removed and re-added
+        if entry is None or entry[0] is not res_map:
+            snapshot = IncrementalSnapshot(
+                res_map.contents_path,
+                ignore=lambda path, is_dir: res_map.ignore.matches(path, is_dir),
+            )
+            self._snapshots[resource_id] = (res_map, snapshot)
+            return self._reconcile(res_map, snapshot)
+
+        snapshot = entry[1]
+        changes = snapshot.update(self.budget)
+        for path in changes.deleted:
+            res_map.delete_file(path)
+        for path in changes.created:
+            res_map.add_file(path)
+        for path in changes.modified:
+            res_map.update_file(path)
+
+        ignore_file = res_map.contents_path / IGNORE_FILENAME
+        if ignore_file in (*changes.created, *changes.modified, *changes.deleted):
+            # ignore patterns changed, resource map was rebuilt. take new baseline next poll
+            del self._snapshots[resource_id]
+        return bool(changes)
+
+    @staticmethod
+    def _reconcile(res_map: LocalFSResourceMap, snapshot: IncrementalSnapshot) -> bool:
+        """Take baseline snapshot. Add files missing from the resource map and remove files that no
+        longer exist. Return True if the resource map changed."""
+        before = set(res_map.files)
+        present = snapshot.update(budget=0).created
+        for path in present:
+            res_map.add_file(path)
+
+        present = {path.relative_to(res_map.base_directory) for path in present}
+        for file in before - present:
+            res_map.delete_file(file)
+        return set(res_map.files) != before
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                _log.exception("failed to poll local resources")
+            self._stop.wait(self.interval)
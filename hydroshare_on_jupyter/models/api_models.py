@@ -3,13 +3,16 @@ from pydantic import (
     Field,
     StrictStr,
     StrictBool,
+    confloat,
+    conint,
     constr,
     validator,
 )
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 from hsclient import Token
 
 from .resource_type_enum import ResourceTypeEnum
+from .warm_up_status_enum import WarmUpStatusEnum
 
 
 class ModelNoExtra(BaseModel):
@@ -97,6 +100,27 @@ class CollectionOfResourceMetadata(BaseModel):
     __root__: List[ResourceMetadata]
 
 
+class ResourceListQuery(BaseModel):
+    """Query parameters accepted when listing a user's resources."""
+
+    # 1-based page number. ignored if `page_size` is not provided
+    page: conint(ge=1) = 1
+    page_size: Optional[conint(ge=1)] = None
+    # ResourceMetadata field name. prefix with `-` for descending order (i.e. `-date_last_updated`)
+    sort: Optional[str] = None
+    # case-insensitive resource title substring
+    q: Optional[str] = None
+    resource_type: Optional[str] = None
+    # bypass server side cache
+    refresh: bool = False
+
+    @validator("sort")
+    def sort_by_resource_metadata_field(cls, v):
+        if v is not None and v.lstrip("-") not in ResourceMetadata.__fields__:
+            raise ValueError(f"cannot sort by {v}")
+        return v
+
+
 class ResourceCreationRequest(BaseModel):
     title: str
     metadata: str
@@ -115,6 +139,164 @@ class ResourceFiles(BaseModel):
     files: List[constr(regex=r"^((?!~|\.{2}).)*$")] = Field(...)
 
 
+class ResourceFilesQuery(BaseModel):
+    """Query parameters accepted when listing a resource's files."""
+
+    # list immediate children of folder (relative to `data/contents/`) instead of all files
+    folder: Optional[constr(regex=r"^((?!~|\.{2}).)*$")] = None
+    # file path (or folder entry name if `folder` is provided) prefix filter
+    prefix: constr(regex=r"^((?!~|\.{2}).)*$") = ""
+    # opaque cursor returned by a previous request
+    cursor: Optional[str] = None
+    limit: Optional[conint(ge=1, le=10000)] = None
+
+
+class PaginatedResourceFiles(ResourceFiles):
+    # number of files matching the query's prefix filter
+    total: int = Field(...)
+    next_cursor: Optional[str] = None
+
+
+class ResourceFolderEntry(BaseModel):
+    name: str = Field(...)
+    path: str = Field(...)
+    is_folder: bool = Field(...)
+    # number of files that are descendants of a folder. null for files
+    file_count: Optional[int] = None
+
+
+class ResourceFolderListing(BaseModel):
+    folder: str = Field(...)
+    # number of files that are descendants of `folder`
+    file_count: int = Field(...)
+    entries: List[ResourceFolderEntry] = Field(...)
+    next_cursor: Optional[str] = None
+
+
+class ResourceWarmUpProgress(BaseModel):
+    # warm-up disabled or not yet started
+    enabled: bool = Field(...)
+    # resource id -> warm-up status. resources are warmed up in insertion order
+    resources: Dict[str, WarmUpStatusEnum] = Field(default_factory=dict)
+    total: int = 0
+    completed: int = 0
+    done: bool = False
+
+
+class BatchDownloadEntry(ModelNoExtra):
+    # HydroShare resource id, 32 lowercase hexadecimal characters
+    resource_id: constr(regex=r"^[0-9a-f]{32}$") = Field(...)
+    # path relative to resource's `data/contents` directory. cannot contain .. or ~
+    path: constr(regex=r"^((?!~|\.{2}).)*$") = Field(...)
+    is_folder: bool = False
+
+
+class BatchDownloadRequest(ModelNoExtra):
+    entries: List[BatchDownloadEntry] = Field(..., min_items=1)
+
+
+class BatchDownloadEntryResult(BatchDownloadEntry):
+    success: bool = Field(...)
+    # reason for failure
+    detail: Optional[str] = None
+
+
+class BatchDownloadResult(BaseModel):
+    success: bool = Field(...)
+    entries: List[BatchDownloadEntryResult] = Field(...)
+
+
+class FolderSyncStateQuery(BaseModel):
+    """Query parameters accepted when getting the sync state of a resource's folder."""
+
+    # folder relative to `data/contents/`. Default, the resource's `data/contents/` directory
+    folder: constr(regex=r"^((?!~|\.{2}).)*$") = ""
+
+
+class SyncCounts(BaseModel):
+    """Number of files in a folder, and its descendants, by sync status."""
+
+    in_sync: int = 0
+    out_of_sync: int = 0
+    only_local: int = 0
+    only_remote: int = 0
+    # size of the local files
+    bytes: int = 0
+
+
+class FolderSyncState(SyncCounts):
+    folder: str = Field(...)
+    # counts of the folder's immediate child folders, by folder name
+    folders: Dict[str, SyncCounts] = Field(default_factory=dict)
+
+
+class DedupStatistics(BaseModel):
+    """Files written from identical local files instead of being downloaded from HydroShare."""
+
+    files: int = 0
+    # bytes that were not downloaded
+    bytes_avoided: int = 0
+    # files by how they were written. `existing` files were already at their destination
+    existing: int = 0
+    hardlinked: int = 0
+    reflinked: int = 0
+    copied: int = 0
+
+
+class ProfileQuery(BaseModel):
+    """Query parameters accepted when profiling the server."""
+
+    # duration of the profile
+    seconds: confloat(gt=0, le=300) = 10
+    # samples per second
+    rate: confloat(gt=0, le=1000) = 100
+
+
+class MemoryQuery(BaseModel):
+    """Query parameters accepted when reporting the server's memory."""
+
+    # start (true) or stop (false) tracing memory allocations
+    trace: Optional[bool] = None
+    # maximum number of modules reported
+    limit: conint(ge=1) = 25
+
+
+class ModuleMemory(BaseModel):
+    module: str = Field(...)
+    # bytes allocated, since tracing started, and not yet freed
+    size: int = Field(...)
+    count: int = Field(...)
+
+
+class ResourceMapMemory(BaseModel):
+    resource_id: str = Field(...)
+    local_files: int = Field(...)
+    # approximate bytes retained by the resource's local and remote file maps
+    local_size: int = Field(...)
+    remote_files: int = Field(...)
+    remote_size: int = Field(...)
+
+
+class ResourceCacheInfo(BaseModel):
+    # lookups of the session's cached HydroShare resource objects
+    hits: int = Field(...)
+    misses: int = Field(...)
+    maxsize: int = Field(...)
+    currsize: int = Field(...)
+
+
+class MemoryReport(BaseModel):
+    # tracemalloc is tracing allocations. `modules` is empty if not
+    tracing: bool = Field(...)
+    traced_size: int = 0
+    traced_peak: int = 0
+    modules: List[ModuleMemory] = Field(default_factory=list)
+    # resource maps of the user's sync session
+    resource_maps: List[ResourceMapMemory] = Field(default_factory=list)
+    # None if the session does not cache resources
+    resource_cache: Optional[ResourceCacheInfo] = None
+
+
 class DataDir(BaseModel):
     data_directory: str = Field(...)
 
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class WarmUpStatusEnum(Enum):
+    pending = "pending"
+    warming = "warming"
+    warm = "warm"
+    failed = "failed"
@@ -0,0 +1,209 @@
+from dataclasses import dataclass
+from datetime import datetime
+from hsclient import HydroShare
+from pydantic import ValidationError, parse_obj_as
+import logging
+import threading
+import time
+
+# typing imports
+from typing import Callable, Dict, Iterable, Optional, Union
+
+from .lib.filesystem.types import ResourceId
+
+_log = logging.getLogger(__name__)
+
+# seconds between polls of a resource that recently changed
+DEFAULT_REMOTE_POLL_MIN_INTERVAL = 15.0
+# upper bound of seconds between polls of an idle resource
+DEFAULT_REMOTE_POLL_MAX_INTERVAL = 600.0
+# number of due resources at or above which all resources are polled using a single search request
+DEFAULT_REMOTE_POLL_BATCH_THRESHOLD = 4
+
+LastUpdated = Union[datetime, str]
+
+
+def _parse_last_updated(value: str) -> LastUpdated:
+    # normalize, HydroShare endpoints do not format dates identically
+    try:
+        return parse_obj_as(datetime, value)
+    except ValidationError:
+        return value
+
+
+def search_last_updated(hydroshare: HydroShare) -> Dict[ResourceId, LastUpdated]:
+    """`date_last_updated` of each resource a user can edit. Fetched in pages using the HydroShare
+    search endpoint, ergo one request per page, not per resource."""
+    return {
+        res.resource_id: _parse_last_updated(res.date_last_updated)
+        for res in hydroshare.search(edit_permission=True)
+    }
+
+
+def resource_last_updated(
+    hydroshare: HydroShare, resource_id: ResourceId
+) -> LastUpdated:
+    """`date_last_updated` of a single resource from its system metadata."""
+    sysmeta = hydroshare.resource(resource_id).system_metadata()
+    return _parse_last_updated(sysmeta["date_last_updated"])
+
+
+@dataclass
+class _PollState:
+    interval: float
+    next_poll: float
+    last_updated: Optional[LastUpdated] = None
+
+
+class RemoteResourcePoller:
+    """Poll HydroShare for changes to tracked resources in a background thread.
+
+    Each resource is polled at its own adaptive interval. The interval is reset to `min_interval`
+    when a resource changes (or is marked active) and doubles each time it is polled without change,
+    up to `max_interval`. Due resources are polled individually, unless `batch_threshold` or more are
+    due, then all tracked resources are polled at once using `fetch_all`. `on_change` is called with
+    the id of each resource whose `date_last_updated` changed since it was last polled.
+    """
+
+    def __init__(
+        self,
+        tracked: Callable[[], Iterable[ResourceId]],
+        fetch_one: Callable[[ResourceId], LastUpdated],
+        fetch_all: Callable[[], Dict[ResourceId, LastUpdated]],
+        on_change: Callable[[ResourceId], None],
+        min_interval: float = DEFAULT_REMOTE_POLL_MIN_INTERVAL,
+        max_interval: float = DEFAULT_REMOTE_POLL_MAX_INTERVAL,
+        batch_threshold: int = DEFAULT_REMOTE_POLL_BATCH_THRESHOLD,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._tracked = tracked
+        self._fetch_one = fetch_one
+        self._fetch_all = fetch_all
+        self._on_change = on_change
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.batch_threshold = batch_threshold
+        self._timer = timer
+
+        self._states: Dict[ResourceId, _PollState] = dict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_hydroshare(
+        cls,
+        hydroshare: HydroShare,
+        tracked: Callable[[], Iterable[ResourceId]],
+        on_change: Callable[[ResourceId], None],
+        **kwargs,
+    ) -> "RemoteResourcePoller":
+        return cls(
+            tracked,
+            fetch_one=lambda resource_id: resource_last_updated(
+                hydroshare, resource_id
+            ),
+            fetch_all=lambda: search_last_updated(hydroshare),
+            on_change=on_change,
+            **kwargs,
+        )
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="remote-resource-poller", daemon=True
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def mark_active(self, resource_id: ResourceId) -> None:
+        """Poll a resource at the minimum interval. Use when a resource is known to have changed,
+        i.e. after this extension uploads to it. The next observed `date_last_updated` is treated as
+        the new baseline, not as a change."""
+        with self._lock:
+            state = self._states.get(resource_id)
+            if state is not None:
+                state.interval = self.min_interval
+                state.next_poll = self._timer() + self.min_interval
+                state.last_updated = None
+        self._wake.set()
+
+    def poll(self) -> float:
+        """Poll due resources. Return seconds until the next resource is due."""
+        now = self._timer()
+        tracked = set(self._tracked())
+
+        with self._lock:
+            # forget untracked resources, start tracking new resources
+            for resource_id in self._states.keys() - tracked:
+                del self._states[resource_id]
+            for resource_id in tracked - self._states.keys():
+                # first poll establishes baseline
+                self._states[resource_id] = _PollState(
+                    interval=self.min_interval, next_poll=now
+                )
+            due = [r for r, s in self._states.items() if s.next_poll <= now]
+
+        if len(due) >= self.batch_threshold:
+            observed = self._fetch_all()
+            # already have the dates of every tracked resource, no reason to ignore them
+            observed = {r: observed[r] for r in tracked if r in observed}
+        else:
+            observed = dict()
+            for resource_id in due:
+                try:
+                    observed[resource_id] = self._fetch_one(resource_id)
+                except Exception:
+                    _log.exception(f"failed to poll resource {resource_id}")
+
+        changed = []
+        with self._lock:
+            for resource_id, last_updated in observed.items():
+                state = self._states.get(resource_id)
+                if state is None:
+                    continue
+                if (
+                    state.last_updated is not None
+                    and state.last_updated != last_updated
+                ):
+                    changed.append(resource_id)
+                    state.interval = self.min_interval
+                elif state.last_updated is not None:
+                    state.interval = min(state.interval * 2, self.max_interval)
+                state.last_updated = last_updated
+                state.next_poll = now + state.interval
+
+            # resources that failed to poll are retried at their current interval
+            for resource_id in due:
+                state = self._states.get(resource_id)
+                if state is not None and state.next_poll <= now:
+                    state.next_poll = now + state.interval
+
+            next_poll = min(
+                (s.next_poll for s in self._states.values()),
+                default=now + self.max_interval,
+            )
+
+        for resource_id in changed:
+            _log.info(f"resource {resource_id} changed on HydroShare")
+            self._on_change(resource_id)
+
+        return max(0.0, next_poll - self._timer())
+
+    # helpers
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                delay = self.poll()
+            except Exception:
+                _log.exception("failed to poll HydroShare for resource changes")
+                delay = self.max_interval
+
+            # newly tracked resources are picked up within the minimum interval
+            self._wake.wait(min(delay, self.min_interval))
+            self._wake.clear()
@@ -0,0 +1,110 @@
+import logging
+import threading
+import time
+
+# typing imports
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .lib.filesystem.types import ResourceId
+
+_log = logging.getLogger(__name__)
+
+# seconds between checks for idle resources
+DEFAULT_EVICTION_INTERVAL = 60.0
+
+
+class ResourceEvictionScheduler:
+    """Evict resources that are idle from memory in a background thread.
+
+    A resource is idle if it has not been accessed (see `touch`) for `idle_timeout` seconds. If more
+    than `max_resources` are tracked, the least recently accessed resources are evicted too.
+    `on_evict` is called with the id of each evicted resource and is expected to remove it from
+    `tracked`. Either policy is disabled if its limit is None.
+    """
+
+    def __init__(
+        self,
+        tracked: Callable[[], Iterable[ResourceId]],
+        on_evict: Callable[[ResourceId], None],
+        idle_timeout: Optional[float] = None,
+        max_resources: Optional[int] = None,
+        interval: float = DEFAULT_EVICTION_INTERVAL,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._tracked = tracked
+        self._on_evict = on_evict
+        self.idle_timeout = idle_timeout
+        self.max_resources = max_resources
+        self.interval = interval
+        self._timer = timer
+
+        # resource id: time of last access
+        self._last_access: Dict[ResourceId, float] = dict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="resource-eviction-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+
+    def touch(self, resource_id: ResourceId, *args, **kwargs) -> None:
+        """Record an access of a resource. Extra arguments are ignored so `touch` can subscribe to
+        any resource event."""
+        with self._lock:
+            self._last_access[resource_id] = self._timer()
+
+    def due(self) -> List[ResourceId]:
+        """Return tracked resources that should be evicted, least recently accessed first."""
+        now = self._timer()
+        tracked = set(self._tracked())
+
+        with self._lock:
+            # forget untracked resources. resources first seen are treated as just accessed
+            for resource_id in self._last_access.keys() - tracked:
+                del self._last_access[resource_id]
+            for resource_id in tracked - self._last_access.keys():
+                self._last_access[resource_id] = now
+            by_access = sorted(self._last_access, key=self._last_access.__getitem__)
+
+        n_over_budget = 0
+        if self.max_resources is not None:
+            n_over_budget = max(0, len(by_access) - self.max_resources)
+
+        due = by_access[:n_over_budget]
+        if self.idle_timeout is not None:
+            due.extend(
+                resource_id
+                for resource_id in by_access[n_over_budget:]
+                if now - self._last_access.get(resource_id, now) >= self.idle_timeout
+            )
+        return due
+
+    def evict(self) -> List[ResourceId]:
+        """Evict due resources. Return ids of evicted resources."""
+        evicted = []
+        for resource_id in self.due():
+            try:
+                self._on_evict(resource_id)
+            except Exception:
+                _log.exception(f"failed to evict resource {resource_id}")
+                continue
+            with self._lock:
+                self._last_access.pop(resource_id, None)
+            evicted.append(resource_id)
+        return evicted
+
+    # helpers
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.evict()
+            except Exception:
+                _log.exception("failed to evict idle resources")
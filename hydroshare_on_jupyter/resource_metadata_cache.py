@@ -0,0 +1,125 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import threading
+import time
+
+# typing imports
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from .models.api_models import ResourceListQuery, ResourceMetadata
+
+_log = logging.getLogger(__name__)
+
+DEFAULT_RESOURCE_LIST_MAX_AGE = 60.0  # seconds
+
+
+class ResourceMetadataSnapshot(NamedTuple):
+    resources: List[ResourceMetadata]
+    # time.monotonic() at which snapshot was fetched
+    fetched: float
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched
+
+
+class ResourceMetadataCache:
+    """Stale-while-revalidate cache of the metadata of HydroShare resources a user can edit.
+
+    Once populated, the cached snapshot is always served immediately. If it is older than
+    `max_age` seconds, a refresh is started in a background thread and subsequent requests are
+    served the refreshed snapshot once it is available. Only the first request (or an explicit
+    refresh) waits on HydroShare.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], List[ResourceMetadata]],
+        max_age: float = DEFAULT_RESOURCE_LIST_MAX_AGE,
+    ) -> None:
+        self._fetch = fetch
+        self.max_age = max_age
+
+        self._snapshot: Optional[ResourceMetadataSnapshot] = None
+        self._inflight: Optional[Future] = None
+        self._lock = threading.Lock()
+        # single worker, at most one refresh in flight at a time
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="resource-metadata-cache"
+        )
+
+    def get(self, refresh: bool = False) -> ResourceMetadataSnapshot:
+        """Return cached snapshot, fetching (and waiting on) a new snapshot if the cache is empty or
+        `refresh` is True. Stale snapshots trigger a background refresh."""
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and not refresh:
+                if snapshot.age > self.max_age:
+                    self._refresh_in_background()
+                return snapshot
+
+            future = self._refresh_in_background()
+
+        # blocks. propagates fetch exceptions to caller.
+        return future.result()
+
+    def refresh_in_background(self) -> Future:
+        """Start a background refresh, if one is not already in flight."""
+        with self._lock:
+            return self._refresh_in_background()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    @property
+    def snapshot(self) -> Optional[ResourceMetadataSnapshot]:
+        return self._snapshot
+
+    # helpers
+    def _refresh_in_background(self) -> Future:
+        # NOTE: caller must hold `_lock`
+        if self._inflight is None or self._inflight.done():
+            self._inflight = self._executor.submit(self._refresh)
+        return self._inflight
+
+    def _refresh(self) -> ResourceMetadataSnapshot:
+        start = time.monotonic()
+        try:
+            resources = self._fetch()
+        except Exception:
+            _log.exception("failed to refresh resource metadata cache")
+            raise
+
+        snapshot = ResourceMetadataSnapshot(resources=resources, fetched=start)
+        self._snapshot = snapshot
+        _log.info(
+            f"refreshed {len(resources)} resources in {time.monotonic() - start:.2f}s"
+        )
+        return snapshot
+
+
+def query_resources(
+    resources: List[ResourceMetadata], query: ResourceListQuery
+) -> Tuple[int, List[ResourceMetadata]]:
+    """Filter, sort, and paginate resources. Return the number of resources matching the query's
+    filters and the requested page."""
+    if query.q:
+        needle = query.q.lower()
+        resources = [r for r in resources if needle in r.resource_title.lower()]
+    if query.resource_type:
+        resources = [r for r in resources if r.resource_type == query.resource_type]
+
+    if query.sort:
+        field = query.sort.lstrip("-")
+        resources = sorted(
+            resources,
+            key=lambda r: getattr(r, field),
+            reverse=query.sort.startswith("-"),
+        )
+
+    total = len(resources)
+    if query.page_size is not None:
+        start = (query.page - 1) * query.page_size
+        resources = resources[start : start + query.page_size]
+
+    return total, resources
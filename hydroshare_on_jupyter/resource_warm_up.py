@@ -0,0 +1,141 @@
+from pathlib import Path
+import logging
+import threading
+import time
+
+# typing imports
+from typing import Callable, Dict, List, Optional
+
+from .lib.filesystem.fs_map import LocalFSMap
+from .lib.filesystem.types import ResourceId
+from .models.api_models import ResourceWarmUpProgress
+from .models.warm_up_status_enum import WarmUpStatusEnum
+
+_log = logging.getLogger(__name__)
+
+# seconds the warm-up thread sleeps between resources, yielding to request handlers
+DEFAULT_WARM_UP_PAUSE = 0.5
+
+
+def _last_modified(resource_path: Path) -> float:
+    """Most recent mtime of a local resource's base and `data/contents` directories. Directory mtimes
+    change when entries are added or removed, so this is a cheap proxy for recent activity.
+    """
+    candidates = [
+        resource_path,
+        resource_path / resource_path.name,
+        resource_path / resource_path.name / "data" / "contents",
+    ]
+    mtimes = []
+    for path in candidates:
+        try:
+            mtimes.append(path.stat().st_mtime)
+        except OSError:
+            continue
+    return max(mtimes, default=0.0)
+
+
+class ResourceWarmUpScheduler:
+    """Warm up local resources in a background thread after login.
+
+    Local resources are discovered using `LocalFSMap._get_resource_ids` and warmed up one at a time,
+    most recently modified first. Warming a resource (i.e. hashing local files and fetching the
+    HydroShare manifest) is delegated to `warm_up`, typically a dispatch of the
+    `RESOURCE_FILES_LISTED` event. The scheduler runs at low priority: a single thread that pauses
+    between resources and skips resources a user has already listed.
+    """
+
+    def __init__(
+        self,
+        local_map: LocalFSMap,
+        warm_up: Callable[[ResourceId], None],
+        pause: float = DEFAULT_WARM_UP_PAUSE,
+    ) -> None:
+        self._local_map = local_map
+        self._warm_up = warm_up
+        self.pause = pause
+
+        # insertion ordered. populated when the warm-up thread starts
+        self._statuses: Dict[ResourceId, WarmUpStatusEnum] = dict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._done = False
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="resource-warm-up", daemon=True
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """Stop warming up resources. A resource that is being warmed up is finished in the
+        background."""
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def progress(self) -> ResourceWarmUpProgress:
+        with self._lock:
+            statuses = dict(self._statuses)
+            done = self._done
+        completed = sum(
+            1
+            for status in statuses.values()
+            if status in (WarmUpStatusEnum.warm, WarmUpStatusEnum.failed)
+        )
+        return ResourceWarmUpProgress(
+            enabled=True,
+            resources=statuses,
+            total=len(statuses),
+            completed=completed,
+            done=done,
+        )
+
+    # helpers
+    def _discover(self) -> List[ResourceId]:
+        """Local resource ids, most recently modified first."""
+        fs_root = self._local_map.fs_root
+        resource_ids = self._local_map._get_resource_ids()
+        return sorted(
+            resource_ids,
+            key=lambda resource_id: _last_modified(fs_root / resource_id),
+            reverse=True,
+        )
+
+    def _set_status(self, resource_id: ResourceId, status: WarmUpStatusEnum) -> None:
+        with self._lock:
+            self._statuses[resource_id] = status
+
+    def _run(self) -> None:
+        start = time.monotonic()
+        resource_ids = self._discover()
+        with self._lock:
+            self._statuses = {r: WarmUpStatusEnum.pending for r in resource_ids}
+        _log.info(f"warming up {len(resource_ids)} local resources")
+
+        for resource_id in resource_ids:
+            if self._stop.is_set():
+                break
+
+            # skip resources already listed by the user
+            if resource_id not in self._local_map:
+                self._set_status(resource_id, WarmUpStatusEnum.warming)
+                try:
+                    self._warm_up(resource_id)
+                except Exception:
+                    _log.exception(f"failed to warm up resource {resource_id}")
+                    self._set_status(resource_id, WarmUpStatusEnum.failed)
+                    continue
+
+            self._set_status(resource_id, WarmUpStatusEnum.warm)
+            # yield to request handlers
+            self._stop.wait(self.pause)
+
+        with self._lock:
+            self._done = True
+        _log.info(f"warm up finished in {time.monotonic() - start:.2f}s")
@@ -0,0 +1,63 @@
+from inspect import isclass
+from tornado.httputil import HTTPServerConnectionDelegate, HTTPServerRequest
+from tornado.routing import Router, RuleRouter
+from tornado.web import Application, ErrorHandler, RequestHandler
+import logging
+
+# typing imports
+from typing import Any, Callable, List, Optional
+
+_log = logging.getLogger(__name__)
+
+
+class _HandlerRouter(RuleRouter):
+    """RuleRouter that delegates to `RequestHandler` targets of an application (see tornado's
+    `_ApplicationRouter`)."""
+
+    def __init__(self, application: Application, rules: List[Any]) -> None:
+        self.application = application
+        super().__init__(rules)
+
+    def get_target_delegate(
+        self, target: Any, request: HTTPServerRequest, **target_params
+    ):
+        if isclass(target) and issubclass(target, RequestHandler):
+            return self.application.get_handler_delegate(
+                request, target, **target_params
+            )
+        return super().get_target_delegate(target, request, **target_params)
+
+
+class LazyRouter(Router):
+    """Route requests to handlers that are imported on first request.
+
+    Registered in place of the extension's handlers, so importing the handlers (and their
+    dependencies, i.e. hsclient and watchdog) does not add to Jupyter server start up time.
+    `load_rules` returns tornado routing rules. It is called on the first request that reaches the
+    router and retried on the next request if it fails.
+    """
+
+    def __init__(
+        self, application: Application, load_rules: Callable[[], List[Any]]
+    ) -> None:
+        self._application = application
+        self._load_rules = load_rules
+        self._router: Optional[_HandlerRouter] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._router is not None
+
+    def find_handler(
+        self, request: HTTPServerRequest, **kwargs
+    ) -> Optional[HTTPServerConnectionDelegate]:
+        if self._router is None:
+            try:
+                self._router = _HandlerRouter(self._application, self._load_rules())
+            except Exception:
+                _log.exception("failed to load request handlers")
+                return self._application.get_handler_delegate(
+                    request, ErrorHandler, {"status_code": 500}
+                )
+        # path arguments are matched again by the loaded rules
+        return self._router.find_handler(request)
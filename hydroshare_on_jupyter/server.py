@@ -10,13 +10,17 @@ from pathlib import Path
 from http import HTTPStatus
 import secrets
 import re
+import threading
+import tracemalloc
+from dataclasses import asdict
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import ValidationError
+from tornado.ioloop import IOLoop
+from tornado.web import HTTPError
 
 from jupyter_server.base.handlers import JupyterHandler
-from notebook.utils import url_path_join
-from typing import Union, List, Optional
-from tempfile import TemporaryDirectory
-from zipfile import ZipFile
+from typing import Union, List, Optional, Tuple
 
 from hsclient import HydroShare
 
@@ -29,22 +33,86 @@ from .models.api_models import (
     Success,
     CollectionOfResourceMetadata,
     ResourceFiles,
+    ResourceFilesQuery,
+    PaginatedResourceFiles,
+    ResourceFolderEntry,
+    ResourceFolderListing,
+    ResourceListQuery,
+    ResourceMetadata,
+    ResourceWarmUpProgress,
+    BatchDownloadRequest,
+    BatchDownloadEntryResult,
+    BatchDownloadResult,
+    FolderSyncState,
+    FolderSyncStateQuery,
+    DedupStatistics,
+    MemoryQuery,
+    MemoryReport,
+    ResourceCacheInfo,
+    ProfileQuery,
 )
 from .models.oauth import OAuthFile
-from .session_struct import SessionStruct
-from .session import session_sync_struct
+from .hydroshare_resource_cache import (
+    HydroShareWithResourceCache,
+    hydroshare_host,
+    DEFAULT_HYDROSHARE_URL,
+    DEFAULT_RESOURCE_CACHE_SIZE,
+    DEFAULT_RESOURCE_CACHE_TTL,
+)
+from .session_struct import SessionStruct, SessionSyncStruct
+from .resource_metadata_cache import (
+    ResourceMetadataCache,
+    DEFAULT_RESOURCE_LIST_MAX_AGE,
+    query_resources,
+)
+from .local_resource_poller import (
+    DEFAULT_LOCAL_POLL_INTERVAL,
+    DEFAULT_LOCAL_POLL_BUDGET,
+)
+from .remote_resource_poller import (
+    DEFAULT_REMOTE_POLL_MIN_INTERVAL,
+    DEFAULT_REMOTE_POLL_MAX_INTERVAL,
+)
+from .session import SessionLimitError, session_registry
 
 # from .websocket_handler import FileSystemEventWebSocketHandler
 from .lib.resource_factories import HydroShareEntityDownloadFactory, EntityTypeEnum
+from .lib.resource_strategies import HydroShareBagDownloadStrategy
+from .lib.batch_download import (
+    DownloadEntry,
+    batch_download,
+    DEFAULT_MAX_CONCURRENT_DOWNLOADS,
+)
+from .lib.transfer.chunked_upload import ChunkedUploader
+from .lib.filesystem.content_index import ContentIndex
+from .lib.filesystem.exceptions import AggregateFSMapResourceMembershipError
+from .lib.filesystem.ignore import (
+    DEFAULT_IGNORE_PATTERNS,
+    IGNORE_FILENAME,
+    IgnoreMatcher,
+)
+from .lib.filesystem.resource_directory_index import (
+    InvalidCursorError,
+    ResourceDirectoryIndexCache,
+)
+from .lib.profiling import SamplingProfiler, memory_by_module, resource_map_memory
+from .lib.tracing import span
+from .utilities.pathlib_utils import app_state_path
+
+# bagit payload manifest, relative to a resource's base directory
+BAG_MANIFEST_FILENAME = "manifest-md5.txt"
+
+# application state subdirectory where chunked upload progress is persisted
+UPLOAD_STATE_DIRNAME = ("transfers", "uploads")
+
+# worker threads shared by all batch download requests. created on first use, see `_download_executor`
+_DOWNLOAD_EXECUTOR: Optional[ThreadPoolExecutor] = None
 
-# Global singleton session wrapper. Contains:
-# - hs_client.HydroShare instance
-# - deciphered user cookie
-# - last user activity time
-# NOTE: This should be a bound composition element or collection in the future.
-# The current state does not support multiple connected users.
-# activity initialized at -1, ergo no connection made
-SESSION = SessionStruct(session=None, cookie=None, id=None, username=None)
+# one profile is taken at a time, concurrent profiles would sample each other
+_PROFILE_LOCK = threading.Lock()
+
+# directory indexes of resource files. indexes are rebuilt when a resource's manifest is re-fetched
+RESOURCE_DIRECTORY_INDEXES = ResourceDirectoryIndexCache()
 
 
 class SessionMixIn:
@@ -60,13 +128,18 @@ class SessionMixIn:
         return self.validate_session()
 
     def get_session(self) -> SessionStruct:
-        return SESSION
+        """Session of the client cookie. Empty if the client is not logged in."""
+        return session_registry.get(self.get_client_cookie())
+
+    def get_sync_session(self) -> Union[SessionSyncStruct, None]:
+        """Sync session of the logged in user. None if the client is not logged in."""
+        return session_registry.get_sync_session(self.get_client_cookie())
 
     def get_hs_session(self) -> HydroShare:
-        return SESSION.session
+        return self.get_session().session
 
     def get_session_id(self) -> Union[int, None]:
-        return SESSION.id
+        return self.get_session().id
 
     def get_client_cookie(self) -> Union[bytes, None]:
         """Get deciphered cookie value from client request"""
@@ -108,6 +181,15 @@ class BaseRequestHandler(SessionMixIn, JupyterHandler):  # TODO: will need to ch
         # NOTE: hardcoded to login path, may want to change in the future
         return "/syncApi/login"
 
+    async def _execute(self, transforms, *args, **kwargs) -> None:
+        # @overrides RequestHandler._execute. trace the entire request, `prepare` through
+        # `on_finish`; spans of events dispatched by the handler are its children
+        with span(
+            f"{type(self).__name__}.{self.request.method.lower()}",
+            path=self.request.path,
+        ):
+            return await super()._execute(transforms, *args, **kwargs)
+
     def prepare(self):
         # NOTE: See: https://www.tornadoweb.org/en/stable/guide/security.html#user-authentication for a potential alternative solution
         super().prepare()
@@ -117,6 +199,12 @@ class BaseRequestHandler(SessionMixIn, JupyterHandler):  # TODO: will need to ch
             uri = self.request.uri
             self.redirect(f"{self.get_login_url()}?next={uri}")
 
+    def dispatch_event(self, event: str, *args, **kwargs) -> None:
+        """Dispatch an event to the user's sync session, if it exists."""
+        sync_session = self.get_sync_session()
+        if sync_session is not None:
+            sync_session.event_broker.dispatch(event, *args, **kwargs)
+
     def options(self, _=None):
         # web browsers make an OPTIONS request to check what methods (line 31)
         # are allowed at/for an endpoint.
@@ -132,6 +220,25 @@ class BaseRequestHandler(SessionMixIn, JupyterHandler):  # TODO: will need to ch
         """Local HydroShare resources file system location."""
         return Path(self.settings.get("data_path"))
 
+    @property
+    def ignore_patterns(self) -> Tuple[str, ...]:
+        """gitignore-style patterns of local files that are not synced. Configured patterns extend
+        the default patterns."""
+        return (*DEFAULT_IGNORE_PATTERNS, *self.settings.get("ignore_patterns", []))
+
+    @property
+    def content_index(self) -> Optional[ContentIndex]:
+        """Index of the logged in user's local files, consulted before files are downloaded. None
+        if local deduplication is disabled or the user is not syncing."""
+        if not self.settings.get("local_dedup", True):
+            return None
+        aggregate_fs_map = getattr(self.get_sync_session(), "aggregate_fs_map", None)
+        if aggregate_fs_map is None:
+            return None
+        return aggregate_fs_map.get_content_index(
+            self.settings.get("local_dedup_hardlinks", False)
+        )
+
     @property
     def oauth_creds(self) -> Union[OAuthCredentials, None]:
         """Local HydroShare resources file system location."""
@@ -154,8 +261,14 @@ class MutateSessionMixIn:
     """MixIn allowing mutation current session."""
 
     def set_session(self, session: SessionStruct) -> None:
-        global SESSION
-        SESSION = session
+        session_registry.add(
+            session,
+            max_sessions=self.settings.get("max_sessions"),
+            max_user_sessions=self.settings.get("max_sessions_per_user"),
+        )
+
+    def remove_session(self) -> None:
+        session_registry.remove(self.get_client_cookie())
 
 
 class WebAppHandler(HeadersMixIn, BaseRequestHandler):
@@ -257,6 +370,8 @@ class LoginHandler(MutateSessionMixIn, HeadersMixIn, BaseRequestHandler):
     # instance flag indicating if a request concluded in a successful login.
     # switched in `post`. used in `on_finish` to instantiate local and remote FSMaps
     successful_login = False
+    # deciphered cookie of the session created or validated by a request. set in `post`
+    session_cookie: Optional[bytes] = None
 
     def prepare(self):
         if self.request.headers.get("Content-Type", None) != "application/json":
@@ -278,10 +393,17 @@ class LoginHandler(MutateSessionMixIn, HeadersMixIn, BaseRequestHandler):
 
         self.successful_login = True
         # client and server cookies don't match or is out of date
-        if not self.get_client_server_cookie_status():
+        if self.get_client_server_cookie_status():
+            self.session_cookie = self.get_client_cookie()
+        else:
             try:
                 self._create_session(credentials)
 
+            except SessionLimitError as e:
+                self.successful_login = False
+                self.log.warning(e)
+                self.set_status(HTTPStatus.SERVICE_UNAVAILABLE)  # 503
+
             except Exception as e:
                 self.successful_login = False
                 self.log.exception(e)
@@ -294,7 +416,19 @@ class LoginHandler(MutateSessionMixIn, HeadersMixIn, BaseRequestHandler):
         self.write(Success(success=self.successful_login).dict())
 
     def _create_session(self, credentials: Credentials) -> None:
-        hs = HydroShare(**credentials.dict())
+        hs = HydroShareWithResourceCache(
+            **credentials.dict(),
+            **hydroshare_host(
+                self.settings.get("hydroshare_url", DEFAULT_HYDROSHARE_URL)
+            ),
+            cache_maxsize=self.settings.get(
+                "resource_cache_size", DEFAULT_RESOURCE_CACHE_SIZE
+            ),
+            cache_ttl=self.settings.get(
+                "resource_cache_ttl", DEFAULT_RESOURCE_CACHE_TTL
+            ),
+            connection_pool=session_registry.connection_pool,
+        )
         user_info = hs.my_user_info()
         user_id = int(user_info["id"])
         username = user_info["username"]
@@ -302,64 +436,152 @@ class LoginHandler(MutateSessionMixIn, HeadersMixIn, BaseRequestHandler):
         # salt the user id and create salted cookie
         salt = secrets.randbits(16)
         salted_token = f"{user_id}{salt}".encode()
-
-        # cookie is tied to session, meaning it has no expire date
-        self.set_secure_cookie(self.session_cookie_key, salted_token, expires_days=None)
         self.log.info("creating session")
 
+        # resources a user can edit are cached and served stale while revalidating
+        resource_metadata_cache = ResourceMetadataCache(
+            partial(_list_editable_resources, hs),
+            max_age=self.settings.get(
+                "resource_list_max_age", DEFAULT_RESOURCE_LIST_MAX_AGE
+            ),
+        )
+
         self.set_session(
             SessionStruct(
-                session=hs, cookie=salted_token, id=user_id, username=username
+                session=hs,
+                cookie=salted_token,
+                id=user_id,
+                username=username,
+                resource_metadata_cache=resource_metadata_cache,
             )
         )
+        self.session_cookie = salted_token
+
+        # cookie is tied to session, meaning it has no expire date
+        self.set_secure_cookie(self.session_cookie_key, salted_token, expires_days=None)
 
     def on_finish(self) -> None:
-        if self.successful_login and session_sync_struct.is_empty:
-
-            # it is possible for a user who does not send cookies with their request to "login"
-            # multiple times. this is unlikely, but it is possible. additionally, logins from
-            # different browser tabs may also cause result in multiple successful logins.
-            # note: here, it is assumed and implicitly enforced that a user cannot be logged into
-            # multiple accounts at once. in the future, this may be desirable, but at the moment
-            # this is not possible. the session cookie is retains the login state. even if a user
-            # logins in successfully, gets a cookie, and then logs in with a different account (but
-            # sends the first session cookie) the first account will remain logged in.
-
-            # only create new sync session if the current is empty
-            # NOTE: based on the way `is_empty` is implemented, it is possible for some attrs of the
-            # _SessionSyncSingleton to be empty/None and some to be present and True is returned.
-            # this may come up in the future as a place where the session is corrupted.
-            hs_session = self.get_hs_session()
-            self.log.info("got hydroshare session")
-            session_sync_struct.new_sync_session(self.data_path, hs_session)
-            self.log.info("created sync session")
+        if not self.successful_login or self.session_cookie is None:
+            return
+
+        # a user's sync session is shared by all of their sessions (i.e. logins from other browser
+        # tabs or devices). only create one if this is the user's first session
+        session = session_registry.get(self.session_cookie)
+        if session.id is None or session_registry.has_sync_session(session.id):
+            return
+
+        session_registry.new_sync_session(
+            self.session_cookie,
+            self.data_path,
+            session.session,
+            warm_up=self.settings.get("warm_up", False),
+            remote_poll=self.settings.get("remote_poll", False),
+            remote_poll_min_interval=self.settings.get(
+                "remote_poll_min_interval", DEFAULT_REMOTE_POLL_MIN_INTERVAL
+            ),
+            remote_poll_max_interval=self.settings.get(
+                "remote_poll_max_interval", DEFAULT_REMOTE_POLL_MAX_INTERVAL
+            ),
+            root_watcher=self.settings.get("root_watcher", False),
+            ignore_patterns=self.ignore_patterns,
+            local_poll=self.settings.get("local_poll", False),
+            local_poll_interval=self.settings.get(
+                "local_poll_interval", DEFAULT_LOCAL_POLL_INTERVAL
+            ),
+            local_poll_budget=self.settings.get(
+                "local_poll_budget", DEFAULT_LOCAL_POLL_BUDGET
+            ),
+            evict_idle_after=self.settings.get("evict_idle_after"),
+            evict_max_resources=self.settings.get("evict_max_resources"),
+        )
+        self.log.info("created sync session")
+
+        # prefetch the user's resources, so they are cached when first listed
+        session.resource_metadata_cache.refresh_in_background()
 
     def _destroy_session(self):
         # handle logout logic
+        hs_session = self.get_hs_session()
+        if isinstance(hs_session, HydroShareWithResourceCache):
+            self.log.info(f"resource cache: {hs_session.cache_info()}")
+
+        # shutdown the session's resources, and the user's sync session if this is their last
+        self.remove_session()
         self.clear_cookie(self.session_cookie_key)
-        self.set_session(
-            SessionStruct(session=None, cookie=None, id=None, username=None)
+
+
+def _download_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Global download thread pool. Caps the number of concurrent HydroShare downloads."""
+    global _DOWNLOAD_EXECUTOR
+    if _DOWNLOAD_EXECUTOR is None:
+        _DOWNLOAD_EXECUTOR = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="hydroshare-download"
         )
-        # shutdown previous resources and reset session sync to initial state
-        session_sync_struct.reset_session()
+    return _DOWNLOAD_EXECUTOR
 
 
-class ListUserHydroShareResources(HeadersMixIn, BaseRequestHandler):
+def _list_editable_resources(hydroshare: HydroShare) -> List[ResourceMetadata]:
     """List the HydroShare resources a user has edit permission of."""
+    resources = list(hydroshare.search(edit_permission=True))
+    # Marshall hsclient representation into CollectionOfResourceMetadata
+    return CollectionOfResourceMetadata.parse_obj(resources).__root__
 
-    _custom_headers = [("Access-Control-Allow-Methods", "GET")]
 
-    def get(self):
-        session = self.get_session()
+class ListUserHydroShareResources(HeadersMixIn, BaseRequestHandler):
+    """List the HydroShare resources a user has edit permission of. Resources are served from a
+    server side cache that is refreshed in the background when stale.
+
+    HTTP Request type:
+        GET:
+            Query Parameters (all optional):
+                page: 1-based page number. Default 1
+                page_size: number of resources per page. Default, all resources
+                sort: ResourceMetadata field to sort by, `-` prefix for descending order
+                q: case-insensitive resource title substring filter
+                resource_type: resource type filter
+                refresh: bypass the cache and fetch resources from HydroShare. Default false
+            Response:
+                json array of ResourceMetadata. The number of resources matching the filters
+                is sent in the `X-Total-Count` header.
+    """
+
+    _custom_headers = [("Access-Control-Allow-Methods", "GET")]
 
-        resources = list(session.session.search(edit_permission=True))
+    async def get(self):
+        try:
+            query = ResourceListQuery(
+                **{k: self.get_query_argument(k) for k in self.request.query_arguments}
+            )
+        except ValidationError as e:
+            self.set_status(HTTPStatus.BAD_REQUEST)  # 400
+            return self.write({"detail": e.errors()})
+
+        cache = self.get_session().resource_metadata_cache
+        # only blocks on HydroShare if the cache is empty or a refresh is requested
+        snapshot = await IOLoop.current().run_in_executor(
+            None, cache.get, query.refresh
+        )
+        total, resources = query_resources(snapshot.resources, query)
 
-        # Marshall hsclient representation into CollectionOfResourceMetadata
+        self.set_header("X-Total-Count", str(total))
         self.write(CollectionOfResourceMetadata.parse_obj(resources).json())
 
 
 class ListHydroShareResourceFiles(HeadersMixIn, BaseRequestHandler):
-    """List the files in a HydroShare resource."""
+    """List the files in a HydroShare resource.
+
+    HTTP Request type:
+        GET:
+            Query Parameters (all optional):
+                folder: list the immediate children of a folder (`""` for the resource root)
+                    instead of all files. Folders include their number of descendant files.
+                prefix: only include files (or folder entries) whose path (or name) starts with
+                    prefix
+                cursor: opaque cursor returned by a previous request
+                limit: maximum number of files (or folder entries) to return. Default, all
+            Response:
+                PaginatedResourceFiles or, if `folder` is provided, ResourceFolderListing
+    """
 
     _custom_headers = [("Access-Control-Allow-Methods", "GET")]
 
@@ -367,28 +589,139 @@ class ListHydroShareResourceFiles(HeadersMixIn, BaseRequestHandler):
         # used in `on_finish`
         self.resource_id = resource_id
 
+        try:
+            query = ResourceFilesQuery(
+                **{k: self.get_query_argument(k) for k in self.request.query_arguments}
+            )
+        except ValidationError as e:
+            self.set_status(HTTPStatus.BAD_REQUEST)  # 400
+            return self.write({"detail": e.errors()})
+
         # NOTE: May want to sanitize input in future. i.e. require it be a min/certain length
         session = self.get_hs_session()
 
         # TODO: add `force` argument to force update resource checksums from hydroshare
         # implement with use_cache flag
         resource = session.resource(resource_id)
-        files = [
-            file
-            # The file names and checksums are implicitly cached by the resource
-            for file in resource._checksums.keys()
-            if file.startswith("data/contents/")
-        ]
+        # The file names and checksums are implicitly cached by the resource. The index is
+        # rebuilt only if the checksums were re-fetched.
+        index = RESOURCE_DIRECTORY_INDEXES.get(resource_id, resource._checksums)
 
-        # Marshall hsclient representation into CollectionOfResourceMetadata
-        self.write(ResourceFiles(files=files).json())
+        try:
+            if query.folder is None:
+                files, next_cursor = index.list_files(
+                    query.prefix, query.cursor, query.limit
+                )
+                listing = PaginatedResourceFiles(
+                    files=files,
+                    total=index.count_files(query.prefix),
+                    next_cursor=next_cursor,
+                )
+            else:
+                folder = HydroShareResourceEntityHandler._truncate_baggit_prefix(
+                    query.folder
+                ).strip("/")
+                if folder and not index.is_folder(folder):
+                    self.set_status(HTTPStatus.NOT_FOUND)  # 404
+                    return self.write({"detail": f"folder not found: {query.folder}"})
+
+                entries, next_cursor = index.list_folder(
+                    folder, query.prefix, query.cursor, query.limit
+                )
+                listing = ResourceFolderListing(
+                    folder=folder,
+                    file_count=index.file_count(folder),
+                    entries=[ResourceFolderEntry(**e._asdict()) for e in entries],
+                    next_cursor=next_cursor,
+                )
+        except InvalidCursorError as e:
+            self.set_status(HTTPStatus.BAD_REQUEST)  # 400
+            return self.write({"detail": str(e)})
+
+        self.write(listing.json())
 
     def on_finish(self) -> None:
         # emit event to notify that a local resource has been listed. if there is local copy, it
         # will need to be added to aggregate map
-        session_sync_struct.event_broker.dispatch(
-            "RESOURCE_FILES_LISTED", self.resource_id
-        )
+        self.dispatch_event("RESOURCE_FILES_LISTED", self.resource_id)
+
+
+class ResourceWarmUpHandler(HeadersMixIn, BaseRequestHandler):
+    """Report the progress of warming up local resources in the background after login. Warm up is
+    enabled using the `WARM_UP` configuration option."""
+
+    _custom_headers = [("Access-Control-Allow-Methods", "GET")]
+
+    def get(self):
+        scheduler = getattr(self.get_sync_session(), "warm_up_scheduler", None)
+        if scheduler is None:
+            progress = ResourceWarmUpProgress(enabled=False)
+        else:
+            progress = scheduler.progress()
+        self.write(progress.json())
+
+
+class ResourceSyncStateHandler(HeadersMixIn, BaseRequestHandler):
+    """Number of files in a folder of a local resource, and in each of its child folders, by sync
+    status. Counts are maintained as files change, so large folders are not compared file by file.
+
+    HTTP Request type:
+        GET:
+            Query Parameters (all optional):
+                folder: folder relative to the resource's `data/contents` directory. Default, the
+                    `data/contents` directory
+            Response:
+                FolderSyncState. 404 if the resource is not being synced (i.e. it has no local
+                copy or its files have not been listed) or the folder does not contain files
+    """
+
+    _custom_headers = [("Access-Control-Allow-Methods", "GET")]
+
+    def get(self, resource_id: str):
+        try:
+            query = FolderSyncStateQuery(
+                **{k: self.get_query_argument(k) for k in self.request.query_arguments}
+            )
+        except ValidationError as e:
+            self.set_status(HTTPStatus.BAD_REQUEST)  # 400
+            return self.write({"detail": e.errors()})
+
+        folder = HydroShareResourceEntityHandler._truncate_baggit_prefix(
+            query.folder
+        ).strip("/")
+        aggregate_fs_map = getattr(self.get_sync_session(), "aggregate_fs_map", None)
+        if aggregate_fs_map is None:
+            self.set_status(HTTPStatus.NOT_FOUND)  # 404
+            return self.write({"detail": f"resource not synced: {resource_id}"})
+        try:
+            state = aggregate_fs_map.get_folder_sync_state(resource_id, folder)
+        except AggregateFSMapResourceMembershipError:
+            self.set_status(HTTPStatus.NOT_FOUND)  # 404
+            return self.write({"detail": f"resource not synced: {resource_id}"})
+
+        if state is None:
+            self.set_status(HTTPStatus.NOT_FOUND)  # 404
+            return self.write({"detail": f"folder not found: {query.folder}"})
+        self.write(FolderSyncState.parse_obj(asdict(state)).json())
+
+
+class LocalDedupHandler(HeadersMixIn, BaseRequestHandler):
+    """Files written from identical local files, rather than downloaded from HydroShare, since the
+    user's sync session started.
+
+    HTTP Request type:
+        GET:
+            Response:
+                DedupStatistics. All zero if local deduplication is disabled
+    """
+
+    _custom_headers = [("Access-Control-Allow-Methods", "GET")]
+
+    def get(self):
+        content_index = self.content_index
+        if content_index is None:
+            return self.write(DedupStatistics().json())
+        self.write(content_index.statistics.json())
 
 
 class HydroShareResourceHandler(HeadersMixIn, BaseRequestHandler):
@@ -402,14 +735,13 @@ class HydroShareResourceHandler(HeadersMixIn, BaseRequestHandler):
         session = self.get_hs_session()
         resource = session.resource(resource_id)
 
-        # download resource to temp directory
-        with TemporaryDirectory() as temp_dir:
-            downloaded_zip = resource.download(temp_dir)
-            # unzip resource
-            with ZipFile(downloaded_zip, "r") as zr:
-                # respect HydroShare baggit file structure convention
-                # data_path / resource_id / resource_id / ...
-                zr.extractall(self.data_path / resource_id)
+        # download resource bag (resuming a partial download, if one exists) and extract to
+        # data_path / resource_id / resource_id / ...
+        HydroShareBagDownloadStrategy(resource, self.data_path).download()
+        # used in `on_finish`. local checksums are seeded from the bag's manifest
+        self.manifest = (
+            self.data_path / resource_id / resource_id / BAG_MANIFEST_FILENAME
+        )
 
         # set instance variable for `on_finish`
         self.resource_id = resource_id
@@ -418,8 +750,11 @@ class HydroShareResourceHandler(HeadersMixIn, BaseRequestHandler):
     def on_finish(self) -> None:
         if self.get_status() == HTTPStatus.CREATED:
             # dispatch resource downloaded event with resource_id
-            session_sync_struct.event_broker.dispatch(
-                "RESOURCE_DOWNLOADED", self.resource_id
+            self.dispatch_event(
+                "RESOURCE_DOWNLOADED",
+                self.resource_id,
+                manifest=self.manifest,
+                verify=self.settings.get("verify_downloads", False),
             )
 
 
@@ -447,19 +782,20 @@ class HydroShareResourceEntityHandler(HeadersMixIn, BaseRequestHandler):
         if is_folder_entity:
             entity_type = EntityTypeEnum.FOLDER
 
-        HydroShareEntityDownloadFactory.download(
-            entity_type, resource, self.data_path, path
+        # set instance variables for `on_finish`
+        self.downloaded_paths = HydroShareEntityDownloadFactory.download(
+            entity_type, resource, self.data_path, path, self.content_index
         )
-
-        # set instance variable for `on_finish`
         self.resource_id = resource_id
         self.set_status(HTTPStatus.CREATED)  # 201
 
     def on_finish(self) -> None:
         if self.get_status() == HTTPStatus.CREATED:
-            # dispatch resource entity downloaded event with resource_id
-            session_sync_struct.event_broker.dispatch(
-                "RESOURCE_ENTITY_DOWNLOADED", self.resource_id
+            # dispatch resource entity downloaded event with resource_id and written files
+            self.dispatch_event(
+                "RESOURCE_ENTITY_DOWNLOADED",
+                self.resource_id,
+                paths=self.downloaded_paths,
             )
 
     @staticmethod
@@ -475,13 +811,94 @@ class HydroShareResourceEntityHandler(HeadersMixIn, BaseRequestHandler):
         return file_path
 
 
+class BatchDownloadHandler(HeadersMixIn, BaseRequestHandler):
+    """Download files and folders from one or more HydroShare resources to local file system.
+
+    HTTP Request type:
+        POST:
+            Body:
+                Content-Type: application/json
+                Schema: {"entries": [{"resource_id": str, "path": str, "is_folder": bool}]}
+                Schema Notes: `path` is relative to a resource's `data/contents` directory. `~`
+                              and `..` are not allowed in provided paths and return 400 status.
+            Response:
+                201 if all entries were downloaded, otherwise 207. Body is a BatchDownloadResult.
+    """
+
+    _custom_headers = [("Access-Control-Allow-Methods", "POST")]
+
+    async def post(self):
+        try:
+            batch = BatchDownloadRequest.parse_raw(self.request.body.decode("utf-8"))
+        except ValidationError as e:
+            self.set_status(HTTPStatus.BAD_REQUEST)  # 400
+            return self.write({"detail": e.errors()})
+
+        entries = [
+            DownloadEntry(
+                resource_id=entry.resource_id,
+                path=HydroShareResourceEntityHandler._truncate_baggit_prefix(
+                    entry.path
+                ),
+                is_folder=entry.is_folder,
+            )
+            for entry in batch.entries
+        ]
+
+        # downloads are executed concurrently, but the number of concurrent downloads across all
+        # requests is capped
+        executor = _download_executor(
+            self.settings.get(
+                "max_concurrent_downloads", DEFAULT_MAX_CONCURRENT_DOWNLOADS
+            )
+        )
+        results = await IOLoop.current().run_in_executor(
+            None,
+            batch_download,
+            entries,
+            self.get_hs_session().resource,
+            self.data_path,
+            executor,
+            self.content_index,
+        )
+
+        # used in `on_finish`. dispatch once per resource rather than once per entry
+        self.downloaded_paths = dict()
+        for result in results:
+            if result.success:
+                self.downloaded_paths.setdefault(result.entry.resource_id, {}).update(
+                    result.paths
+                )
+
+        success = all(r.success for r in results)
+        # 201 or 207
+        self.set_status(HTTPStatus.CREATED if success else HTTPStatus.MULTI_STATUS)
+        self.write(
+            BatchDownloadResult(
+                success=success,
+                entries=[
+                    BatchDownloadEntryResult(
+                        **r.entry._asdict(),
+                        success=r.success,
+                        detail=None if r.success else str(r.error),
+                    )
+                    for r in results
+                ],
+            ).json()
+        )
+
+    def on_finish(self) -> None:
+        for resource_id, paths in getattr(self, "downloaded_paths", {}).items():
+            # dispatch resource entity downloaded event with resource_id and written files
+            self.dispatch_event("RESOURCE_ENTITY_DOWNLOADED", resource_id, paths=paths)
+
+
 class LocalResourceEntityHandler(HeadersMixIn, BaseRequestHandler):
     """Upload file or folder from local file system to existing HydroShare resource."""
 
     BAGGIT_PREFIX_RE = r"^/?data/contents/?"
     BAGGIT_PREFIX_MATCHER = re.compile(BAGGIT_PREFIX_RE)
     BAGGIT_PREFIX = "data/contents/"
-    _ZIP_FILENAME = "__zip.zip"
     resource_id: str
 
     _custom_headers = [("Access-Control-Allow-Methods", "POST")]
@@ -529,54 +946,36 @@ class LocalResourceEntityHandler(HeadersMixIn, BaseRequestHandler):
         files = self._add_baggit_prefix_and_drop_nonexistant_files(resource_id, files)
         resource_path_prefix = self.data_path / f"{resource_id}/{resource_id}"
 
-        with TemporaryDirectory() as temp_dir:
-            zip_file = Path(temp_dir) / self._ZIP_FILENAME
-
-            # create zip archive
-            with ZipFile(zip_file, "w") as zipped:
-                for file in files:
-                    zipped.write(
-                        file,
-                        # maintain file system structure relative to where data is stored in baggit (/data/contents/)
-                        # Example: `/data/contents/dir1/some-file.txt` will be archived in the zip at, `/dir1/some-file.txt`
-                        file.relative_to(resource_path_prefix / self.BAGGIT_PREFIX),
-                    )
-
-                # upload zip to HydroShare
-                resource.file_upload(zip_file)
-                self._unpack_zip_on_hydroshare(resource, zip_file.name)
+        # upload files as a series of zip archive chunks, retrying only failed chunks. file system
+        # structure is maintained relative to where data is stored in baggit (/data/contents/)
+        # Example: `/data/contents/dir1/some-file.txt` is uploaded to, `/dir1/some-file.txt`
+        # ignored files (i.e. checkpoints) are not uploaded, they are not tracked locally
+        contents_path = resource_path_prefix / self.BAGGIT_PREFIX
+        ignore = IgnoreMatcher.from_file(
+            contents_path / IGNORE_FILENAME, self.ignore_patterns
+        )
+        uploader = ChunkedUploader(
+            resource, app_state_path(self.data_path, *UPLOAD_STATE_DIRNAME)
+        )
+        checksums = uploader.upload(files, root=contents_path, ignore=ignore)
 
-        # set instance variable for `on_finish`
+        # set instance variables for `on_finish`
         self.resource_id = resource_id
+        # md5 of uploaded files computed while packing, relative to resource base directory
+        self.uploaded_checksums = {
+            f"{self.BAGGIT_PREFIX}{path}": digest for path, digest in checksums.items()
+        }
         self.set_status(HTTPStatus.CREATED)  # 201
 
     def on_finish(self) -> None:
         if self.get_status() == HTTPStatus.CREATED:
             # dispatch resource uploaded event with resource_id
-            session_sync_struct.event_broker.dispatch(
-                "RESOURCE_ENTITY_UPLOADED", self.resource_id
+            self.dispatch_event(
+                "RESOURCE_ENTITY_UPLOADED",
+                self.resource_id,
+                checksums=self.uploaded_checksums,
             )
 
-    def _unpack_zip_on_hydroshare(
-        self, resource, filename: str, location: str = ""
-    ) -> None:
-        # unpack and delete zip
-        unzip_path = url_path_join(
-            resource._hsapi_path,
-            "functions",
-            "unzip",
-            "data",
-            "contents",
-            location,
-            filename,
-        )
-        # post job to HydroShare
-        resource._hs_session.post(
-            unzip_path,
-            status_code=200,
-            data={"overwrite": "true", "ingest_metadata": "true"},
-        )
-
     def _add_baggit_prefix_and_drop_nonexistant_files(
         self, resource_id: str, files: List[str]
     ) -> List[Path]:
@@ -620,3 +1019,110 @@ class UserInfoHandler(HeadersMixIn, BaseRequestHandler):
         session = self.get_session()
         user = session.session.user(session.id).dict()
         self.write(user)
+
+
+class DebugHandlerMixIn:
+    """Debug endpoints are only served if enabled with the `DEBUG_ENDPOINTS` configuration option.
+    They require the user to be logged in."""
+
+    def prepare(self):
+        if not self.settings.get("debug_endpoints", False):
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        super().prepare()
+
+
+class DebugProfileHandler(DebugHandlerMixIn, HeadersMixIn, BaseRequestHandler):
+    """Profile the server, sampling the call stack of every thread.
+
+    HTTP Request type:
+        GET:
+            Query Parameters (all optional):
+                seconds: profile duration. Default 10
+                rate: samples per second. Default 100
+            Response:
+                Samples in collapsed stack format (`thread;outer;...;inner count`), readable by
+                flamegraph tools (i.e. flamegraph.pl, speedscope). 409 if a profile is in progress.
+    """
+
+    _custom_headers = [("Access-Control-Allow-Methods", "GET")]
+
+    async def get(self):
+        try:
+            query = ProfileQuery(
+                **{k: self.get_query_argument(k) for k in self.request.query_arguments}
+            )
+        except ValidationError as e:
+            self.set_status(HTTPStatus.BAD_REQUEST)  # 400
+            return self.write({"detail": e.errors()})
+
+        if not _PROFILE_LOCK.acquire(blocking=False):
+            self.set_status(HTTPStatus.CONFLICT)  # 409
+            return self.write({"detail": "a profile is already in progress"})
+        try:
+            # sample from a worker thread, so the IOLoop is profiled while it runs
+            profiler = SamplingProfiler(query.rate)
+            await IOLoop.current().run_in_executor(None, profiler.run, query.seconds)
+        finally:
+            _PROFILE_LOCK.release()
+
+        self.set_header("Content-Type", "text/plain; charset=utf-8")
+        self.set_header(
+            "Content-Disposition", 'attachment; filename="profile.collapsed"'
+        )
+        self.write(profiler.collapsed())
+
+
+class DebugMemoryHandler(DebugHandlerMixIn, HeadersMixIn, BaseRequestHandler):
+    """Report the server's memory: allocations by module, traced with `tracemalloc`, and the
+    approximate size of the user's resource maps, and hit and miss counts of the session's
+    HydroShare resource cache.
+
+    HTTP Request type:
+        GET:
+            Query Parameters (all optional):
+                trace: start (true) or stop (false) tracing allocations. Only allocations made
+                    after tracing starts are reported. Tracing slows the server, stop it when done
+                limit: maximum number of modules reported. Default 25
+            Response:
+                MemoryReport
+    """
+
+    _custom_headers = [("Access-Control-Allow-Methods", "GET")]
+
+    async def get(self):
+        try:
+            query = MemoryQuery(
+                **{k: self.get_query_argument(k) for k in self.request.query_arguments}
+            )
+        except ValidationError as e:
+            self.set_status(HTTPStatus.BAD_REQUEST)  # 400
+            return self.write({"detail": e.errors()})
+
+        if query.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif query.trace is False:
+            tracemalloc.stop()
+
+        # snapshots and sizing resource maps are slow, do not block the IOLoop
+        report = await IOLoop.current().run_in_executor(
+            None, _memory_report, self.get_sync_session(), query.limit
+        )
+        hs_session = self.get_hs_session()
+        if isinstance(hs_session, HydroShareWithResourceCache):
+            report.resource_cache = ResourceCacheInfo(
+                **hs_session.cache_info()._asdict()
+            )
+        self.write(report.json())
+
+
+def _memory_report(
+    sync_session: Optional[SessionSyncStruct], limit: int
+) -> MemoryReport:
+    report = dict(tracing=tracemalloc.is_tracing())
+    if report["tracing"]:
+        snapshot = tracemalloc.take_snapshot()
+        report["traced_size"], report["traced_peak"] = tracemalloc.get_traced_memory()
+        report["modules"] = memory_by_module(snapshot, limit)
+    if sync_session is not None and sync_session.aggregate_fs_map is not None:
+        report["resource_maps"] = resource_map_memory(sync_session.aggregate_fs_map)
+    return MemoryReport(**report)
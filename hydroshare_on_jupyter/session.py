@@ -1,64 +1,164 @@
-from typing import Callable, Union
-from pathlib import Path
+from collections import defaultdict
 from hsclient import HydroShare
-from functools import partial
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+import logging
+import threading
 
-from .session_struct import SessionSyncStruct
+# typing imports
+from typing import Dict, Optional, Set, Union
 
+from .session_struct import SessionStruct, SessionSyncStruct
+from .shared_observer import SharedObserver
 
-class _SessionSyncSingleton:
-    def __init__(self) -> None:
+_log = logging.getLogger(__name__)
 
-        # Create empty session sync struct
-        self.reset_session()
+# maximum number of pooled connections to a HydroShare host, shared by all sessions
+DEFAULT_CONNECTION_POOL_SIZE = 32
 
-    def new_sync_session(
-        self, fs_root: Union[Path, str], hydroshare: HydroShare
+
+class SessionLimitError(Exception):
+    pass
+
+
+class SessionRegistry:
+    """Sessions of logged in users, keyed by deciphered session cookie.
+
+    A user's sync session (see `SessionSyncStruct`) is shared by all of their sessions (i.e.
+    browser tabs or devices) and is shut down when their last session is removed. Sync sessions
+    share a single watchdog observer, and HydroShare sessions share a connection pool.
+    """
+
+    def __init__(
+        self,
+        observer: Optional[SharedObserver] = None,
+        pool_size: int = DEFAULT_CONNECTION_POOL_SIZE,
     ) -> None:
-        # greedily fill fs aggregate map with local resources and checksums from HS.
-        # this implicates a delay, directly post login, for a user to hit any server endpoint.
-        # wait time is linearly related to the number of local resources (that the user is an editor of)
-        # this is detrimental if a user attempts to hit an endpoint or connect via websocket during the wait time.
-        # specifically, this can cause unintended timeouts
-        # OLD IMPLEMENTATION. Retaining for historical clarity
-        # new_session = partial(SessionSyncStruct.create_sync_struct, fs_root, hydroshare)
-
-        # lazily fill fs aggregate map. local file system is not searched for local resources that
-        # an HS user is an editor of until they try to list the files in a specified resource.
-        # this resolves the issues mentioned above
-        new_session = partial(SessionSyncStruct.init_sync_struct, fs_root, hydroshare)
-        self._handle_session(new_session)
-
-    def reset_session(self) -> None:
-        # create empty session sync struct
-        self._handle_session(SessionSyncStruct)
+        self.observer = observer if observer is not None else SharedObserver()
+        # mounted on each user's `requests.Session`. connections are pooled per host, credentials
+        # are sent per request
+        self.connection_pool = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+
+        # cookie: session
+        self._sessions: Dict[bytes, SessionStruct] = dict()
+        # user id: sync session
+        self._sync_sessions: Dict[int, SessionSyncStruct] = dict()
+        # user id: cookies
+        self._user_cookies: Dict[int, Set[bytes]] = defaultdict(set)
+        self._lock = threading.RLock()
+        # serialize creation of a user's sync session, without blocking other users
+        self._user_locks: Dict[int, threading.Lock] = defaultdict(threading.Lock)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
 
     @property
-    def is_empty(self) -> bool:
-        # ignore shutdown fn when verifying if any attrs are not empty
-        return not any(v for k, v in self.__dict__.items() if k != "shutdown")
-
-    # helpers
-    def _handle_session(self, session: Callable[[], SessionSyncStruct]):
-        # shutdown any open previous resources
-        try:
-            self.shutdown()
-        except AttributeError:
-            # on __init__, shutdown attribute will not be set
-            ...
-
-        # create session instance
-        session = session()
-        # re-bind shutdown method to singleton instance
-        self.shutdown = session.shutdown
-
-        self._update_attrs(session)
-
-    def _update_attrs(self, o: object) -> None:
-        attrs = o.__dict__
-        for attr, value in attrs.items():
-            setattr(self, attr, value)
-
-
-# create empty session
-session_sync_struct = _SessionSyncSingleton()
+    def n_users(self) -> int:
+        return len(self._user_cookies)
+
+    def get(self, cookie: Optional[bytes]) -> SessionStruct:
+        """Return session of a cookie. An empty session is returned for unknown cookies."""
+        with self._lock:
+            session = self._sessions.get(cookie) if cookie is not None else None
+        return session if session is not None else SessionStruct.create_empty()
+
+    def get_sync_session(self, cookie: Optional[bytes]) -> Optional[SessionSyncStruct]:
+        """Return the sync session of the user a cookie belongs to, if one was created."""
+        with self._lock:
+            session = self._sessions.get(cookie) if cookie is not None else None
+            if session is None:
+                return None
+            return self._sync_sessions.get(session.id)
+
+    def has_sync_session(self, user_id: int) -> bool:
+        with self._lock:
+            return user_id in self._sync_sessions
+
+    def add(
+        self,
+        session: SessionStruct,
+        max_sessions: Optional[int] = None,
+        max_user_sessions: Optional[int] = None,
+    ) -> None:
+        """Register a session. Raises `SessionLimitError` if `max_sessions` are registered, or
+        `max_user_sessions` are registered to the session's user."""
+        with self._lock:
+            if max_sessions is not None and len(self._sessions) >= max_sessions:
+                raise SessionLimitError(f"session limit of {max_sessions} reached")
+            user_sessions = len(self._user_cookies.get(session.id, ()))
+            if max_user_sessions is not None and user_sessions >= max_user_sessions:
+                raise SessionLimitError(
+                    f"session limit of {max_user_sessions} reached for user {session.id}"
+                )
+            self._sessions[session.cookie] = session
+            self._user_cookies[session.id].add(session.cookie)
+
+    def new_sync_session(
+        self,
+        cookie: bytes,
+        fs_root: Union[Path, str],
+        hydroshare: HydroShare,
+        **options,
+    ) -> Optional[SessionSyncStruct]:
+        """Create the sync session of the user a cookie belongs to, unless they already have one.
+        `options` (i.e. `warm_up` and `remote_poll`) are passed to
+        `SessionSyncStruct.init_sync_struct`. None is returned if the session was removed.
+        """
+        with self._lock:
+            session = self._sessions.get(cookie)
+            if session is None:
+                return None
+            user_lock = self._user_locks[session.id]
+
+        with user_lock:
+            sync_session = self.get_sync_session(cookie)
+            if sync_session is not None:
+                return sync_session
+
+            # lazily fill fs aggregate map. local file system is not searched for local resources
+            # that an HS user is an editor of until they try to list the files in a specified
+            # resource. optionally, local resources are added in a background thread (see
+            # `ResourceWarmUpScheduler`) so they are ready when listed.
+            sync_session = SessionSyncStruct.init_sync_struct(
+                fs_root, hydroshare, observer=self.observer.view(), **options
+            )
+
+            with self._lock:
+                # user logged out in the meantime
+                if not self._user_cookies.get(session.id):
+                    sync_session.shutdown()
+                    return None
+                self._sync_sessions[session.id] = sync_session
+            return sync_session
+
+    def remove(self, cookie: Optional[bytes]) -> None:
+        """Remove a session. The user's sync session is shut down if it was their last session."""
+        with self._lock:
+            session = self._sessions.pop(cookie, None)
+            if session is None:
+                return
+            cookies = self._user_cookies[session.id]
+            cookies.discard(cookie)
+            sync_session = None
+            if not cookies:
+                del self._user_cookies[session.id]
+                self._user_locks.pop(session.id, None)
+                sync_session = self._sync_sessions.pop(session.id, None)
+
+        if session.resource_metadata_cache is not None:
+            session.resource_metadata_cache.shutdown()
+        if sync_session is not None:
+            # shutdown resources (threads, watches) of the user's sync session
+            sync_session.shutdown()
+
+    def shutdown(self) -> None:
+        """Remove all sessions and stop the shared observer."""
+        with self._lock:
+            cookies = list(self._sessions)
+        for cookie in cookies:
+            self.remove(cookie)
+        self.observer.stop()
+
+
+# sessions of all logged in users
+session_registry = SessionRegistry()
@@ -1,24 +1,52 @@
 from dataclasses import dataclass
+from functools import partial
 from hsclient import HydroShare
 from watchdog.observers import Observer
 import logging
 
 # type hint imports
-from typing import Optional, Union
+from typing import Iterable, Optional, Union
 from pathlib import Path
 
 # lib imports
 from .lib.filesystem.aggregate_fs_map import AggregateFSMap
+from .lib.filesystem.ignore import DEFAULT_IGNORE_PATTERNS
 from .lib.events.event_broker import EventBroker
+from .utilities.pathlib_utils import app_state_path
 
 # local imports
-from .fs_event_handler import fs_event_handler_factory
+from .resource_metadata_cache import ResourceMetadataCache
+from .resource_warm_up import ResourceWarmUpScheduler
+from .remote_resource_poller import (
+    RemoteResourcePoller,
+    DEFAULT_REMOTE_POLL_MIN_INTERVAL,
+    DEFAULT_REMOTE_POLL_MAX_INTERVAL,
+)
+from .local_resource_poller import (
+    LocalResourcePoller,
+    DEFAULT_LOCAL_POLL_INTERVAL,
+    DEFAULT_LOCAL_POLL_BUDGET,
+)
+from .resource_eviction import ResourceEvictionScheduler, DEFAULT_EVICTION_INTERVAL
+from .shared_observer import ObserverView
+from .fs_event_handler import FSEventRouter, fs_event_handler_factory
 from .fs_events import Events
 from .session_struct_interface import ISessionSyncStruct
 from .session_sync_event_listeners import SessionSyncEventListeners
 
 _log = logging.getLogger(__name__)
 
+# location of persisted file digests of evicted resources, relative to app state directory
+EVICTED_RESOURCE_STATE_DIRNAME = ("resources", "evicted")
+# events that count as an access of a resource, resetting its idle time
+ACCESS_EVENTS = (
+    Events.STATUS,
+    Events.RESOURCE_FILES_LISTED,
+    Events.RESOURCE_DOWNLOADED,
+    Events.RESOURCE_ENTITY_DOWNLOADED,
+    Events.RESOURCE_ENTITY_UPLOADED,
+)
+
 
 @dataclass
 class SessionStruct:
@@ -26,6 +54,7 @@ class SessionStruct:
     cookie: Optional[bytes] = None
     id: Optional[int] = None
     username: Optional[str] = None
+    resource_metadata_cache: Optional[ResourceMetadataCache] = None
 
     @classmethod
     def create_empty(cls):
@@ -96,26 +125,98 @@ class SessionSyncStruct(ISessionSyncStruct):
 
     @classmethod
     def init_sync_struct(
-        cls, fs_root: Union[Path, str], hydroshare: HydroShare
+        cls,
+        fs_root: Union[Path, str],
+        hydroshare: HydroShare,
+        warm_up: bool = False,
+        remote_poll: bool = False,
+        remote_poll_min_interval: float = DEFAULT_REMOTE_POLL_MIN_INTERVAL,
+        remote_poll_max_interval: float = DEFAULT_REMOTE_POLL_MAX_INTERVAL,
+        root_watcher: bool = False,
+        ignore_patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS,
+        local_poll: bool = False,
+        local_poll_interval: float = DEFAULT_LOCAL_POLL_INTERVAL,
+        local_poll_budget: Optional[int] = DEFAULT_LOCAL_POLL_BUDGET,
+        evict_idle_after: Optional[float] = None,
+        evict_max_resources: Optional[int] = None,
+        eviction_interval: float = DEFAULT_EVICTION_INTERVAL,
+        observer: Optional[Union[Observer, ObserverView]] = None,
     ) -> "SessionSyncStruct":
         # instantiate and populate local and remote FSMaps
         # NOTE: call with large overhead
-        agg_map = AggregateFSMap.create_empty_map(fs_root, hydroshare)
+        agg_map = AggregateFSMap.create_empty_map(
+            fs_root,
+            hydroshare,
+            ignore_patterns,
+            state_path=app_state_path(fs_root, *EVICTED_RESOURCE_STATE_DIRNAME),
+        )
         _log.info("created empty AggregateFSMap")
 
         event_broker = EventBroker(Events)
         # `event_broker` context given to each factory object
         _event_handler_factory = fs_event_handler_factory(event_broker)
 
-        # create and start observer thread
-        observer = Observer()
-        _log.info("observer created")
-        observer.start()
-        _log.info("observer started")
+        # create and start observer thread, unless watches are scheduled on a shared observer
+        if observer is None:
+            observer = Observer()
+            _log.info("observer created")
+            observer.start()
+            _log.info("observer started")
 
         # mapping of resource_id to application specific watchdog FileSystemEventHandler instance
         fs_observers = dict()
 
+        # optionally, watch `fs_root` once and route events to resources, instead of scheduling a
+        # watch (i.e. an emitter thread and inotify instance) per resource
+        fs_event_router = None
+        if root_watcher and not local_poll:
+            fs_event_router = FSEventRouter(
+                agg_map.local_map.fs_root,
+                agg_map.local_map.get,
+                _event_handler_factory,
+            )
+            observer.schedule(fs_event_router, fs_event_router.fs_root, recursive=True)
+            _log.info("scheduled root observer")
+
+        # optionally, poll local resources for changes instead of watching for file system events.
+        # inotify does not observe changes made on other hosts of a network file system (i.e. NFS)
+        local_poller = None
+        if local_poll:
+            local_poller = LocalResourcePoller(
+                agg_map.local_map,
+                on_change=partial(event_broker.dispatch, Events.STATUS),
+                interval=local_poll_interval,
+                budget=local_poll_budget,
+            )
+
+        # optionally, poll HydroShare for changes to resources in the remote map made outside of
+        # this extension (i.e. by collaborators)
+        remote_poller = None
+        if remote_poll:
+            remote_poller = RemoteResourcePoller.from_hydroshare(
+                hydroshare,
+                tracked=lambda: agg_map.remote_map.resources,
+                on_change=partial(
+                    event_broker.dispatch, Events.REMOTE_RESOURCE_CHANGED
+                ),
+                min_interval=remote_poll_min_interval,
+                max_interval=remote_poll_max_interval,
+            )
+
+        # optionally, release resources from memory that have not been accessed for a while or
+        # exceed a budget. accessing an evicted resource adds it back (see `LocalFSMap.add_resource`)
+        eviction_scheduler = None
+        if evict_idle_after is not None or evict_max_resources is not None:
+            eviction_scheduler = ResourceEvictionScheduler(
+                tracked=lambda: agg_map.local_map.resources,
+                on_evict=partial(event_broker.dispatch, Events.RESOURCE_IDLE),
+                idle_timeout=evict_idle_after,
+                max_resources=evict_max_resources,
+                interval=eviction_interval,
+            )
+            for event in ACCESS_EVENTS:
+                event_broker.subscribe(event, eviction_scheduler.touch)
+
         # setup event listeners
         SessionSyncEventListeners(
             aggregate_fs_map=agg_map,
@@ -123,24 +224,81 @@ class SessionSyncStruct(ISessionSyncStruct):
             observer=observer,
             fs_observers=fs_observers,
             event_handler_factory=_event_handler_factory,
+            remote_poller=remote_poller,
+            fs_event_router=fs_event_router,
+            local_poller=local_poller,
         ).setup_event_listeners()
         _log.info("event listeners setup")
 
+        if eviction_scheduler is not None:
+            eviction_scheduler.start()
+            _log.info("resource eviction scheduler started")
+
+        if local_poller is not None:
+            local_poller.start()
+            _log.info("local resource poller started")
+
+        if remote_poller is not None:
+            remote_poller.start()
+            _log.info("remote resource poller started")
+
+        # optionally, add local resources to the aggregate map in the background. resources are
+        # added as if the user listed them.
+        warm_up_scheduler = None
+        if warm_up:
+            warm_up_scheduler = ResourceWarmUpScheduler(
+                agg_map.local_map,
+                partial(event_broker.dispatch, Events.RESOURCE_FILES_LISTED),
+            )
+            warm_up_scheduler.start()
+            _log.info("warm up scheduler started")
+
         return cls(
             aggregate_fs_map=agg_map,
             event_broker=event_broker,
             observer=observer,
             fs_observers=fs_observers,
             event_handler_factory=_event_handler_factory,
+            warm_up_scheduler=warm_up_scheduler,
+            remote_poller=remote_poller,
+            fs_event_router=fs_event_router,
+            local_poller=local_poller,
+            eviction_scheduler=eviction_scheduler,
         )
 
     def shutdown(self) -> None:
+        # stop warming up resources and polling HydroShare
+        self._cleanup_warm_up_scheduler()
+        self._cleanup_remote_poller()
+        self._cleanup_local_poller()
+        self._cleanup_eviction_scheduler()
+
         # unsubscribe from all event
         self._cleanup_event_broker()
 
         # cleanup observer: unschedule, stop, and rejoin thread
         self._cleanup_observer()
 
+    def _cleanup_warm_up_scheduler(self) -> None:
+        """warm up scheduler cleanup logic"""
+        if self.warm_up_scheduler is not None:
+            self.warm_up_scheduler.shutdown()
+
+    def _cleanup_remote_poller(self) -> None:
+        """remote poller cleanup logic"""
+        if self.remote_poller is not None:
+            self.remote_poller.shutdown()
+
+    def _cleanup_local_poller(self) -> None:
+        """local poller cleanup logic"""
+        if self.local_poller is not None:
+            self.local_poller.shutdown()
+
+    def _cleanup_eviction_scheduler(self) -> None:
+        """eviction scheduler cleanup logic"""
+        if self.eviction_scheduler is not None:
+            self.eviction_scheduler.shutdown()
+
     def _cleanup_event_broker(self) -> None:
         """event broker cleanup logic"""
         if self.event_broker is not None:
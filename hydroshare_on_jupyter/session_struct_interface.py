@@ -1,21 +1,32 @@
 from dataclasses import dataclass
 
 # type hint imports
-from typing import Callable, Dict, Optional
+from typing import Callable, Dict, Optional, Union
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 from .lib.events.event_broker import EventBroker
 from .lib.filesystem.types import ResourceId
 from .lib.filesystem.aggregate_fs_map import AggregateFSMap
 from .lib.filesystem.fs_resource_map import LocalFSResourceMap
+from .fs_event_handler import FSEventRouter
+from .resource_warm_up import ResourceWarmUpScheduler
+from .remote_resource_poller import RemoteResourcePoller
+from .local_resource_poller import LocalResourcePoller
+from .shared_observer import ObserverView
+from .resource_eviction import ResourceEvictionScheduler
 
 
 @dataclass
 class ISessionSyncStruct:
     aggregate_fs_map: Optional[AggregateFSMap] = None
     event_broker: Optional[EventBroker] = None
-    observer: Optional[Observer] = None
+    observer: Optional[Union[Observer, ObserverView]] = None
     fs_observers: Optional[Dict[ResourceId, FileSystemEventHandler]] = None
     event_handler_factory: Optional[
         Callable[[LocalFSResourceMap], FileSystemEventHandler]
     ] = None
+    warm_up_scheduler: Optional[ResourceWarmUpScheduler] = None
+    remote_poller: Optional[RemoteResourcePoller] = None
+    fs_event_router: Optional[FSEventRouter] = None
+    local_poller: Optional[LocalResourcePoller] = None
+    eviction_scheduler: Optional[ResourceEvictionScheduler] = None
@@ -1,9 +1,18 @@
+from collections import defaultdict
 from dataclasses import dataclass
+from pathlib import Path
+import logging
+import threading
+from typing import Dict, List, Optional
 
 # local imports
 from .fs_events import Events
 from .session_struct_interface import ISessionSyncStruct
-from .lib.filesystem.types import ResourceId
+from .hydroshare_resource_cache import HydroShareWithResourceCache
+from .lib.filesystem.types import MD5Hash, ResourceId
+from .lib.filesystem.utilities import read_manifest
+
+_log = logging.getLogger(__name__)
 
 
 @dataclass
@@ -11,17 +20,28 @@ class SessionSyncEventListeners(ISessionSyncStruct):
     """Shim that encapsulates session sync struct event listener logic."""
 
     def setup_event_listeners(self):
+        # listeners are called from request handler threads and the warm-up thread. per-resource
+        # locks prevent a resource from being added to the aggregate map concurrently
+        self._resource_locks = defaultdict(threading.RLock)
+        self._resource_locks_lock = threading.Lock()
+
         # event listeners
         listeners = [
             (Events.RESOURCE_FILES_LISTED, self.resource_files_listed),
             (Events.RESOURCE_DOWNLOADED, self.resource_downloaded),
             (Events.RESOURCE_ENTITY_DOWNLOADED, self.resource_entity_downloaded),
             (Events.RESOURCE_ENTITY_UPLOADED, self.resource_uploaded),
+            (Events.REMOTE_RESOURCE_CHANGED, self.remote_resource_changed),
+            (Events.RESOURCE_IDLE, self.resource_idle),
         ]
         for event, listener in listeners:
             self.event_broker.subscribe(event, listener)
 
     def resource_files_listed(self, resource_id: ResourceId) -> None:
+        with self._resource_lock(resource_id):
+            self._resource_files_listed(resource_id)
+
+    def _resource_files_listed(self, resource_id: ResourceId) -> None:
         # check if in local map (resource would also be in remote map)
         if resource_id in self.aggregate_fs_map.local_map:
             return
@@ -44,41 +64,198 @@ class SessionSyncEventListeners(ISessionSyncStruct):
             # pull updated md5 checksums from HydroShare
             self.aggregate_fs_map.remote_map.update_resource(resource_id)
 
-    def resource_uploaded(self, resource_id: ResourceId) -> None:
-        # pull updated md5 checksums from HydroShare
-        self.aggregate_fs_map.remote_map.update_resource(resource_id)
+    def resource_uploaded(
+        self, resource_id: ResourceId, checksums: Optional[Dict[str, MD5Hash]] = None
+    ) -> None:
+        """`checksums` are the md5 checksums of the uploaded files (relative to the resource base
+        directory), computed while the files were packed. If provided, the remote map is updated
+        optimistically, then verified against the manifest in a background thread."""
+        # resource changed on HydroShare, drop cached hsclient Resource object
+        if self._resource_cache is not None:
+            self._resource_cache.invalidate_resource(resource_id)
 
-    def resource_downloaded(self, resource_id: ResourceId) -> None:
-        # if resource already in agg map, just update resource in local map
-        if resource_id in self.aggregate_fs_map.local_map:
-            self.aggregate_fs_map.local_map.update_resource(resource_id)
+        # the upload changes `date_last_updated`. poll frequently, but do not treat as a change
+        if self.remote_poller is not None:
+            self.remote_poller.mark_active(resource_id)
 
-        else:
-            self._add_resource_to_agg_map_and_create_watcher(resource_id)
+        if not checksums:
+            # pull updated md5 checksums from HydroShare
+            self.aggregate_fs_map.remote_map.update_resource(resource_id)
+            return
+
+        with self._resource_lock(resource_id):
+            self.aggregate_fs_map.remote_map.apply_resource_checksums(
+                resource_id, checksums
+            )
+
+        threading.Thread(
+            target=self._verify_remote_resource,
+            args=(resource_id,),
+            name=f"verify-upload-{resource_id}",
+            daemon=True,
+        ).start()
+
+    def remote_resource_changed(self, resource_id: ResourceId) -> None:
+        # resource was changed on HydroShare by someone else (i.e. using hydroshare.org)
+        if resource_id not in self.aggregate_fs_map.remote_map:
+            return
+
+        if self._resource_cache is not None:
+            self._resource_cache.invalidate_resource(resource_id)
+
+        self._refresh_remote_resource(resource_id)
+
+    def resource_idle(self, resource_id: ResourceId) -> None:
+        # release an idle resource from memory. it is re-added, reusing persisted file digests, the
+        # next time its files are listed
+        with self._resource_lock(resource_id):
+            if resource_id not in self.aggregate_fs_map.local_map:
+                return
+
+            watcher = self.fs_observers.pop(resource_id, None)
+            if watcher is not None:
+                self.observer.unschedule(watcher)
+
+            self.aggregate_fs_map.evict_resource(resource_id)
+
+            if self._resource_cache is not None:
+                self._resource_cache.invalidate_resource(resource_id)
+        _log.info(f"evicted idle resource {resource_id}")
+
+    def _refresh_remote_resource(self, resource_id: ResourceId) -> None:
+        """Re-fetch a resource's manifest. Emit RESOURCE_STATUS if its checksums changed."""
+        if resource_id not in self.aggregate_fs_map.remote_map:
+            return
+
+        with self._resource_lock(resource_id):
+            previous_checksums = dict(self.aggregate_fs_map.remote_map[resource_id])
+            # pull updated md5 checksums from HydroShare
+            self.aggregate_fs_map.remote_map.update_resource(resource_id)
+            checksums = dict(self.aggregate_fs_map.remote_map[resource_id])
+
+        # metadata only changes do not affect sync status
+        if (
+            checksums != previous_checksums
+            and resource_id in self.aggregate_fs_map.local_map
+        ):
+            # emit RESOURCE_STATUS signal
+            self.event_broker.dispatch(Events.RESOURCE_STATUS, resource_id)
+
+    def resource_downloaded(
+        self,
+        resource_id: ResourceId,
+        manifest: Optional[Path] = None,
+        verify: bool = False,
+    ) -> None:
+        """`manifest` is the extracted bag's `manifest-md5.txt`. If provided, local digests are
+        seeded from it instead of hashing the downloaded files. With `verify`, the seeded digests
+        are verified in a background thread."""
+        seeded = None
+        with self._resource_lock(resource_id):
+            if manifest is not None and manifest.is_file():
+                # create or update local resource map in place
+                seeded = self.aggregate_fs_map.local_map.seed_resource(
+                    resource_id, read_manifest(manifest)
+                )
+                # add to remote map and create watcher, if not already
+                self._add_resource_and_watcher(resource_id)
+
+            # if resource already in agg map, just update resource in local map
+            elif resource_id in self.aggregate_fs_map.local_map:
+                self.aggregate_fs_map.local_map.update_resource(resource_id)
+
+            else:
+                self._add_resource_and_watcher(resource_id)
 
         # emit RESOURCE_STATUS signal
         self.event_broker.dispatch(Events.RESOURCE_STATUS, resource_id)
 
-    def resource_entity_downloaded(self, resource_id: ResourceId) -> None:
-        # if resource already in agg map, add resource file
-        if resource_id in self.aggregate_fs_map.local_map:
-            # TODO: `add_resource_file` is not method on `AggregateFSMap`. For now, both local and
-            # remote resources stored in the `AggregateFSMap` instance are updated. this is
-            # computationally burdensome and not necessary, but has desirable guarantees. a proper
-            # solution should be implemented in the future.
-            self.aggregate_fs_map.update_resource(resource_id)
-            # self.aggregate_fs_map.add_resource_file(resource_id)
-
-        else:
-            self._add_resource_to_agg_map_and_create_watcher(resource_id)
+        if seeded and verify:
+            threading.Thread(
+                target=self._verify_seeded_files,
+                args=(resource_id, seeded),
+                name=f"verify-{resource_id}",
+                daemon=True,
+            ).start()
+
+    def resource_entity_downloaded(
+        self,
+        resource_id: ResourceId,
+        paths: Optional[Dict[Path, Optional[MD5Hash]]] = None,
+    ) -> None:
+        """`paths` are the local files written by the download and, if computed while downloading,
+        their md5 checksums. If not provided, the resource is updated in full."""
+        # serialized with other listeners updating the resource, i.e. a concurrent download or file
+        # system event, so the membership check and the update are not interleaved
+        with self._resource_lock(resource_id):
+            # if resource already in agg map, add or update downloaded resource files
+            if resource_id in self.aggregate_fs_map.local_map:
+                if paths is None:
+                    # both local and remote resources stored in the `AggregateFSMap` are updated
+                    self.aggregate_fs_map.update_resource(resource_id)
+                else:
+                    # downloads do not change the resource on HydroShare, remote map is not updated.
+                    # only the downloaded files without a known checksum are hashed
+                    for path, digest in paths.items():
+                        if digest is not None:
+                            self.aggregate_fs_map.local_map.set_resource_file_digest(
+                                resource_id, path, digest
+                            )
+                            continue
+                        # at most one of the two inserts, depending on membership
+                        self.aggregate_fs_map.update_resource_file(resource_id, path)
+                        self.aggregate_fs_map.add_resource_file(resource_id, path)
+
+            else:
+                self._add_resource_and_watcher(resource_id)
 
         # emit RESOURCE_STATUS signal
         self.event_broker.dispatch(Events.RESOURCE_STATUS, resource_id)
 
+    @property
+    def _resource_cache(self) -> Optional[HydroShareWithResourceCache]:
+        hydroshare = self.aggregate_fs_map.remote_map._hydroshare
+        if isinstance(hydroshare, HydroShareWithResourceCache):
+            return hydroshare
+        return None
+
+    def _verify_seeded_files(self, resource_id: ResourceId, files: List[Path]) -> None:
+        local_resource = self.aggregate_fs_map.local_map.get(resource_id)
+        if local_resource is None:
+            return
+
+        changed = local_resource.verify_files(files)
+        if changed:
+            _log.warning(
+                f"{len(changed)} files in resource {resource_id} did not match manifest"
+            )
+            # emit RESOURCE_STATUS signal
+            self.event_broker.dispatch(Events.RESOURCE_STATUS, resource_id)
+
+    def _verify_remote_resource(self, resource_id: ResourceId) -> None:
+        try:
+            self._refresh_remote_resource(resource_id)
+        except Exception:
+            _log.exception(f"failed to verify upload to resource {resource_id}")
+
+    def _resource_lock(self, resource_id: ResourceId) -> threading.RLock:
+        with self._resource_locks_lock:
+            return self._resource_locks[resource_id]
+
     def _add_resource_to_agg_map_and_create_watcher(self, resource_id: ResourceId):
+        with self._resource_lock(resource_id):
+            self._add_resource_and_watcher(resource_id)
+
+    def _add_resource_and_watcher(self, resource_id: ResourceId):
         self.aggregate_fs_map.add_resource(resource_id)
 
-        if resource_id not in self.fs_observers:
+        # a single root-level watch routes events to resources lazily (see `FSEventRouter`) and
+        # polled resources are picked up by the `LocalResourcePoller`
+        if (
+            self.fs_event_router is None
+            and self.local_poller is None
+            and resource_id not in self.fs_observers
+        ):
             # get local resource object
             res = self.aggregate_fs_map.local_map[resource_id]
 
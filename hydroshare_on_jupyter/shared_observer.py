@@ -0,0 +1,101 @@
+from collections import Counter
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver, ObservedWatch
+import threading
+
+# typing imports
+from typing import List, Optional, Tuple
+
+
+class SharedObserver:
+    """Watchdog observer shared by all sessions, so a process hosting many users runs a single
+    observer thread. Sessions schedule watches through an `ObserverView`.
+
+    Watchdog merges watches of the same path (i.e. two users with a resource in a shared data
+    directory) into one `ObservedWatch`. Watches are reference counted, a watch is only removed
+    when the last handler scheduled on it is.
+    """
+
+    def __init__(self, observer: Optional[BaseObserver] = None) -> None:
+        self._observer = observer if observer is not None else Observer()
+        self._refs: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def view(self) -> "ObserverView":
+        return ObserverView(self)
+
+    def schedule(
+        self, event_handler: FileSystemEventHandler, path: str, recursive: bool = False
+    ) -> ObservedWatch:
+        with self._lock:
+            # started lazily, on first watch
+            if not self._observer.is_alive():
+                self._observer.start()
+            watch = self._observer.schedule(event_handler, path, recursive=recursive)
+            self._refs[watch] += 1
+        return watch
+
+    def unschedule(
+        self, event_handler: FileSystemEventHandler, watch: ObservedWatch
+    ) -> None:
+        with self._lock:
+            if self._refs[watch] <= 0:
+                return
+            self._refs[watch] -= 1
+            if self._refs[watch] > 0:
+                self._observer.remove_handler_for_watch(event_handler, watch)
+            else:
+                del self._refs[watch]
+                self._observer.unschedule(watch)
+
+    @property
+    def n_watches(self) -> int:
+        return len(self._refs)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._refs.clear()
+            if self._observer.is_alive():
+                self._observer.unschedule_all()
+                self._observer.stop()
+                self._observer.join()
+
+
+class ObserverView:
+    """A session's handle of a `SharedObserver`. Implements the subset of the watchdog observer
+    interface used by sessions. Only the watches scheduled through a view are removed by it;
+    `start`, `stop`, and `join` do not affect the shared observer thread."""
+
+    def __init__(self, shared: SharedObserver) -> None:
+        self._shared = shared
+        self._scheduled: List[Tuple[ObservedWatch, FileSystemEventHandler]] = []
+        self._lock = threading.Lock()
+
+    def schedule(
+        self, event_handler: FileSystemEventHandler, path: str, recursive: bool = False
+    ) -> ObservedWatch:
+        watch = self._shared.schedule(event_handler, path, recursive=recursive)
+        with self._lock:
+            self._scheduled.append((watch, event_handler))
+        return watch
+
+    def unschedule(self, watch: ObservedWatch) -> None:
+        with self._lock:
+            removed = [entry for entry in self._scheduled if entry[0] == watch]
+            self._scheduled = [e for e in self._scheduled if e[0] != watch]
+        for watch, event_handler in removed:
+            self._shared.unschedule(event_handler, watch)
+
+    def unschedule_all(self) -> None:
+        with self._lock:
+            removed, self._scheduled = self._scheduled, []
+        for watch, event_handler in removed:
+            self._shared.unschedule(event_handler, watch)
+
+    def start(self) -> None: ...
+
+    def stop(self) -> None:
+        self.unschedule_all()
+
+    def join(self, timeout: Optional[float] = None) -> None: ...
@@ -0,0 +1,631 @@
+"""Tornado stand-in for the subset of the HydroShare REST API used by this project (through
+hsclient), so remote code paths can be benchmarked and tested offline.
+
+Resources are held in memory. Implemented endpoints: user info, search, resource map and metadata,
+manifest, system metadata, bag download, file download, zipped folder download (and task status),
+file upload, and unzip. Downloads support HTTP range requests.
+
+Network conditions are simulated with `latency` (seconds added to each request), `bandwidth`
+(bytes per second of request and response bodies), `error_rate` (fraction of requests that fail
+with a 500), and `drop_rate` (fraction of downloads whose connection is closed halfway). They can
+be changed while the server is running.
+
+Usage:
+    with FakeHydroShare(latency=0.05) as server:
+        server.add_resource({"file.csv": b"a,b\\n"})
+        hs = HydroShare(**server.credentials, **server.host)
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import PurePosixPath
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop
+from tornado.netutil import bind_sockets
+from tornado.web import Application, HTTPError, RequestHandler
+from urllib.parse import quote
+from zipfile import ZipFile
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+
+# typing imports
+from typing import Any, Dict, List, Optional, Tuple
+
+# bytes written to a response at a time
+_WRITE_SIZE = 64 * 1024
+# resources per page of search results
+SEARCH_PAGE_SIZE = 100
+
+_RANGE_RE = re.compile(r"^bytes=(\d+)-$")
+
+_RESOURCE_MAP = """<?xml version="1.0" encoding="UTF-8"?>
+<rdf:RDF
+  xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+  xmlns:ore="http://www.openarchives.org/ore/terms/"
+  xmlns:dc="http://purl.org/dc/elements/1.1/"
+  xmlns:citoterms="http://purl.org/spar/cito/">
+  <rdf:Description rdf:about="{url}/data/resourcemap.xml">
+    <rdf:type rdf:resource="http://www.openarchives.org/ore/terms/ResourceMap"/>
+    <dc:identifier>{resource_id}</dc:identifier>
+    <ore:describes rdf:resource="{url}/data/resourcemap.xml#aggregation"/>
+  </rdf:Description>
+  <rdf:Description rdf:about="{url}/data/resourcemap.xml#aggregation">
+    <rdf:type rdf:resource="http://www.openarchives.org/ore/terms/Aggregation"/>
+    <dc:title>{title}</dc:title>
+    <citoterms:isDocumentedBy rdf:resource="{url}/data/resourcemetadata.xml"/>
+    <ore:isDescribedBy rdf:resource="{url}/data/resourcemap.xml"/>
+{aggregates}  </rdf:Description>
+</rdf:RDF>
+"""
+
+_RESOURCE_METADATA = """<?xml version="1.0" encoding="UTF-8"?>
+<rdf:RDF
+  xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+  xmlns:dc="http://purl.org/dc/elements/1.1/"
+  xmlns:dcterms="http://purl.org/dc/terms/"
+  xmlns:hsterms="https://www.hydroshare.org/terms/">
+  <rdf:Description rdf:about="{url}">
+    <rdf:type rdf:resource="https://www.hydroshare.org/terms/CompositeResource"/>
+    <dc:type rdf:resource="https://www.hydroshare.org/terms/CompositeResource"/>
+    <dc:title>{title}</dc:title>
+    <dc:identifier>
+      <rdf:Description>
+        <hsterms:hydroShareIdentifier rdf:resource="{url}"/>
+      </rdf:Description>
+    </dc:identifier>
+    <dc:creator>
+      <rdf:Description>
+        <hsterms:creatorOrder>1</hsterms:creatorOrder>
+        <hsterms:name>{creator}</hsterms:name>
+      </rdf:Description>
+    </dc:creator>
+    <dc:rights>
+      <rdf:Description>
+        <hsterms:rightsStatement>CC BY</hsterms:rightsStatement>
+        <hsterms:URL rdf:resource="http://creativecommons.org/licenses/by/4.0/"/>
+      </rdf:Description>
+    </dc:rights>
+    <dc:date>
+      <dcterms:created>
+        <rdf:value>{created}</rdf:value>
+      </dcterms:created>
+    </dc:date>
+    <dc:date>
+      <dcterms:modified>
+        <rdf:value>{modified}</rdf:value>
+      </dcterms:modified>
+    </dc:date>
+    <dcterms:bibliographicCitation>{title}</dcterms:bibliographicCitation>
+  </rdf:Description>
+</rdf:RDF>
+"""
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _md5(data: bytes) -> str:
+    return hashlib.md5(data).hexdigest()
+
+
+@dataclass
+class FakeResource:
+    resource_id: str
+    title: str
+    # file path relative to the resource's `data/contents` directory: file contents
+    files: Dict[str, bytes] = field(default_factory=dict)
+    created: datetime = field(default_factory=_now)
+    last_updated: datetime = field(default_factory=_now)
+
+    def manifest(self) -> Dict[str, str]:
+        """md5 of each file by path relative to the resource base directory, as listed in the
+        resource's `manifest-md5.txt`."""
+        return {
+            f"data/contents/{path}": _md5(data) for path, data in self.files.items()
+        }
+
+    def touch(self) -> None:
+        self.last_updated = _now()
+
+
+@dataclass
+class _ZipTask:
+    name: str
+    data: bytes
+    ready_at: float
+
+
+class FakeHydroShare:
+    """In memory HydroShare server running on its own thread and event loop, so it can be used by
+    blocking clients (i.e. hsclient) and by tornado applications under test alike."""
+
+    def __init__(
+        self,
+        *,
+        username: str = "user",
+        password: str = "password",
+        latency: float = 0.0,
+        bandwidth: Optional[float] = None,
+        error_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        task_delay: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.username = username
+        self.password = password
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        # seconds before a zipped folder is ready to be downloaded
+        self.task_delay = task_delay
+
+        self.resources: Dict[str, FakeResource] = dict()
+        # number of requests handled by route name, i.e. "file", "manifest"
+        self.requests: Dict[str, int] = dict()
+        self._tasks: Dict[str, _ZipTask] = dict()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.port: Optional[int] = None
+        self._loop: Optional[IOLoop] = None
+        self._server: Optional[HTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # resources
+
+    def add_resource(
+        self,
+        files: Optional[Dict[str, bytes]] = None,
+        *,
+        resource_id: Optional[str] = None,
+        title: str = "untitled",
+    ) -> FakeResource:
+        resource_id = resource_id or uuid.uuid4().hex
+        resource = FakeResource(resource_id, title, dict(files or {}))
+        with self._lock:
+            self.resources[resource_id] = resource
+        return resource
+
+    def update_file(self, resource_id: str, path: str, data: bytes) -> None:
+        """Add or modify a file, as a collaborator would."""
+        with self._lock:
+            resource = self.resources[resource_id]
+            resource.files[path] = data
+            resource.touch()
+
+    # server life cycle
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def host(self) -> Dict[str, Any]:
+        """`hsclient.HydroShare` host, protocol, and port keyword arguments."""
+        return {"host": "127.0.0.1", "protocol": "http", "port": self.port}
+
+    @property
+    def credentials(self) -> Dict[str, str]:
+        return {"username": self.username, "password": self.password}
+
+    def start(self) -> "FakeHydroShare":
+        sockets = bind_sockets(0, "127.0.0.1")
+        self.port = sockets[0].getsockname()[1]
+        started = threading.Event()
+
+        def run() -> None:
+            asyncio.set_event_loop(asyncio.new_event_loop())
+            self._loop = IOLoop.current()
+            self._server = HTTPServer(
+                self.make_app(), max_body_size=1 << 32, max_buffer_size=1 << 32
+            )
+            self._server.add_sockets(sockets)
+            started.set()
+            self._loop.start()
+            self._loop.close(all_fds=True)
+
+        self._thread = threading.Thread(target=run, name="fake-hydroshare", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+
+        def shutdown() -> None:
+            self._server.stop()
+            self._loop.stop()
+
+        self._loop.add_callback(shutdown)
+        self._thread.join()
+        self._loop = None
+
+    def __enter__(self) -> "FakeHydroShare":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def make_app(self) -> Application:
+        resource_id = r"([0-9a-f]{32})"
+        routes = [
+            (r"/hsapi/userInfo/?", _UserInfoHandler, "user_info"),
+            (r"/hsapi/resource/?", _SearchHandler, "search"),
+            (rf"/hsapi/resource/{resource_id}/?", _BagHandler, "bag"),
+            (rf"/hsapi/resource/{resource_id}/sysmeta/?", _SysMetaHandler, "sysmeta"),
+            (
+                rf"/hsapi/resource/{resource_id}/files/?(.*?)/?",
+                _UploadHandler,
+                "upload",
+            ),
+            (
+                rf"/hsapi/resource/{resource_id}/functions/unzip/data/contents/(.+?)/?",
+                _UnzipHandler,
+                "unzip",
+            ),
+            (r"/hsapi/taskstatus/([^/]+)/?", _TaskStatusHandler, "task_status"),
+            (rf"/resource/{resource_id}/data/resourcemap.xml/?", _MapHandler, "map"),
+            (
+                rf"/resource/{resource_id}/data/resourcemetadata.xml/?",
+                _MetadataHandler,
+                "metadata",
+            ),
+            (
+                rf"/resource/{resource_id}/manifest-md5.txt/?",
+                _ManifestHandler,
+                "manifest",
+            ),
+            (
+                rf"/resource/{resource_id}/data/contents/(.+?)/?",
+                _ContentsHandler,
+                "file",
+            ),
+            (r"/django_irods/rest_download/zips/([^/]+)/[^/]+?/?", _ZipHandler, "zip"),
+        ]
+        return Application(
+            [
+                (pattern, handler, {"server": self, "route": name})
+                for pattern, handler, name in routes
+            ]
+        )
+
+
+class _FakeHandler(RequestHandler):
+    def initialize(self, server: FakeHydroShare, route: str) -> None:
+        self.server = server
+        self.route = route
+
+    async def prepare(self) -> None:
+        server = self.server
+        server.requests[self.route] = server.requests.get(self.route, 0) + 1
+
+        delay = server.latency
+        if server.bandwidth and self.request.body:
+            delay += len(self.request.body) / server.bandwidth
+        if delay:
+            await asyncio.sleep(delay)
+
+        if not self._authenticated():
+            raise HTTPError(401)
+        if server.error_rate and server._random.random() < server.error_rate:
+            raise HTTPError(500, "injected error")
+
+    def _authenticated(self) -> bool:
+        header = self.request.headers.get("Authorization", "")
+        if not header.startswith("Basic "):
+            return False
+        username, _, password = base64.b64decode(header[6:]).decode().partition(":")
+        return (username, password) == (self.server.username, self.server.password)
+
+    def get_resource(self, resource_id: str) -> FakeResource:
+        resource = self.server.resources.get(resource_id)
+        if resource is None:
+            raise HTTPError(404)
+        return resource
+
+    def resource_url(self, resource_id: str) -> str:
+        return f"{self.server.url}/resource/{resource_id}"
+
+    def write_json(self, obj: Any) -> None:
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps(obj, default=str))
+
+    async def send_entity(self, data: bytes, filename: str, content_type: str) -> None:
+        """Write `data` honoring `Range` and `If-Range` request headers, throttled to the server's
+        bandwidth. The connection is closed halfway through for a fraction of responses.
+        """
+        etag = f'"{_md5(data)}"'
+        offset = self._range_offset(etag)
+        size = len(data)
+        if offset and offset >= size:
+            self.set_status(416)
+            self.set_header("Content-Range", f"bytes */{size}")
+            return self.finish()
+        if offset:
+            self.set_status(206)
+            self.set_header("Content-Range", f"bytes {offset}-{size - 1}/{size}")
+
+        self.set_header("Content-Type", content_type)
+        self.set_header(
+            "Content-Disposition", f'attachment; filename="{quote(filename)}"'
+        )
+        self.set_header("Content-Length", str(size - offset))
+        self.set_header("ETag", etag)
+
+        server = self.server
+        remaining = memoryview(data)[offset:]
+        drop_at = None
+        if server.drop_rate and server._random.random() < server.drop_rate:
+            # at least one byte is sent, so a resumed download makes progress
+            drop_at = max(1, len(remaining) // 2)
+        written = 0
+        while written < len(remaining):
+            if drop_at is not None and written >= drop_at:
+                # simulate a dropped connection, the client received a partial body
+                self.request.connection.stream.close()
+                return
+            chunk = remaining[written : written + _WRITE_SIZE]
+            self.write(bytes(chunk))
+            await self.flush()
+            written += len(chunk)
+            if server.bandwidth:
+                await asyncio.sleep(len(chunk) / server.bandwidth)
+        self.finish()
+
+    def _range_offset(self, etag: str) -> int:
+        match = _RANGE_RE.match(self.request.headers.get("Range", ""))
+        if match is None:
+            return 0
+        if_range = self.request.headers.get("If-Range")
+        if if_range is not None and if_range != etag:
+            # entity changed, send all of it
+            return 0
+        return int(match.group(1))
+
+
+class _UserInfoHandler(_FakeHandler):
+    def get(self) -> None:
+        self.write_json(
+            {
+                "id": 1,
+                "username": self.server.username,
+                "email": f"{self.server.username}@example.com",
+                "first_name": self.server.username,
+                "last_name": "",
+            }
+        )
+
+
+class _SearchHandler(_FakeHandler):
+    def get(self) -> None:
+        page = int(self.get_query_argument("page", "1"))
+        resources = sorted(self.server.resources.values(), key=lambda r: r.resource_id)
+        start = (page - 1) * SEARCH_PAGE_SIZE
+        results = [
+            self._preview(resource)
+            for resource in resources[start : start + SEARCH_PAGE_SIZE]
+        ]
+        next_url = None
+        if start + SEARCH_PAGE_SIZE < len(resources):
+            next_url = f"{self.server.url}/hsapi/resource/?page={page + 1}&edit_permission=true"
+        self.write_json(
+            {
+                "count": len(resources),
+                "next": next_url,
+                "previous": None,
+                "results": results,
+            }
+        )
+
+    def _preview(self, resource: FakeResource) -> Dict[str, Any]:
+        url = self.resource_url(resource.resource_id)
+        return {
+            "resource_type": "CompositeResource",
+            "resource_title": resource.title,
+            "resource_id": resource.resource_id,
+            "abstract": None,
+            "authors": [self.server.username],
+            "creator": self.server.username,
+            "doi": None,
+            "date_created": resource.created.isoformat(),
+            "date_last_updated": resource.last_updated.isoformat(),
+            "public": False,
+            "discoverable": False,
+            "shareable": True,
+            "immutable": False,
+            "published": False,
+            "resource_url": url,
+            "resource_map_url": f"{url}/data/resourcemap.xml",
+            "resource_metadata_url": f"{url}/data/resourcemetadata.xml",
+        }
+
+
+class _SysMetaHandler(_FakeHandler):
+    def get(self, resource_id: str) -> None:
+        resource = self.get_resource(resource_id)
+        self.write_json(
+            {
+                "resource_id": resource.resource_id,
+                "resource_title": resource.title,
+                "resource_type": "CompositeResource",
+                "date_created": resource.created.isoformat(),
+                "date_last_updated": resource.last_updated.isoformat(),
+                "resource_url": self.resource_url(resource_id),
+            }
+        )
+
+
+class _MapHandler(_FakeHandler):
+    def get(self, resource_id: str) -> None:
+        resource = self.get_resource(resource_id)
+        url = self.resource_url(resource_id)
+        aggregates = "".join(
+            f'    <ore:aggregates rdf:resource="{url}/data/contents/{quote(path)}"/>\n'
+            for path in sorted(resource.files)
+        )
+        self.set_header("Content-Type", "application/rdf+xml")
+        self.finish(
+            _RESOURCE_MAP.format(
+                url=url,
+                resource_id=resource_id,
+                title=resource.title,
+                aggregates=aggregates,
+            )
+        )
+
+
+class _MetadataHandler(_FakeHandler):
+    def get(self, resource_id: str) -> None:
+        resource = self.get_resource(resource_id)
+        self.set_header("Content-Type", "application/rdf+xml")
+        self.finish(
+            _RESOURCE_METADATA.format(
+                url=self.resource_url(resource_id),
+                title=resource.title,
+                creator=self.server.username,
+                created=resource.created.isoformat(),
+                modified=resource.last_updated.isoformat(),
+            )
+        )
+
+
+def _manifest_text(resource: FakeResource) -> str:
+    # hsclient splits lines on four spaces
+    return "".join(
+        f"{digest}    {path}\n" for path, digest in sorted(resource.manifest().items())
+    )
+
+
+class _ManifestHandler(_FakeHandler):
+    def get(self, resource_id: str) -> None:
+        resource = self.get_resource(resource_id)
+        self.set_header("Content-Type", "text/plain")
+        self.finish(_manifest_text(resource))
+
+
+def _zip(members: List[Tuple[str, bytes]]) -> bytes:
+    buffer = BytesIO()
+    with ZipFile(buffer, "w") as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+class _BagHandler(_FakeHandler):
+    async def get(self, resource_id: str) -> None:
+        resource = self.get_resource(resource_id)
+        prefix = f"{resource_id}/"
+        members = [
+            (
+                f"{prefix}bagit.txt",
+                b"BagIt-Version: 0.96\nTag-File-Character-Encoding: UTF-8\n",
+            ),
+            (f"{prefix}manifest-md5.txt", _manifest_text(resource).encode()),
+        ]
+        members.extend(
+            (f"{prefix}data/contents/{path}", data)
+            for path, data in sorted(resource.files.items())
+        )
+        await self.send_entity(_zip(members), f"{resource_id}.zip", "application/zip")
+
+
+class _ContentsHandler(_FakeHandler):
+    async def get(self, resource_id: str, path: str) -> None:
+        resource = self.get_resource(resource_id)
+        if self.get_query_argument("zipped", "false") == "true":
+            return self._zip_folder(resource, path)
+
+        data = resource.files.get(path)
+        if data is None:
+            raise HTTPError(404)
+        await self.send_entity(
+            data, PurePosixPath(path).name, "application/octet-stream"
+        )
+
+    def _zip_folder(self, resource: FakeResource, folder: str) -> None:
+        """Zip a folder in a "background task". Archive members are relative to the folder's
+        parent, so the archive extracts to the folder."""
+        folder = folder.strip("/")
+        parent = PurePosixPath(folder).parent
+        members = [
+            (PurePosixPath(path).relative_to(parent).as_posix(), data)
+            for path, data in sorted(resource.files.items())
+            if path.startswith(f"{folder}/")
+        ]
+        if not members:
+            raise HTTPError(404)
+
+        task_id = uuid.uuid4().hex
+        name = f"{PurePosixPath(folder).name}.zip"
+        ready_at = time.monotonic() + self.server.task_delay
+        self.server._tasks[task_id] = _ZipTask(name, _zip(members), ready_at)
+        self.write_json(
+            {
+                "zip_status": "Not ready" if self.server.task_delay else "Completed",
+                "task_id": task_id,
+                "download_path": f"/django_irods/rest_download/zips/{task_id}/{name}",
+            }
+        )
+
+
+class _TaskStatusHandler(_FakeHandler):
+    def get(self, task_id: str) -> None:
+        task = self.server._tasks.get(task_id)
+        if task is None:
+            raise HTTPError(404)
+        ready = time.monotonic() >= task.ready_at
+        self.write_json({"status": "true" if ready else "false"})
+
+
+class _ZipHandler(_FakeHandler):
+    async def get(self, task_id: str) -> None:
+        task = self.server._tasks.get(task_id)
+        if task is None or time.monotonic() < task.ready_at:
+            raise HTTPError(404)
+        await self.send_entity(task.data, task.name, "application/zip")
+
+
+class _UploadHandler(_FakeHandler):
+    def post(self, resource_id: str, folder: str) -> None:
+        resource = self.get_resource(resource_id)
+        uploads = self.request.files.get("file")
+        if not uploads:
+            raise HTTPError(400)
+        folder = folder.strip("/")
+        with self.server._lock:
+            for upload in uploads:
+                path = f"{folder}/{upload.filename}" if folder else upload.filename
+                resource.files[path] = upload.body
+            resource.touch()
+        self.set_status(201)
+        self.write_json({"resource_id": resource_id})
+
+
+class _UnzipHandler(_FakeHandler):
+    def post(self, resource_id: str, zip_path: str) -> None:
+        resource = self.get_resource(resource_id)
+        zip_path = zip_path.strip("/")
+        data = resource.files.get(zip_path)
+        if data is None:
+            raise HTTPError(404)
+        location = PurePosixPath(zip_path).parent
+        prefix = "" if str(location) == "." else f"{location}/"
+        with self.server._lock, ZipFile(BytesIO(data)) as archive:
+            for name in archive.namelist():
+                if not name.endswith("/"):
+                    resource.files[f"{prefix}{name}"] = archive.read(name)
+            # HydroShare removes the archive once it is unpacked
+            del resource.files[zip_path]
+            resource.touch()
+        self.write_json({"resource_id": resource_id})
@@ -0,0 +1,25 @@
+"""In-process stand-ins for the hsclient objects used to build resource maps, for tests and
+benchmarks that do not exercise HTTP. See `fake_hydroshare` for a stand-in of the HydroShare REST
+API.
+"""
+
+# typing imports
+from typing import Dict, Optional
+
+
+class StubResource:
+    """hsclient `Resource` stand-in. `_checksums` is the manifest HydroShare would return."""
+
+    def __init__(
+        self, resource_id: str, checksums: Optional[Dict[str, str]] = None
+    ) -> None:
+        self.resource_id = resource_id
+        self._checksums = dict(checksums or {})
+        self._parsed_checksums = None
+
+
+class StubHydroShare:
+    """hsclient `HydroShare` stand-in whose resources have empty manifests."""
+
+    def resource(self, resource_id: str, validate: bool = True) -> StubResource:
+        return StubResource(resource_id)
@@ -76,3 +76,30 @@ def first_existing_file(file_paths: Union[List, Tuple]) -> Union[str, None]:
             return str(resolved_path)
 
     return None
+
+
+# name of hidden directory, relative to the configured data path, where application state (e.g.
+# partially transferred files) is stored
+APP_STATE_DIRNAME = ".hydroshare_on_jupyter"
+
+
+def app_state_path(data_path: Union[str, Path], *parts: str) -> Path:
+    """Given the configured data path, return the absolute path to an application state
+    subdirectory. The directory (and intermediary directories) are created if they do not
+    exist.
+
+    Parameters
+    ----------
+    data_path : Union[str, Path]
+        configured location where HydroShare resources are stored
+    parts : str
+        subdirectory path components (i.e. "transfers", "downloads")
+
+    Returns
+    -------
+    Path
+        absolute path to application state subdirectory
+    """
+    path = expand_and_resolve(data_path).joinpath(APP_STATE_DIRNAME, *parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
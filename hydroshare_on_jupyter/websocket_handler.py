@@ -1,3 +1,4 @@
+from contextvars import copy_context
 from functools import partial
 from tornado.websocket import WebSocketHandler
 from http import HTTPStatus
@@ -5,13 +6,11 @@ import logging
 import asyncio
 
 from .server import SessionMixIn
+from .lib.tracing import span
 
 # event types
 from .fs_events import Events
 
-# from .session import event_broker, session_sync_struct as session
-from .session import session_sync_struct as session
-
 
 class FileSystemEventWebSocketHandler(SessionMixIn, WebSocketHandler):
     def prepare(self):
@@ -25,13 +24,17 @@ class FileSystemEventWebSocketHandler(SessionMixIn, WebSocketHandler):
             uri = self.request.uri
             self.redirect(f"{self.get_login_url()}?next={uri}")
 
+        # sync session of the logged in user. events are only received from this session
+        self.sync_session = self.get_sync_session()
+
     def open(self, *args, **kwargs):
         # ignore args and kwargs
 
         # send initial state/status
-        message = session.aggregate_fs_map.get_sync_state().json()
-        logging.info(message)
-        self.write_message(message)
+        with span("FileSystemEventWebSocketHandler.open"):
+            message = self.sync_session.aggregate_fs_map.get_sync_state().json()
+            logging.info(message)
+            self._write_message(message)
 
         # subscribe to FSEvents
         self._subscribe_to_events()
@@ -47,32 +50,51 @@ class FileSystemEventWebSocketHandler(SessionMixIn, WebSocketHandler):
         logging.info("unsubscribed from events")
 
     def _subscribe_to_events(self):
-        session.event_broker.subscribe(Events.STATUS, self._get_resource_status)
-        session.event_broker.subscribe(
+        self.sync_session.event_broker.subscribe(
+            Events.STATUS, self._get_resource_status
+        )
+        self.sync_session.event_broker.subscribe(
             Events.RESOURCE_STATUS, self._get_resource_status
         )
-        session.event_broker.subscribe(
-            Events.RESOURCE_ENTITY_UPLOADED, self._get_resource_status
+        self.sync_session.event_broker.subscribe(
+            Events.RESOURCE_ENTITY_UPLOADED, self._resource_uploaded
         )
 
     def _unsubscribe_from_events(self):
-        # TODO: bug lifetime of event_broker not guaranteed. event_broker is destroyed by logout logic
+        # TODO: bug lifetime of event_broker not guaranteed. event_broker is destroyed by logout logic.
+        # `sync_session` is None if the user was not logged in
         try:
-            session.event_broker.unsubscribe(Events.STATUS, self._get_resource_status)
-            session.event_broker.unsubscribe(
+            self.sync_session.event_broker.unsubscribe(
+                Events.STATUS, self._get_resource_status
+            )
+            self.sync_session.event_broker.unsubscribe(
                 Events.RESOURCE_STATUS, self._get_resource_status
             )
-            session.event_broker.unsubscribe(
-                Events.RESOURCE_ENTITY_UPLOADED, self._get_resource_status
+            self.sync_session.event_broker.unsubscribe(
+                Events.RESOURCE_ENTITY_UPLOADED, self._resource_uploaded
             )
         except AttributeError as e:
             pass
 
+    def _resource_uploaded(self, res_id: str, **kwargs) -> None:
+        # ignore event kwargs (i.e. `checksums`)
+        self._get_resource_status(res_id)
+
     def _get_resource_status(self, res_id: str) -> str:
         """Write json stringified resource sync state"""
         # NOTE: It is possible for aggregate_fs_map to be None if the user has not logged in.
         # this state should not occur if the user is logged in.
-        message = session.aggregate_fs_map.get_resource_sync_state(res_id).json()
+        with span(
+            "FileSystemEventWebSocketHandler.resource_status", resource_id=res_id
+        ):
+            message = self.sync_session.aggregate_fs_map.get_resource_sync_state(
+                res_id
+            ).json()
         logging.info(message)
-        call = partial(self.write_message, message)
-        self.loop.call_soon_threadsafe(call)
+        call = partial(self._write_message, message)
+        # written on the event loop's thread, as a child of the span that emitted the status
+        self.loop.call_soon_threadsafe(call, context=copy_context())
+
+    def _write_message(self, message: str) -> None:
+        with span("FileSystemEventWebSocketHandler.write_message", size=len(message)):
+            self.write_message(message)
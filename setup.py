@@ -46,7 +46,13 @@ REQUIREMENTS = [
 ]
 
 # Development requirements
-DEVELOPMENT_REQUIREMENTS = ["pytest", "pytest-tornado"]
+DEVELOPMENT_REQUIREMENTS = ["pytest", "pytest-tornado", "pytest-benchmark"]
+
+# Optional requirements, i.e. `pip install hydroshare_on_jupyter[numpy]`
+OPTIONAL_REQUIREMENTS = {
+    # vectorized comparison of large resources
+    "numpy": ["numpy"],
+}
 
 SHORT_DESCRIPTION = "A JupyterLab extension for downloading, uploading, editing, and syncing your HydroShare resources without leaving Jupyter."
 
@@ -72,5 +78,5 @@ if __name__ == "__main__":
         long_description_content_type="text/markdown",
         include_package_data=True,
         install_requires=REQUIREMENTS,
-        extras_require={"develop": DEVELOPMENT_REQUIREMENTS},
+        extras_require={"develop": DEVELOPMENT_REQUIREMENTS, **OPTIONAL_REQUIREMENTS},
     )
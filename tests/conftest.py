@@ -0,0 +1,94 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from tornado.httpclient import HTTPRequest, HTTPResponse
+import pytest
+
+from hydroshare_on_jupyter.__main__ import get_test_app
+from hydroshare_on_jupyter.testing.fake_hydroshare import FakeHydroShare
+
+# typing imports
+from typing import Dict
+
+
+class FakeTimer:
+    """Monotonic clock whose time only advances when `now` is set."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    return FakeTimer()
+
+
+@pytest.fixture
+def server():
+    with FakeHydroShare() as server:
+        yield server
+
+
+@pytest.fixture
+def data_path():
+    with TemporaryDirectory() as temp:
+        yield Path(temp).resolve()
+
+
+@pytest.fixture
+def resources(server, data_path):
+    """Resources seeded on `server`, and in `data_path`, before `app` is created. Override in test
+    modules."""
+    return None
+
+
+@pytest.fixture
+def app_settings():
+    """`get_test_app` settings in addition to those set by `app`. Override in test modules."""
+    return {}
+
+
+@pytest.fixture
+def app(server, data_path, resources, app_settings):
+    return get_test_app(
+        data_path=data_path,
+        hydroshare_url=server.url,
+        remote_poll=False,
+        **app_settings
+    )
+
+
+@pytest.fixture
+def login(server, http_client, base_url):
+    async def login() -> Dict[str, str]:
+        """Log in to `server`. Returns the session cookie header."""
+        response = await http_client.fetch(
+            HTTPRequest(
+                base_url + "/syncApi/login",
+                method="POST",
+                body=json.dumps(server.credentials),
+                headers={"content-type": "application/json"},
+            )
+        )
+        assert json.loads(response.body) == {"success": True}
+        return {"Cookie": response.headers["Set-Cookie"].split(";", 1)[0]}
+
+    return login
+
+
+@pytest.fixture
+def logout(http_client, base_url):
+    async def logout(cookie: Dict[str, str]) -> HTTPResponse:
+        """Log out, shutting down the session's sync session."""
+        return await http_client.fetch(
+            HTTPRequest(
+                base_url + "/syncApi/login",
+                method="DELETE",
+                headers={"content-type": "application/json", **cookie},
+            )
+        )
+
+    return logout
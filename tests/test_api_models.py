@@ -62,3 +62,25 @@ def test_resource_files_should_fail(test_data):
     data = {"files": test_data}
     with pytest.raises(pydantic.ValidationError):
         m.ResourceFiles(**data)
+
+
+def test_batch_download_entry_should_pass():
+    m.BatchDownloadEntry(resource_id="0123456789abcdef" * 2, path="dir/file.csv")
+
+
+BATCH_DOWNLOAD_ENTRY_RESOURCE_ID_SHOULD_FAIL_CASES = [
+    "",
+    "../x",
+    "a" * 31,
+    "a" * 33,
+    "A" * 32,
+    "a" * 30 + "/.",
+]
+
+
+@pytest.mark.parametrize(
+    "resource_id", BATCH_DOWNLOAD_ENTRY_RESOURCE_ID_SHOULD_FAIL_CASES
+)
+def test_batch_download_entry_resource_id_should_fail(resource_id):
+    with pytest.raises(pydantic.ValidationError):
+        m.BatchDownloadEntry(resource_id=resource_id, path="file.csv")
@@ -0,0 +1,122 @@
+import hashlib
+import random
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+
+from hydroshare_on_jupyter.lib.filesystem import array_sync_state
+from hydroshare_on_jupyter.lib.filesystem.aggregate_fs_map import AggregateFSMap
+from hydroshare_on_jupyter.lib.filesystem.array_sync_state import (
+    compare_resource_maps,
+)
+from hydroshare_on_jupyter.lib.filesystem.fs_map import LocalFSMap, RemoteFSMap
+from hydroshare_on_jupyter.lib.filesystem.fs_resource_map import RemoteFSResourceMap
+
+pytest.importorskip("numpy")
+
+
+def md5(value) -> str:
+    return hashlib.md5(str(value).encode()).hexdigest()
+
+
+def resource_map(resource_id, data):
+    resource_map = RemoteFSResourceMap(SimpleNamespace(resource_id=resource_id))
+    resource_map.data = dict(data)
+    return resource_map
+
+
+def brute_force(local, remote):
+    in_both = local.keys() & remote.keys()
+    out_of_sync = {path for path in in_both if local[path] != remote[path]}
+    return (
+        in_both - out_of_sync,
+        out_of_sync,
+        local.keys() - remote.keys(),
+        remote.keys() - local.keys(),
+    )
+
+
+def random_pair(rng, resource_id, n_files, digest=md5):
+    paths = [Path(f"data/contents/{i % 7}/{i}.txt") for i in range(n_files)]
+    local = {path: digest(i) for i, path in enumerate(paths)}
+    # distinct, but equal, path objects
+    remote = {Path(str(path)): value for path, value in local.items()}
+    for path in rng.sample(paths, n_files // 10):
+        remote[Path(str(path))] = digest("changed")
+    for path in rng.sample(paths, n_files // 10):
+        del local[path]
+    for path in rng.sample(paths, n_files // 10):
+        remote.pop(path, None)
+    return resource_map(resource_id, local), resource_map(resource_id, remote)
+
+
+@pytest.mark.parametrize("digest", [md5, str, lambda i: md5(i).upper()])
+def test_compare_matches_brute_force(digest):
+    rng = random.Random(0)
+    # same paths in each resource
+    pairs = [random_pair(rng, f"resource{i}", 200, digest) for i in range(12)]
+    pairs.append((resource_map("empty", {}), resource_map("empty", {})))
+    pairs.append(random_pair(rng, "only_local", 20, digest))
+    pairs[-1][1].data = {}
+
+    results = compare_resource_maps(pairs)
+    assert len(results) == len(pairs)
+    for (local, remote), result in zip(pairs, results):
+        assert result == brute_force(local.data, remote.data)
+
+
+def test_path_id_collisions(monkeypatch):
+    rng = random.Random(0)
+    pairs = [random_pair(rng, "resource", 50)]
+    expected = [brute_force(local.data, remote.data) for local, remote in pairs]
+    # every path id collides
+    monkeypatch.setattr(array_sync_state, "hash", lambda _: 0, raising=False)
+    assert compare_resource_maps(pairs) == expected
+
+    # ids are unique on each side, but a remote id matches a different local path
+    a, b = Path("data/contents/a"), Path("data/contents/b")
+    pairs = [
+        (resource_map("resource", {a: md5(1)}), resource_map("resource", {b: md5(1)}))
+    ]
+    assert compare_resource_maps(pairs) == [(set(), set(), {a}, {b})]
+
+
+def test_from_aggregate_map_batches_large_resources(monkeypatch):
+    rng = random.Random(0)
+    pairs = {
+        "large1": random_pair(rng, "large1", 100),
+        "large2": random_pair(rng, "large2", 100),
+        "small": random_pair(rng, "small", 10),
+    }
+    local_map = LocalFSMap("/")
+    remote_map = RemoteFSMap("/", hydroshare=None)
+    for resource_id, (local, remote) in pairs.items():
+        local_map.data[resource_id] = local
+        remote_map.data[resource_id] = remote
+    aggregate_map = AggregateFSMap(local_map=local_map, remote_map=remote_map)
+
+    batches = []
+
+    def spy(resource_map_pairs):
+        batches.append([local.resource_id for local, _ in resource_map_pairs])
+        return compare_resource_maps(resource_map_pairs)
+
+    monkeypatch.setattr(array_sync_state, "MIN_ARRAY_FILES", 50)
+    monkeypatch.setattr(
+        "hydroshare_on_jupyter.lib.filesystem.aggregate_fs_resource_map_sync_state"
+        ".compare_resource_maps",
+        spy,
+    )
+    states = aggregate_map.get_sync_state().__root__
+
+    assert len(batches) == 1 and sorted(batches[0]) == ["large1", "large2"]
+    assert pairs["small"][0]._folder_digests is not None
+    assert pairs["large1"][0]._folder_digests is None
+    for state in states:
+        local, remote = pairs[state.resource_id]
+        assert (
+            state.in_sync,
+            state.out_of_sync,
+            state.only_local,
+            state.only_remote,
+        ) == brute_force(local.data, remote.data)
@@ -0,0 +1,77 @@
+import pytest
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hydroshare_on_jupyter.lib import batch_download as batch_download_module
+from hydroshare_on_jupyter.lib.batch_download import DownloadEntry, batch_download
+
+
+class FakeResource:
+    def __init__(self, resource_id):
+        self.resource_id = resource_id
+
+
+class Recorder:
+    """Stand-in for HydroShare entity downloads. Records concurrency and fails `fail` paths."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.downloaded = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, resource, data_path, entry, content_index=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+            if entry.path in self.fail:
+                raise RuntimeError(f"failed {entry.path}")
+            self.downloaded.append((resource.resource_id, entry.path))
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = Recorder(fail={"bad"})
+    monkeypatch.setattr(batch_download_module, "_download_entry", recorder)
+    return recorder
+
+
+def test_batch_download_concurrency_cap_and_failures(recorder):
+    resolved = []
+
+    def get_resource(resource_id):
+        resolved.append(resource_id)
+        return FakeResource(resource_id)
+
+    entries = [DownloadEntry("a", f"file_{i}") for i in range(8)]
+    entries += [DownloadEntry("b", "bad"), DownloadEntry("b", "dir", is_folder=True)]
+    # duplicate entry is downloaded once
+    entries.append(DownloadEntry("a", "file_0"))
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = batch_download(entries, get_resource, "data", executor)
+
+    assert sorted(resolved) == ["a", "b"]
+    assert recorder.max_active <= 2
+    assert [r.entry for r in results] == entries[:-1]
+    assert [r.entry.path for r in results if not r.success] == ["bad"]
+    assert len(recorder.downloaded) == 9
+
+
+def test_batch_download_unresolved_resource(recorder):
+    def get_resource(resource_id):
+        if resource_id == "missing":
+            raise KeyError(resource_id)
+        return FakeResource(resource_id)
+
+    entries = [DownloadEntry("missing", "file"), DownloadEntry("a", "file")]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = batch_download(entries, get_resource, "data", executor)
+
+    assert [r.success for r in results] == [False, True]
+    assert recorder.downloaded == [("a", "file")]
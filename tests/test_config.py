@@ -86,3 +86,19 @@ def oauth_file(oauth_data) -> Path:
 def test_config_oauth(oauth_file, oauth_data):
     o = ConfigFile(oauth_path=str(oauth_file))
     assert o.oauth_path.__root__[0].access_token == oauth_data[0]["access_token"]
+
+
+def test_config_ignore_patterns(monkeypatch):
+    with TemporaryDirectory() as temp:
+        monkeypatch.setenv("IGNORE", "*.tmp, scratch/")
+        c = ConfigFile(data_path=temp, log_path=Path(temp) / "logs")
+        assert c.ignore_patterns == ["*.tmp", "scratch/"]
+
+
+def test_config_remote_poll_is_opt_in(monkeypatch):
+    with TemporaryDirectory() as temp:
+        c = ConfigFile(data_path=temp, log_path=Path(temp) / "logs")
+        assert c.remote_poll is False
+        monkeypatch.setenv("REMOTE_POLL", "true")
+        c = ConfigFile(data_path=temp, log_path=Path(temp) / "logs")
+        assert c.remote_poll is True
@@ -0,0 +1,152 @@
+import json
+import os
+from pathlib import Path
+from tornado.httpclient import HTTPRequest
+import pytest
+
+from hydroshare_on_jupyter.lib.filesystem import content_index
+from hydroshare_on_jupyter.lib.filesystem.aggregate_fs_map import AggregateFSMap
+from hydroshare_on_jupyter.lib.filesystem.content_index import ContentIndex
+from hydroshare_on_jupyter.lib.filesystem.fs_map import LocalFSMap, RemoteFSMap
+from hydroshare_on_jupyter.lib.filesystem.fs_resource_map import LocalFSResourceMap
+from hydroshare_on_jupyter.lib.filesystem.utilities import compute_file_md5_hexdigest
+from hydroshare_on_jupyter.models.api_models import DedupStatistics
+
+
+def contents_path(data_path: Path, resource_id: str) -> Path:
+    return data_path / resource_id / resource_id / "data" / "contents"
+
+
+def create_resource(data_path: Path, resource_id: str, files) -> LocalFSResourceMap:
+    for name, data in files.items():
+        path = contents_path(data_path, resource_id) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return LocalFSResourceMap.from_resource_path(data_path / resource_id)
+
+
+@pytest.fixture
+def local_map(data_path):
+    local_map = LocalFSMap(data_path)
+    local_map.data["a"] = create_resource(
+        data_path, "a", {"shared.csv": b"shared", "folder/a.csv": b"a"}
+    )
+    return local_map
+
+
+def md5(path: Path) -> str:
+    return compute_file_md5_hexdigest(path)
+
+
+def test_find_follows_resource_map_changes(data_path, local_map):
+    index = ContentIndex(local_map)
+    shared = contents_path(data_path, "a") / "shared.csv"
+    digest = md5(shared)
+    assert [path for _, path in index.find(digest)] == [
+        Path("data/contents/shared.csv")
+    ]
+
+    # modified file is re-indexed
+    shared.write_bytes(b"modified")
+    local_map["a"].update_file(shared)
+    assert index.find(digest) == []
+    assert len(index.find(md5(shared))) == 1
+
+    # added resources are indexed on the next query, removed resources are dropped
+    local_map.data["b"] = create_resource(data_path, "b", {"b.csv": b"a"})
+    assert len(index.find(md5(contents_path(data_path, "b") / "b.csv"))) == 2
+    resource_map = local_map.data.pop("a")
+    assert len(index.find(md5(contents_path(data_path, "b") / "b.csv"))) == 1
+    assert resource_map._observers == ()
+
+    index.close()
+    assert local_map["b"]._observers == ()
+
+
+@pytest.mark.parametrize(
+    "hardlinks,method", [(False, content_index.COPY), (True, content_index.HARDLINK)]
+)
+def test_materialize(data_path, local_map, monkeypatch, hardlinks, method):
+    # reflinks depend on the file system under test
+    monkeypatch.setattr(content_index, "_reflink", lambda source, destination: False)
+    index = ContentIndex(local_map, hardlinks=hardlinks)
+    shared = contents_path(data_path, "a") / "shared.csv"
+    destination = contents_path(data_path, "b") / "copy.csv"
+    destination.parent.mkdir(parents=True)
+
+    assert index.materialize(md5(shared), destination) == method
+    assert destination.read_bytes() == b"shared"
+    assert os.path.samefile(shared, destination) == hardlinks
+    # already written
+    if hardlinks:
+        assert index.materialize(md5(shared), destination) == content_index.EXISTING
+    assert index.materialize(md5(shared), shared) == content_index.EXISTING
+
+    assert index.materialize("0" * 32, destination) is None
+    files = 3 if hardlinks else 2
+    assert index.statistics == DedupStatistics(
+        files=files,
+        bytes_avoided=files * len(b"shared"),
+        existing=files - 1,
+        hardlinked=int(hardlinks),
+        copied=int(not hardlinks),
+    )
+
+
+def test_materialize_skips_modified_files(data_path, local_map):
+    index = ContentIndex(local_map)
+    shared = contents_path(data_path, "a") / "shared.csv"
+    digest = md5(shared)
+    # modified, but the resource map has not been updated yet
+    shared.write_bytes(b"modified")
+
+    destination = contents_path(data_path, "a") / "copy.csv"
+    assert index.materialize(digest, destination) is None
+    assert not destination.exists()
+    assert index.statistics == DedupStatistics()
+
+
+def test_aggregate_map_content_index(data_path, local_map):
+    aggregate_map = AggregateFSMap(
+        local_map=local_map, remote_map=RemoteFSMap(data_path, hydroshare=None)
+    )
+    index = aggregate_map.get_content_index()
+    assert aggregate_map.get_content_index(hardlinks=True) is index
+    assert index.hardlinks
+
+
+@pytest.fixture
+def resources(server, data_path):
+    local = server.add_resource({"shared.csv": b"shared"})
+    create_resource(data_path, local.resource_id, local.files)
+    remote = server.add_resource({"copy.csv": b"shared", "b.csv": b"b"})
+    return local.resource_id, remote.resource_id
+
+
+@pytest.mark.gen_test
+async def test_download_copies_local_files(
+    server, data_path, resources, login, logout, http_client, base_url
+):
+    local, remote = resources
+    cookie = await login()
+    # add the local resource to the sync session
+    await http_client.fetch(
+        HTTPRequest(base_url + f"/syncApi/resources/{local}", headers=cookie)
+    )
+
+    url = base_url + f"/syncApi/resources/{remote}/download"
+    for name in ("copy.csv", "b.csv"):
+        response = await http_client.fetch(HTTPRequest(f"{url}/{name}", headers=cookie))
+        assert response.code == 201
+        assert (contents_path(data_path, remote) / name).exists()
+    # only the file that did not exist locally was downloaded
+    assert server.requests["file"] == 1
+
+    response = await http_client.fetch(
+        HTTPRequest(base_url + "/syncApi/dedup", headers=cookie)
+    )
+    statistics = json.loads(response.body)
+    assert statistics["files"] == 1
+    assert statistics["bytes_avoided"] == len(b"shared")
+
+    await logout(cookie)
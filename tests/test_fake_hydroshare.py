@@ -0,0 +1,129 @@
+import pytest
+from hsclient import HydroShare
+from pathlib import Path
+
+from hydroshare_on_jupyter.lib.filesystem.fs_map import RemoteFSMap
+from hydroshare_on_jupyter.lib.resource_strategies import (
+    HydroShareBagDownloadStrategy,
+    HydroShareFileDownloadStrategy,
+    HydroShareFolderDownloadStrategy,
+)
+from hydroshare_on_jupyter.lib.transfer.chunked_upload import ChunkedUploader
+from hydroshare_on_jupyter.session import session_registry
+
+FILES = {
+    "a.csv": bytes(range(256)) * 1024,
+    "dir/b.csv": b"b",
+    "dir/nested/c.txt": b"c",
+}
+
+
+@pytest.fixture
+def resource(server):
+    return server.add_resource(FILES, title="test")
+
+
+@pytest.fixture
+def hydroshare(server):
+    return HydroShare(**server.credentials, **server.host)
+
+
+def strategy(cls, hydroshare, resource, data_path):
+    strategy = cls(hydroshare.resource(resource.resource_id), str(data_path))
+    strategy.downloader.backoff = 0
+    strategy.downloader.poll_interval = 0.01
+    # bytes of a partially read chunk are lost when a connection drops
+    strategy.downloader.chunk_size = 16 * 1024
+    return strategy
+
+
+def contents(data_path: Path, resource_id: str) -> Path:
+    return data_path / resource_id / resource_id / "data" / "contents"
+
+
+def test_search_and_manifest(server, resource, hydroshare, data_path):
+    assert [r.resource_id for r in hydroshare.search(edit_permission=True)] == [
+        resource.resource_id
+    ]
+    # remote map only tracks resources that are local
+    (data_path / resource.resource_id).mkdir()
+    remote_map = RemoteFSMap.create_map(data_path, hydroshare)
+    assert {str(k): v for k, v in remote_map[resource.resource_id].items()} == (
+        resource.manifest()
+    )
+
+
+def test_invalid_credentials(server):
+    with pytest.raises(Exception, match="401"):
+        HydroShare(username="user", password="wrong", **server.host)
+
+
+def test_file_download_resumes_dropped_connections(
+    server, resource, hydroshare, data_path
+):
+    # every response is cut off halfway
+    server.drop_rate = 1.0
+    downloaded = strategy(
+        HydroShareFileDownloadStrategy, hydroshare, resource, data_path
+    ).download("a.csv")
+
+    file = contents(data_path, resource.resource_id) / "a.csv"
+    assert file.read_bytes() == FILES["a.csv"]
+    assert downloaded == {file: resource.manifest()["data/contents/a.csv"]}
+    assert server.requests["file"] > 1
+
+
+def test_folder_download(server, resource, hydroshare, data_path):
+    server.task_delay = 0.05
+    strategy(
+        HydroShareFolderDownloadStrategy, hydroshare, resource, data_path
+    ).download("dir")
+
+    folder = contents(data_path, resource.resource_id) / "dir"
+    assert (folder / "b.csv").read_bytes() == b"b"
+    assert (folder / "nested" / "c.txt").read_bytes() == b"c"
+    assert server.requests["task_status"] >= 1
+
+
+def test_bag_download(server, resource, hydroshare, data_path):
+    strategy(HydroShareBagDownloadStrategy, hydroshare, resource, data_path).download()
+
+    base_directory = data_path / resource.resource_id / resource.resource_id
+    assert (base_directory / "manifest-md5.txt").exists()
+    for path, data in FILES.items():
+        assert (base_directory / "data" / "contents" / path).read_bytes() == data
+
+
+def test_chunked_upload(server, resource, hydroshare, data_path):
+    root = contents(data_path, resource.resource_id)
+    (root / "new").mkdir(parents=True)
+    (root / "new" / "d.txt").write_text("d")
+    (root / "e.txt").write_text("e")
+
+    uploader = ChunkedUploader(
+        hydroshare.resource(resource.resource_id), data_path / "state", chunk_size=1
+    )
+    uploader.upload([root / "new", root / "e.txt"], root=root)
+
+    assert resource.files["new/d.txt"] == b"d"
+    assert resource.files["e.txt"] == b"e"
+    # archives are removed once unpacked
+    assert not any(path.endswith(".zip") for path in resource.files)
+    assert server.requests["unzip"] == 2
+
+
+def test_injected_errors(server, resource, hydroshare):
+    server.error_rate = 1.0
+    with pytest.raises(Exception, match="500"):
+        hydroshare.resource(resource.resource_id).system_metadata()
+
+
+@pytest.mark.gen_test
+async def test_login_with_configured_hydroshare_url(server, login, logout):
+    cookie = await login()
+    assert server.requests["user_info"] >= 1
+    assert len(session_registry) == 1
+
+    # logout, shutting down the sync session
+    await logout(cookie)
+    assert len(session_registry) == 0
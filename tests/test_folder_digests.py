@@ -0,0 +1,137 @@
+import random
+from pathlib import Path
+from types import SimpleNamespace
+
+from hydroshare_on_jupyter.lib.filesystem.aggregate_fs_resource_map_sync_state import (
+    AggregateFSResourceMapSyncState,
+)
+from hydroshare_on_jupyter.lib.filesystem.folder_digests import FolderDigestTree
+from hydroshare_on_jupyter.lib.filesystem.fs_resource_map import RemoteFSResourceMap
+
+
+def brute_force_diff(local, remote):
+    in_both = local.keys() & remote.keys()
+    out_of_sync = {path for path in in_both if local[path] != remote[path]}
+    return (
+        in_both - out_of_sync,
+        out_of_sync,
+        local.keys() - remote.keys(),
+        remote.keys() - local.keys(),
+    )
+
+
+def resource_map(data):
+    resource_map = RemoteFSResourceMap(SimpleNamespace(resource_id="resource"))
+    resource_map.data = dict(data)
+    return resource_map
+
+
+FILES = {
+    Path("data/contents/a.txt"): "1",
+    Path("data/contents/x/b.txt"): "2",
+    Path("data/contents/x/y/c.txt"): "3",
+    Path("data/contents/z/d.txt"): "4",
+}
+
+
+def test_digest_depends_on_names_and_contents():
+    tree = FolderDigestTree(FILES)
+    assert tree.digest == FolderDigestTree(dict(reversed(FILES.items()))).digest
+
+    renamed = {**FILES, Path("data/contents/x/B.txt"): "2"}
+    del renamed[Path("data/contents/x/b.txt")]
+    assert tree.digest != FolderDigestTree(renamed).digest
+    assert (
+        tree.digest
+        != FolderDigestTree({**FILES, Path("data/contents/a.txt"): "9"}).digest
+    )
+    # a file and a folder of the same name differ
+    assert (
+        FolderDigestTree({Path("a"): "1"}).digest
+        != FolderDigestTree({Path("a/b"): "1"}).digest
+    )
+
+
+def test_set_and_remove():
+    tree = FolderDigestTree(FILES)
+    digest = tree.digest
+    tree.set(Path("data/contents/x/y/new.txt"), "5")
+    assert tree.digest != digest
+    tree.set(Path("data/contents/x/y/new.txt"), None)
+    assert tree.digest == digest
+
+    # empty folders are pruned, so a removed subtree does not change its parent's digest
+    tree.set(Path("data/contents/new/folder/file.txt"), "5")
+    tree.set(Path("data/contents/new/folder/file.txt"), None)
+    assert tree.digest == digest
+    # removing a missing file is a no-op
+    tree.set(Path("data/contents/missing/file.txt"), None)
+    assert tree.digest == digest
+
+
+def test_diff_descends_into_changed_folders_only():
+    local = FolderDigestTree(FILES)
+    remote = FolderDigestTree(FILES)
+    assert local.diff(remote) == (set(FILES), set(), set(), set())
+    assert local.diff(local) == (set(FILES), set(), set(), set())
+
+    remote.set(Path("data/contents/x/y/c.txt"), "changed")
+    remote.set(Path("data/contents/z/e.txt"), "5")
+    local.set(Path("data/contents/x/new/f.txt"), "6")
+    assert local.diff(remote) == (
+        {
+            Path("data/contents/a.txt"),
+            Path("data/contents/x/b.txt"),
+            Path("data/contents/z/d.txt"),
+        },
+        {Path("data/contents/x/y/c.txt")},
+        {Path("data/contents/x/new/f.txt")},
+        {Path("data/contents/z/e.txt")},
+    )
+    # the digests of unchanged folders are not re-computed
+    unchanged = local._root.folders["data"].folders["contents"].folders["z"]
+    assert unchanged.digest is not None
+
+
+def test_diff_matches_brute_force():
+    rng = random.Random(0)
+    folders = ["", "a", "a/b", "a/b/c", "d", "d/e"]
+    paths = [
+        Path("data/contents") / folder / f"{i}.txt"
+        for folder in folders
+        for i in range(5)
+    ]
+    local = resource_map({path: "0" for path in paths})
+    remote = resource_map(local.data)
+    local_tree, remote_tree = local.folder_digests, remote.folder_digests
+
+    for _ in range(200):
+        target = rng.choice([local, remote])
+        path = rng.choice(paths)
+        if rng.random() < 0.3 and path in target:
+            del target[path]
+        else:
+            target[path] = rng.choice("012")
+        assert local_tree.diff(remote_tree) == brute_force_diff(local.data, remote.data)
+
+    # map data replaced, i.e. remote checksums re-fetched
+    remote.data = {path: "0" for path in rng.sample(paths, 10)}
+    assert local_tree.diff(remote_tree) == brute_force_diff(local.data, remote.data)
+
+
+def test_from_resource_maps_uses_folder_digests():
+    local = resource_map(FILES)
+    remote = resource_map({**FILES, Path("data/contents/x/b.txt"): "changed"})
+    state = AggregateFSResourceMapSyncState.from_resource_maps(
+        local_resource_map=local, remote_resource_map=remote
+    )
+    assert state.out_of_sync == {Path("data/contents/x/b.txt")}
+    assert len(state.in_sync) == 3
+
+    # folder digests are maintained as the maps change
+    assert local._folder_digests is not None
+    remote[Path("data/contents/x/b.txt")] = "2"
+    state = AggregateFSResourceMapSyncState.from_resource_maps(
+        local_resource_map=local, remote_resource_map=remote
+    )
+    assert state.in_sync == set(FILES)
@@ -0,0 +1,97 @@
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from watchdog.events import FileCreatedEvent, FileModifiedEvent, FileMovedEvent
+
+from hydroshare_on_jupyter.fs_event_handler import (
+    FSEventRouter,
+    fs_event_handler_factory,
+)
+from hydroshare_on_jupyter.fs_events import Events
+from hydroshare_on_jupyter.lib.events.event_broker import EventBroker
+from hydroshare_on_jupyter.lib.filesystem.fs_map import LocalFSMap
+
+RESOURCE_IDS = ["a" * 32, "b" * 32]
+
+
+def contents(fs_root: Path, resource_id: str) -> Path:
+    return fs_root / resource_id / resource_id / "data" / "contents"
+
+
+@pytest.fixture
+def fs_root():
+    with TemporaryDirectory() as temp:
+        fs_root = Path(temp).resolve()
+        for resource_id in RESOURCE_IDS:
+            contents(fs_root, resource_id).mkdir(parents=True)
+            (contents(fs_root, resource_id) / "file").write_text(resource_id)
+        yield fs_root
+
+
+@pytest.fixture
+def router(fs_root):
+    local_map = LocalFSMap(fs_root)
+    # only the first resource is tracked
+    local_map.add_resource(RESOURCE_IDS[0])
+
+    event_broker = EventBroker(Events)
+    statuses = []
+    event_broker.subscribe(Events.STATUS, statuses.append)
+
+    router = FSEventRouter(
+        fs_root, local_map.get, fs_event_handler_factory(event_broker)
+    )
+    router.statuses = statuses
+    router.local_map = local_map
+    return router
+
+
+def test_resource_id(router, fs_root):
+    a = RESOURCE_IDS[0]
+    assert router.resource_id(str(contents(fs_root, a) / "dir" / "file")) == a
+    # outside of resource contents
+    assert router.resource_id(str(fs_root / a / a / "manifest-md5.txt")) is None
+    assert router.resource_id(str(fs_root / a / "file")) is None
+    assert router.resource_id(str(fs_root.parent / "file")) is None
+
+
+def test_routes_events_to_tracked_resources(router, fs_root):
+    a, b = RESOURCE_IDS
+    new_file = contents(fs_root, a) / "new"
+    new_file.write_text("new")
+    router.dispatch(FileCreatedEvent(str(new_file)))
+    # untracked resource
+    router.dispatch(FileModifiedEvent(str(contents(fs_root, b) / "file")))
+    # not in contents directory
+    router.dispatch(FileModifiedEvent(str(fs_root / a / a / "manifest-md5.txt")))
+
+    assert router.statuses == [a]
+    assert Path("data/contents/new") in router.local_map[a]
+    # handlers are created lazily
+    assert list(router._handlers) == [a]
+
+
+def test_move_between_resources(router, fs_root):
+    a, b = RESOURCE_IDS
+    router.local_map.add_resource(b)
+
+    src = contents(fs_root, a) / "file"
+    dest = contents(fs_root, b) / "moved"
+    src.rename(dest)
+    router.dispatch(FileMovedEvent(str(src), str(dest)))
+
+    assert router.statuses == [a, b]
+    assert Path("data/contents/file") not in router.local_map[a]
+    assert Path("data/contents/moved") in router.local_map[b]
+
+
+def test_ignored_files_do_not_emit_status(router, fs_root):
+    a = RESOURCE_IDS[0]
+    checkpoints = contents(fs_root, a) / ".ipynb_checkpoints"
+    checkpoints.mkdir()
+    checkpoint = checkpoints / "notebook-checkpoint.ipynb"
+    checkpoint.write_text("{}")
+    router.dispatch(FileCreatedEvent(str(checkpoint)))
+
+    assert router.statuses == []
+    assert router.local_map[a].files == [Path("data/contents/file")]
@@ -1,12 +1,15 @@
 from tempfile import TemporaryDirectory
 from pathlib import Path
+import os
 import random
 import string
 from hashlib import md5
 import pytest
 from typing import Tuple, NewType
 
+from hydroshare_on_jupyter.lib.filesystem import fs_resource_map
 from hydroshare_on_jupyter.lib.filesystem.fs_resource_map import LocalFSResourceMap
+from hydroshare_on_jupyter.lib.filesystem.utilities import read_manifest
 
 # type declarations
 ResourcePath = NewType("ResourcePath", Path)
@@ -135,3 +138,105 @@ def test_local_fs_resource_map_update_resource(resource_mock):
         files.pop(i)
 
     assert len(fsmap.files) == len(files)
+
+
+def test_local_fs_resource_map_seed_from_manifest(resource_mock):
+    rdir, data_dir = resource_mock
+
+    (data_dir / "in_manifest").write_text("some test data")
+    (data_dir / "not_in_manifest").write_text("other test data")
+    # bag manifest with incorrect (unverified) checksum of `in_manifest`
+    manifest = rdir / rdir.name / "manifest-md5.txt"
+    manifest.write_text(
+        f"{'0' * 32}  data/contents/in_manifest\n"
+        f"{'1' * 32}  data/contents/deleted_locally\n"
+    )
+    checksums = read_manifest(manifest)
+    assert len(checksums) == 2
+
+    fsmap = LocalFSResourceMap(rdir)
+    seeded = fsmap.seed_from_manifest(checksums)
+
+    in_manifest = Path("data/contents/in_manifest")
+    assert seeded == [in_manifest]
+    assert fsmap[in_manifest] == "0" * 32
+    assert (
+        fsmap[Path("data/contents/not_in_manifest")]
+        == md5(b"other test data").hexdigest()
+    )
+    assert Path("data/contents/deleted_locally") not in fsmap
+
+    # verification corrects seeded checksum
+    assert fsmap.verify_files(seeded) == [in_manifest]
+    assert fsmap[in_manifest] == md5(b"some test data").hexdigest()
+
+
+def test_local_fs_resource_map_update_after_seed_does_not_hash(
+    resource_mock, monkeypatch
+):
+    rdir, data_dir = resource_mock
+    (data_dir / "in_manifest").write_text("some test data")
+    digest = md5(b"some test data").hexdigest()
+    fsmap = LocalFSResourceMap(rdir)
+    fsmap.seed_from_manifest({Path("data/contents/in_manifest"): digest})
+
+    hashed = []
+    monkeypatch.setattr(
+        fs_resource_map, "compute_file_md5_hexdigest", lambda path: hashed.append(path)
+    )
+    fsmap.update_resource()
+    assert hashed == []
+    assert fsmap[Path("data/contents/in_manifest")] == digest
+    # seeded digests survive eviction
+    assert fsmap.digest_state()["data/contents/in_manifest"][2] == digest
+
+
+def test_local_fs_resource_map_reuses_digest_of_unchanged_file(
+    resource_mock, monkeypatch
+):
+    rdir, data_dir = resource_mock
+    test_file = data_dir / "test"
+    test_file.write_text("some test data")
+    # modified well before it is hashed
+    os.utime(test_file, (0, 0))
+
+    fsmap = LocalFSResourceMap.from_resource_path(rdir)
+
+    hashed = []
+    compute_md5 = fs_resource_map.compute_file_md5_hexdigest
+
+    def spy(path):
+        hashed.append(path)
+        return compute_md5(path)
+
+    monkeypatch.setattr(fs_resource_map, "compute_file_md5_hexdigest", spy)
+
+    fsmap.update_file(test_file)
+    assert hashed == []
+
+    # recently modified files are re-hashed
+    test_file.write_text("other test data")
+    fsmap.update_file(test_file)
+    fsmap.update_file(test_file)
+    assert hashed == [test_file, test_file]
+    assert fsmap[Path("data/contents/test")] == md5(b"other test data").hexdigest()
+
+
+def test_local_fs_resource_map_ignores_files(resource_mock):
+    rdir, data_dir = resource_mock
+    (data_dir / ".ipynb_checkpoints").mkdir()
+    (data_dir / ".ipynb_checkpoints" / "test-checkpoint.ipynb").write_text("{}")
+    (data_dir / "scratch.tmp").write_text("scratch")
+
+    fsmap = LocalFSResourceMap.from_resource_path(rdir)
+    assert fsmap.files == [Path("data/contents/scratch.tmp")]
+
+    # adding an ignore file re-applies ignore patterns
+    ignore_file = data_dir / ".hsignore"
+    ignore_file.write_text("*.tmp\n")
+    fsmap.add_file(ignore_file)
+    assert fsmap.files == [Path("data/contents/.hsignore")]
+
+    (data_dir / "other.tmp").write_text("scratch")
+    fsmap.add_file(data_dir / "other.tmp")
+    assert Path("data/contents/other.tmp") not in fsmap
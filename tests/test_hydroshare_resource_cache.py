@@ -0,0 +1,91 @@
+from hydroshare_on_jupyter import hydroshare_resource_cache
+from hydroshare_on_jupyter.hydroshare_resource_cache import (
+    HydroShareWithResourceCache,
+)
+from hydroshare_on_jupyter.lib.cache import LRUCacheWithTTL
+
+
+def test_lru_cache_evicts_least_recently_used(timer):
+    cache = LRUCacheWithTTL(maxsize=2, ttl=10, timer=timer)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    # "a" becomes most recently used
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_entries_expire(timer):
+    cache = LRUCacheWithTTL(maxsize=2, ttl=10, timer=timer)
+    cache.put("a", 1)
+    timer.now = 9.9
+    assert cache.get("a") == 1
+    timer.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_cache_info(timer):
+    cache = LRUCacheWithTTL(maxsize=4, ttl=10, timer=timer)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    cache.invalidate("a")
+    cache.get("a")
+
+    info = cache.cache_info()
+    assert info.hits == 2
+    assert info.misses == 2
+    assert info.maxsize == 4
+    assert info.currsize == 0
+
+
+def my_user_info_mock(*args, **kwargs):
+    return {"id": 42, "username": "test"}
+
+
+def test_hydroshare_with_resource_cache(monkeypatch):
+    monkeypatch.setattr(HydroShareWithResourceCache, "my_user_info", my_user_info_mock)
+    hs = HydroShareWithResourceCache(username="test", password="test", cache_maxsize=1)
+    res_id = "a" * 32
+
+    res = hs.resource(res_id, validate=False)
+    assert hs.resource(res_id, validate=False) is res
+    assert hs.cache_info().hits == 1
+
+    hs.invalidate_resource(res_id)
+    assert hs.resource(res_id, validate=False) is not res
+
+    # bounded
+    hs.resource("b" * 32, validate=False)
+    assert hs.cache_info().currsize == 1
+
+
+def test_hydroshare_with_resource_cache_validates_unvalidated_entries(monkeypatch):
+    validated = []
+
+    class FakeResource:
+        def __init__(self, map_path, hs_session):
+            self.map_path = map_path
+
+        @property
+        def metadata(self):
+            validated.append(self.map_path)
+
+    monkeypatch.setattr(HydroShareWithResourceCache, "my_user_info", my_user_info_mock)
+    monkeypatch.setattr(hydroshare_resource_cache, "Resource", FakeResource)
+    hs = HydroShareWithResourceCache(username="test", password="test")
+    res_id = "a" * 32
+
+    res = hs.resource(res_id, validate=False)
+    assert validated == []
+    # cached without validation, validated once for validating callers
+    assert hs.resource(res_id) is res
+    assert hs.resource(res_id) is res
+    assert hs.resource(res_id, validate=False) is res
+    assert len(validated) == 1
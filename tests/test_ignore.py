@@ -0,0 +1,59 @@
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from hydroshare_on_jupyter.lib.filesystem.ignore import IGNORE_FILENAME, IgnoreMatcher
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("notebook.ipynb", False),
+        (".ipynb_checkpoints/notebook-checkpoint.ipynb", True),
+        ("dir/.ipynb_checkpoints/notebook-checkpoint.ipynb", True),
+        ("dir/__pycache__/module.cpython-39.pyc", True),
+        ("module.pyc", True),
+        ("module.py", False),
+        (".notes.txt.swp", True),
+        ("notes.txt~", True),
+        ("data.csv.part", True),
+        ("dir/.DS_Store", True),
+        # directory pattern does not match a file of the same name
+        ("__pycache__", False),
+    ],
+)
+def test_default_patterns(path, expected):
+    assert IgnoreMatcher().matches(path) == expected
+
+
+def test_anchored_and_globstar_patterns():
+    matcher = IgnoreMatcher(["/build", "docs/**/*.html", "scratch/"])
+    assert matcher.matches("build/out.txt")
+    assert not matcher.matches("src/build/out.txt")
+    assert matcher.matches("docs/index.html")
+    assert matcher.matches("docs/api/v1/index.html")
+    assert not matcher.matches("index.html")
+    assert matcher.matches("a/scratch/file")
+    assert matcher.matches("scratch", is_dir=True)
+
+
+def test_negation():
+    matcher = IgnoreMatcher(["*.log", "!keep.log", "# comment", ""])
+    assert matcher.matches("debug.log")
+    assert not matcher.matches("keep.log")
+    assert not matcher.matches("dir/keep.log")
+    # files in ignored directories cannot be re-included
+    matcher = IgnoreMatcher(["logs/", "!logs/keep.log"])
+    assert matcher.matches("logs/keep.log")
+
+
+def test_from_file():
+    with TemporaryDirectory() as temp:
+        ignore_file = Path(temp) / IGNORE_FILENAME
+        assert not IgnoreMatcher.from_file(ignore_file)
+
+        ignore_file.write_text("*.tmp\n!*.pyc\n")
+        matcher = IgnoreMatcher.from_file(ignore_file, ["*.pyc"])
+        assert matcher.matches("file.tmp")
+        # patterns in file take precedence
+        assert not matcher.matches("module.pyc")
@@ -0,0 +1,114 @@
+from hashlib import md5
+import os
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from hydroshare_on_jupyter.lib.filesystem import snapshot as snapshot_module
+from hydroshare_on_jupyter.lib.filesystem.fs_map import LocalFSMap
+from hydroshare_on_jupyter.lib.filesystem.snapshot import IncrementalSnapshot
+from hydroshare_on_jupyter.local_resource_poller import LocalResourcePoller
+
+RESOURCE_ID = "a" * 32
+
+
+@pytest.fixture
+def contents_path():
+    with TemporaryDirectory() as temp:
+        contents = (
+            Path(temp).resolve() / RESOURCE_ID / RESOURCE_ID / "data" / "contents"
+        )
+        (contents / "dir").mkdir(parents=True)
+        for name in ["a", "b", "dir/c"]:
+            (contents / name).write_text(name)
+        yield contents
+
+
+def touch(path: Path, content: str, mtime_ns: int) -> None:
+    path.write_text(content)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_snapshot_detects_changes(contents_path):
+    snapshot = IncrementalSnapshot(contents_path)
+    assert sorted(snapshot.update().created) == [
+        contents_path / "a",
+        contents_path / "b",
+        contents_path / "dir/c",
+    ]
+
+    touch(contents_path / "a", "modified", 1)
+    (contents_path / "b").unlink()
+    (contents_path / "dir" / "new").write_text("new")
+    changes = snapshot.update()
+
+    assert changes.created == [contents_path / "dir/new"]
+    assert changes.modified == [contents_path / "a"]
+    assert changes.deleted == [contents_path / "b"]
+    assert not snapshot.update()
+
+
+def test_snapshot_skips_unchanged_directories(contents_path, monkeypatch):
+    snapshot = IncrementalSnapshot(contents_path)
+    snapshot.update()
+
+    listed = []
+    scandir = os.scandir
+
+    def spy(path):
+        listed.append(Path(path))
+        return scandir(path)
+
+    monkeypatch.setattr(snapshot_module.os, "scandir", spy)
+
+    snapshot.update()
+    assert listed == []
+
+    (contents_path / "dir" / "new").write_text("new")
+    snapshot.update()
+    assert listed == [contents_path / "dir"]
+
+
+def test_snapshot_budget_checks_files_round_robin(contents_path):
+    snapshot = IncrementalSnapshot(contents_path)
+    snapshot.update()
+
+    # in-place modifications do not change directory mtimes
+    for name in ["a", "b", "dir/c"]:
+        touch(contents_path / name, "modified", 1)
+
+    modified = []
+    for _ in range(3):
+        changes = snapshot.update(budget=1)
+        assert len(changes.modified) == 1
+        modified.extend(changes.modified)
+    assert len(set(modified)) == 3
+    assert not snapshot.update()
+
+
+def test_poller_feeds_local_map(contents_path):
+    fs_root = contents_path.parents[3]
+    local_map = LocalFSMap(fs_root)
+    local_map.add_resource(RESOURCE_ID)
+    changed = []
+    poller = LocalResourcePoller(local_map, changed.append)
+
+    # baseline
+    assert poller.poll() == []
+
+    (contents_path / "new").write_text("new")
+    (contents_path / ".ipynb_checkpoints").mkdir()
+    (contents_path / ".ipynb_checkpoints" / "a-checkpoint").write_text("a")
+    touch(contents_path / "dir" / "c", "modified", 1)
+
+    assert poller.poll() == [RESOURCE_ID]
+    assert changed == [RESOURCE_ID]
+    resource_map = local_map[RESOURCE_ID]
+    assert sorted(resource_map.files) == [
+        Path("data/contents/a"),
+        Path("data/contents/b"),
+        Path("data/contents/dir/c"),
+        Path("data/contents/new"),
+    ]
+    assert resource_map[Path("data/contents/dir/c")] == md5(b"modified").hexdigest()
+    assert poller.poll() == []
@@ -0,0 +1,192 @@
+import json
+import sys
+import threading
+import tracemalloc
+from tornado.httpclient import HTTPRequest
+import pytest
+
+from hydroshare_on_jupyter.lib.profiling import (
+    SamplingProfiler,
+    deep_sizeof,
+    memory_by_module,
+)
+
+
+def busy_wait(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(100))
+
+
+def test_sampling_profiler_collapsed_stacks():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_wait, args=(stop,), name="busy;thread")
+    thread.start()
+    try:
+        profiler = SamplingProfiler(sample_rate=1000).run(0.1)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert profiler.n_samples > 0
+    lines = profiler.collapsed().splitlines()
+    busy = [line for line in lines if "busy_wait (test_profiling.py:" in line]
+    assert busy
+    stack, count = busy[0].rsplit(" ", 1)
+    assert int(count) > 0
+    # rooted at the thread's name, outermost frame first
+    assert stack.startswith("busy;thread;")
+    assert stack.index("Thread.run") < stack.index("busy_wait")
+    # the profiling thread is not sampled
+    assert not any("SamplingProfiler.run" in line for line in lines)
+
+
+def test_deep_sizeof():
+    shared = "x" * 1000
+    assert deep_sizeof([shared, shared]) == deep_sizeof([shared]) + 8
+    assert deep_sizeof({"a": shared}) > sys.getsizeof(shared)
+    # modules are not counted
+    assert deep_sizeof([json]) == sys.getsizeof([json])
+
+
+def test_memory_by_module():
+    tracemalloc.start()
+    try:
+        retained = [str(i) * 10 for i in range(10000)]
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    modules = memory_by_module(snapshot, limit=3)
+    assert len(modules) <= 3
+    assert modules == sorted(modules, key=lambda m: m.size, reverse=True)
+    assert __name__ in [m.module for m in modules]
+    del retained
+
+
+@pytest.fixture
+def resources(server, data_path):
+    resource = server.add_resource({"a.csv": b"a"})
+    contents = data_path / resource.resource_id / resource.resource_id
+    (contents / "data" / "contents").mkdir(parents=True)
+    (contents / "data" / "contents" / "a.csv").write_bytes(b"a")
+    return [resource]
+
+
+@pytest.fixture
+def debug_endpoints():
+    return True
+
+
+@pytest.fixture
+def app_settings(debug_endpoints):
+    return {"debug_endpoints": debug_endpoints}
+
+
+@pytest.mark.gen_test
+@pytest.mark.parametrize("debug_endpoints", [False])
+async def test_debug_endpoints_disabled(
+    debug_endpoints, login, logout, http_client, base_url
+):
+    cookie = await login()
+    response = await http_client.fetch(
+        HTTPRequest(base_url + "/syncApi/debug/memory", headers=cookie),
+        raise_error=False,
+    )
+    assert response.code == 404
+    await logout(cookie)
+
+
+@pytest.mark.gen_test
+async def test_debug_endpoints_require_login(http_client, base_url):
+    response = await http_client.fetch(
+        base_url + "/syncApi/debug/profile?seconds=0.1",
+        raise_error=False,
+        follow_redirects=False,
+    )
+    assert response.code == 302
+
+
+@pytest.mark.gen_test
+async def test_profile(login, logout, http_client, base_url):
+    cookie = await login()
+    response = await http_client.fetch(
+        HTTPRequest(
+            base_url + "/syncApi/debug/profile?seconds=0.2&rate=200", headers=cookie
+        )
+    )
+    assert response.headers["Content-Type"].startswith("text/plain")
+    stacks = response.body.decode().splitlines()
+    # the IOLoop's thread is sampled while the profile runs
+    assert any(line.startswith("MainThread;") for line in stacks)
+
+    response = await http_client.fetch(
+        HTTPRequest(base_url + "/syncApi/debug/profile?seconds=0", headers=cookie),
+        raise_error=False,
+    )
+    assert response.code == 400
+    await logout(cookie)
+
+
+@pytest.mark.gen_test
+async def test_memory(server, login, logout, http_client, base_url):
+    cookie = await login()
+    # resources are added to the sync session when they are listed
+    (resource_id,) = server.resources
+    await http_client.fetch(
+        HTTPRequest(base_url + f"/syncApi/resources/{resource_id}", headers=cookie)
+    )
+    response = await http_client.fetch(
+        HTTPRequest(base_url + "/syncApi/debug/memory", headers=cookie)
+    )
+    report = json.loads(response.body)
+    assert report["tracing"] is False
+    assert report["modules"] == []
+    (resource_map,) = report["resource_maps"]
+    assert resource_map["resource_id"] == resource_id
+    assert resource_map["local_files"] == resource_map["remote_files"] == 1
+    assert resource_map["local_size"] > 0 and resource_map["remote_size"] > 0
+
+    try:
+        response = await http_client.fetch(
+            HTTPRequest(
+                base_url + "/syncApi/debug/memory?trace=true&limit=5", headers=cookie
+            )
+        )
+        report = json.loads(response.body)
+        assert report["tracing"] is True
+        assert 0 < len(report["modules"]) <= 5
+        assert report["traced_size"] > 0
+    finally:
+        response = await http_client.fetch(
+            HTTPRequest(base_url + "/syncApi/debug/memory?trace=false", headers=cookie)
+        )
+    assert json.loads(response.body)["tracing"] is False
+    assert not tracemalloc.is_tracing()
+    await logout(cookie)
+
+
+@pytest.mark.gen_test
+async def test_memory_reports_resource_cache(
+    server, login, logout, http_client, base_url
+):
+    cookie = await login()
+    (resource_id,) = server.resources
+    url = base_url + f"/syncApi/resources/{resource_id}"
+
+    async def resource_cache():
+        response = await http_client.fetch(
+            HTTPRequest(base_url + "/syncApi/debug/memory", headers=cookie)
+        )
+        return json.loads(response.body)["resource_cache"]
+
+    await http_client.fetch(HTTPRequest(url, headers=cookie))
+    listed = await resource_cache()
+    assert listed["misses"] >= 1 and listed["currsize"] == 1
+
+    # the resource object fetched when listing is reused by the download
+    response = await http_client.fetch(HTTPRequest(url + "/download", headers=cookie))
+    assert response.code == 201
+    downloaded = await resource_cache()
+    assert downloaded["hits"] == listed["hits"] + 1
+    assert downloaded["misses"] == listed["misses"]
+    await logout(cookie)
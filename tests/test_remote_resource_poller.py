@@ -0,0 +1,99 @@
+from hydroshare_on_jupyter.remote_resource_poller import RemoteResourcePoller
+
+
+class FakeHydroShare:
+    """Records fetches of resource `date_last_updated`."""
+
+    def __init__(self, dates):
+        self.dates = dates
+        self.fetched_one = []
+        self.fetched_all = 0
+
+    def fetch_one(self, resource_id):
+        self.fetched_one.append(resource_id)
+        return self.dates[resource_id]
+
+    def fetch_all(self):
+        self.fetched_all += 1
+        return dict(self.dates)
+
+
+def create_poller(hs, timer, tracked, changed, **kwargs):
+    return RemoteResourcePoller(
+        lambda: tracked,
+        fetch_one=hs.fetch_one,
+        fetch_all=hs.fetch_all,
+        on_change=changed.append,
+        min_interval=10,
+        max_interval=80,
+        timer=timer,
+        **kwargs,
+    )
+
+
+def test_poller_reports_only_changed_resources(timer):
+    hs = FakeHydroShare({"a": "2021-01-01T00:00:00Z", "b": "2021-01-01T00:00:00Z"})
+    changed = []
+    poller = create_poller(hs, timer, ["a", "b"], changed)
+
+    # first poll establishes baseline
+    assert poller.poll() == 10
+    assert changed == []
+
+    hs.dates["a"] = "2021-01-02T00:00:00Z"
+    timer.now = 10
+    poller.poll()
+    assert changed == ["a"]
+
+
+def test_poller_backs_off_idle_resources(timer):
+    hs = FakeHydroShare({"a": "1", "b": "1"})
+    changed = []
+    poller = create_poller(hs, timer, ["a", "b"], changed)
+
+    delays = []
+    for _ in range(5):
+        delay = poller.poll()
+        delays.append(delay)
+        timer.now += delay
+    # interval doubles up to max_interval
+    assert delays == [10, 20, 40, 80, 80]
+
+    # activity resets interval
+    hs.dates["b"] = "2"
+    timer.now += 80
+    poller.poll()
+    assert changed == ["b"]
+    assert poller.poll() == 10
+
+
+def test_poller_batches_when_many_resources_are_due(timer):
+    tracked = [str(i) for i in range(10)]
+    hs = FakeHydroShare({r: "1" for r in tracked})
+    poller = create_poller(hs, timer, tracked, [], batch_threshold=4)
+
+    poller.poll()
+    timer.now = 10
+    poller.poll()
+    assert hs.fetched_all == 2
+    assert hs.fetched_one == []
+
+    # single due resource is polled individually
+    poller.mark_active("3")
+    timer.now = 20
+    poller.poll()
+    assert hs.fetched_one == ["3"]
+
+
+def test_poller_mark_active_is_not_a_change(timer):
+    hs = FakeHydroShare({"a": "1"})
+    changed = []
+    poller = create_poller(hs, timer, ["a"], changed)
+    poller.poll()
+
+    # i.e. this extension uploaded to the resource
+    hs.dates["a"] = "2"
+    poller.mark_active("a")
+    timer.now = 10
+    poller.poll()
+    assert changed == []
@@ -0,0 +1,98 @@
+import pytest
+
+from hydroshare_on_jupyter.lib.filesystem.resource_directory_index import (
+    InvalidCursorError,
+    ResourceDirectoryIndex,
+    ResourceDirectoryIndexCache,
+)
+
+CHECKSUMS = {
+    "data/contents/a.txt": "0",
+    "data/contents/b.txt": "0",
+    "data/contents/dir/c.txt": "0",
+    "data/contents/dir/sub/d.txt": "0",
+    "data/contents/dir/sub/e.txt": "0",
+    "data/contents/empty_named/f.txt": "0",
+    # not in data/contents, excluded
+    "data/resourcemap.xml": "0",
+}
+
+
+@pytest.fixture
+def index() -> ResourceDirectoryIndex:
+    return ResourceDirectoryIndex.from_checksums(CHECKSUMS)
+
+
+def test_file_counts(index: ResourceDirectoryIndex):
+    assert len(index) == 6
+    assert index.file_count() == 6
+    assert index.file_count("dir") == 3
+    assert index.file_count("dir/sub/") == 2
+    assert index.is_folder("dir/sub")
+    assert not index.is_folder("a.txt")
+
+
+def test_list_files_paginated(index: ResourceDirectoryIndex):
+    files, cursor = index.list_files(limit=4)
+    assert files == [
+        "data/contents/a.txt",
+        "data/contents/b.txt",
+        "data/contents/dir/c.txt",
+        "data/contents/dir/sub/d.txt",
+    ]
+    files, cursor = index.list_files(cursor=cursor, limit=4)
+    assert files == [
+        "data/contents/dir/sub/e.txt",
+        "data/contents/empty_named/f.txt",
+    ]
+    assert cursor is None
+
+
+def test_list_files_prefix(index: ResourceDirectoryIndex):
+    files, cursor = index.list_files(prefix="dir/sub/", limit=1)
+    assert files == ["data/contents/dir/sub/d.txt"]
+    files, cursor = index.list_files(prefix="dir/sub/", cursor=cursor, limit=1)
+    assert files == ["data/contents/dir/sub/e.txt"]
+    assert cursor is None
+    assert index.count_files("dir/") == 3
+
+
+def test_list_folder_folders_before_files(index: ResourceDirectoryIndex):
+    entries, cursor = index.list_folder()
+    assert cursor is None
+    assert [(e.name, e.is_folder, e.file_count) for e in entries] == [
+        ("dir", True, 3),
+        ("empty_named", True, 1),
+        ("a.txt", False, None),
+        ("b.txt", False, None),
+    ]
+    assert entries[0].path == "data/contents/dir"
+
+
+def test_list_folder_paginated(index: ResourceDirectoryIndex):
+    names, cursor = [], None
+    while True:
+        entries, cursor = index.list_folder(cursor=cursor, limit=1)
+        names.extend(e.name for e in entries)
+        if cursor is None:
+            break
+    assert names == ["dir", "empty_named", "a.txt", "b.txt"]
+
+    entries, _ = index.list_folder("dir", prefix="s")
+    assert [e.path for e in entries] == ["data/contents/dir/sub"]
+
+
+def test_invalid_cursor(index: ResourceDirectoryIndex):
+    with pytest.raises(InvalidCursorError):
+        index.list_files(cursor="not a cursor")
+    with pytest.raises(InvalidCursorError):
+        index.list_folder(cursor="not a cursor")
+
+
+def test_index_cache_rebuilds_on_new_checksums():
+    cache = ResourceDirectoryIndexCache(maxsize=2)
+    index = cache.get("a", CHECKSUMS)
+    assert cache.get("a", CHECKSUMS) is index
+
+    # re-fetched manifest, same contents, different object
+    assert cache.get("a", dict(CHECKSUMS)) is not index
@@ -0,0 +1,94 @@
+import os
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from hydroshare_on_jupyter.lib.filesystem import (
+    fs_resource_map as fs_resource_map_module,
+)
+from hydroshare_on_jupyter.lib.filesystem.fs_map import LocalFSMap
+from hydroshare_on_jupyter.resource_eviction import ResourceEvictionScheduler
+
+RESOURCE_IDS = ["a" * 32, "b" * 32, "c" * 32]
+
+
+@pytest.fixture
+def scheduler(timer):
+    tracked = set(RESOURCE_IDS)
+    evicted = []
+
+    def on_evict(resource_id):
+        tracked.discard(resource_id)
+        evicted.append(resource_id)
+
+    scheduler = ResourceEvictionScheduler(
+        tracked=lambda: tracked, on_evict=on_evict, timer=timer
+    )
+    scheduler.tracked = tracked
+    scheduler.evicted = evicted
+    scheduler.timer = timer
+    return scheduler
+
+
+def test_evicts_idle_resources(scheduler):
+    scheduler.idle_timeout = 10
+    a, b, c = RESOURCE_IDS
+    # first seen
+    assert scheduler.evict() == []
+
+    scheduler.timer.now = 5
+    scheduler.touch(a, manifest=None)
+    scheduler.timer.now = 10
+    assert sorted(scheduler.evict()) == [b, c]
+
+    scheduler.timer.now = 15
+    assert scheduler.evict() == [a]
+    assert scheduler.tracked == set()
+
+
+def test_evicts_least_recently_used_over_budget(scheduler):
+    scheduler.max_resources = 2
+    a, b, c = RESOURCE_IDS
+    for resource_id in [c, a, b]:
+        scheduler.timer.now += 1
+        scheduler.touch(resource_id)
+
+    assert scheduler.evict() == [c]
+    assert scheduler.evict() == []
+
+
+def test_evicted_resource_is_rehydrated_without_rehashing(monkeypatch):
+    resource_id = RESOURCE_IDS[0]
+    with TemporaryDirectory() as temp:
+        fs_root = Path(temp).resolve()
+        contents = fs_root / resource_id / resource_id / "data" / "contents"
+        contents.mkdir(parents=True)
+        for name in ["unchanged", "modified"]:
+            (contents / name).write_text(name)
+            # outside of racy window
+            os.utime(contents / name, (0, 0))
+
+        local_map = LocalFSMap(fs_root, state_path=fs_root / "evicted")
+        local_map.add_resource(resource_id)
+        before = dict(local_map[resource_id])
+
+        local_map.evict_resource(resource_id)
+        assert resource_id not in local_map
+        assert (fs_root / "evicted" / f"{resource_id}.json").is_file()
+
+        (contents / "modified").write_text("changed")
+        hashed = []
+        compute = fs_resource_map_module.compute_file_md5_hexdigest
+
+        def spy(path):
+            hashed.append(Path(path).name)
+            return compute(path)
+
+        monkeypatch.setattr(fs_resource_map_module, "compute_file_md5_hexdigest", spy)
+
+        local_map.add_resource(resource_id)
+        assert hashed == ["modified"]
+        unchanged = Path("data/contents/unchanged")
+        assert local_map[resource_id][unchanged] == before[unchanged]
+        # persisted state is consumed
+        assert not (fs_root / "evicted" / f"{resource_id}.json").exists()
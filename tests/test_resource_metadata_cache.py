@@ -0,0 +1,104 @@
+import pytest
+import threading
+from hydroshare_on_jupyter.models.api_models import ResourceListQuery, ResourceMetadata
+from hydroshare_on_jupyter.resource_metadata_cache import (
+    ResourceMetadataCache,
+    query_resources,
+)
+
+
+def create_resource_metadata(title: str, resource_type: str = "CompositeResource"):
+    return ResourceMetadata(
+        resource_type=resource_type,
+        resource_title=title,
+        resource_id=title,
+        immutable=False,
+        resource_url="www.fake.org",
+        date_created="2021-01-01",
+        date_last_updated=f"2021-01-0{len(title)}",
+        creator="some creator",
+        authors=["some author"],
+    )
+
+
+@pytest.fixture
+def resources():
+    return [
+        create_resource_metadata("bb"),
+        create_resource_metadata("a", resource_type="ToolResource"),
+        create_resource_metadata("ccc"),
+    ]
+
+
+class CountingFetch:
+    def __init__(self, resources):
+        self.resources = resources
+        self.calls = 0
+        # set to block fetch until released
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self):
+        self.release.wait()
+        self.calls += 1
+        return list(self.resources)
+
+
+def test_cache_fetches_once_while_fresh(resources):
+    fetch = CountingFetch(resources)
+    cache = ResourceMetadataCache(fetch, max_age=60)
+
+    assert cache.get().resources == resources
+    assert cache.get().resources == resources
+    assert fetch.calls == 1
+
+
+def test_cache_serves_stale_while_revalidating(resources):
+    fetch = CountingFetch(resources)
+    cache = ResourceMetadataCache(fetch, max_age=0)
+    first = cache.get()
+
+    # block background refresh. stale snapshot is still served immediately
+    fetch.release.clear()
+    fetch.resources = resources[:1]
+    assert cache.get() is first
+    assert cache.get() is first
+
+    fetch.release.set()
+    refreshed = cache.refresh_in_background().result()
+    assert refreshed.resources == resources[:1]
+    assert fetch.calls == 2
+    cache.shutdown()
+
+
+def test_cache_explicit_refresh(resources):
+    fetch = CountingFetch(resources)
+    cache = ResourceMetadataCache(fetch, max_age=60)
+    cache.get()
+    fetch.resources = resources[:1]
+
+    assert cache.get(refresh=True).resources == resources[:1]
+    assert fetch.calls == 2
+
+
+def test_query_resources(resources):
+    total, page = query_resources(resources, ResourceListQuery(sort="resource_title"))
+    assert total == 3
+    assert [r.resource_title for r in page] == ["a", "bb", "ccc"]
+
+    query = ResourceListQuery(sort="-date_last_updated", page=2, page_size=2)
+    total, page = query_resources(resources, query)
+    assert total == 3
+    assert [r.resource_title for r in page] == ["a"]
+
+    total, page = query_resources(resources, ResourceListQuery(q="B"))
+    assert total == 1
+    assert page[0].resource_title == "bb"
+
+    query = ResourceListQuery(resource_type="CompositeResource")
+    assert query_resources(resources, query)[0] == 2
+
+
+def test_query_invalid_sort_field():
+    with pytest.raises(ValueError):
+        ResourceListQuery(sort="not_a_field")
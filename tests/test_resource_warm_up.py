@@ -0,0 +1,74 @@
+import os
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from hydroshare_on_jupyter.lib.filesystem.fs_map import LocalFSMap
+from hydroshare_on_jupyter.models.warm_up_status_enum import WarmUpStatusEnum
+from hydroshare_on_jupyter.resource_warm_up import ResourceWarmUpScheduler
+
+RESOURCE_IDS = ["a" * 32, "b" * 32, "c" * 32]
+
+
+@pytest.fixture
+def local_map():
+    with TemporaryDirectory() as temp:
+        fs_root = Path(temp)
+        for mtime, resource_id in enumerate(RESOURCE_IDS):
+            resource_path = fs_root / resource_id
+            (resource_path / resource_id / "data" / "contents").mkdir(parents=True)
+            for path in [
+                resource_path,
+                resource_path / resource_id,
+                resource_path / resource_id / "data" / "contents",
+            ]:
+                os.utime(path, (mtime, mtime))
+        # not a resource
+        (fs_root / "logs").mkdir()
+        yield LocalFSMap(fs_root)
+
+
+def test_warm_up_most_recently_modified_first(local_map):
+    warmed = []
+    scheduler = ResourceWarmUpScheduler(local_map, warmed.append, pause=0)
+    scheduler.start()
+    scheduler.join(timeout=5)
+
+    assert warmed == RESOURCE_IDS[::-1]
+    progress = scheduler.progress()
+    assert progress.done
+    assert progress.total == progress.completed == 3
+    assert set(progress.resources.values()) == {WarmUpStatusEnum.warm}
+
+
+def test_warm_up_skips_listed_and_records_failures(local_map):
+    # resource already listed by the user
+    local_map.data[RESOURCE_IDS[2]] = object()
+    warmed = []
+
+    def warm_up(resource_id):
+        if resource_id == RESOURCE_IDS[1]:
+            raise RuntimeError("HydroShare unavailable")
+        warmed.append(resource_id)
+
+    scheduler = ResourceWarmUpScheduler(local_map, warm_up, pause=0)
+    scheduler.start()
+    scheduler.join(timeout=5)
+
+    assert warmed == [RESOURCE_IDS[0]]
+    assert scheduler.progress().resources == {
+        RESOURCE_IDS[2]: WarmUpStatusEnum.warm,
+        RESOURCE_IDS[1]: WarmUpStatusEnum.failed,
+        RESOURCE_IDS[0]: WarmUpStatusEnum.warm,
+    }
+
+
+def test_warm_up_shutdown(local_map):
+    scheduler = ResourceWarmUpScheduler(local_map, lambda _: None, pause=5)
+    scheduler.start()
+    scheduler.shutdown()
+    scheduler.join(timeout=5)
+
+    progress = scheduler.progress()
+    assert progress.done
+    assert progress.completed < 3
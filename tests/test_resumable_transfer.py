@@ -0,0 +1,255 @@
+import hashlib
+import pytest
+import re
+import threading
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+from tempfile import TemporaryDirectory
+from zipfile import ZipFile
+
+from hydroshare_on_jupyter.lib.filesystem.ignore import IgnoreMatcher
+from hydroshare_on_jupyter.lib.transfer.chunked_upload import ChunkedUploader
+from hydroshare_on_jupyter.lib.transfer.exceptions import (
+    ChecksumMismatchError,
+    TransferError,
+)
+from hydroshare_on_jupyter.lib.transfer.resumable_download import ResumableDownloader
+
+PAYLOAD = bytes(range(256)) * 4096  # 1 MiB
+RANGE_RE = re.compile(r"^bytes=(\d+)-$")
+
+
+class FlakyRangeServer(ThreadingHTTPServer):
+    """HTTP stand-in that supports Range requests. The nth response drops the connection after
+    sending `drops[n]` bytes. Responses past the length of `drops` are sent in full."""
+
+    def __init__(self, payload: bytes, *, drops: List[int]):
+        super().__init__(("127.0.0.1", 0), FlakyRangeHandler)
+        self.payload = payload
+        self.drops = list(drops)
+        self.bytes_sent = 0
+        self.ranges = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/file"
+
+
+class FlakyRangeHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        # silence request logging
+        ...
+
+    def do_GET(self):
+        server = self.server  # type: FlakyRangeServer
+        match = RANGE_RE.match(self.headers.get("Range", ""))
+        start = int(match.group(1)) if match else 0
+        server.ranges.append(start)
+        body = server.payload[start:]
+
+        self.send_response(206 if match else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        if match:
+            total = len(server.payload)
+            self.send_header("Content-Range", f"bytes {start}-{total - 1}/{total}")
+        self.end_headers()
+
+        if server.drops:
+            body = body[: server.drops.pop(0)]
+            self.close_connection = True
+
+        self.wfile.write(body)
+        server.bytes_sent += len(body)
+
+
+@pytest.fixture
+def flaky_server():
+    servers = []
+
+    def factory(**kwargs) -> FlakyRangeServer:
+        server = FlakyRangeServer(PAYLOAD, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield factory
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def temp_dir():
+    with TemporaryDirectory() as temp:
+        yield Path(temp).resolve()
+
+
+def test_download_resumes_after_disconnect(flaky_server, temp_dir):
+    # drop connection on a chunk boundary
+    server = flaky_server(drops=[64 * 1024] * 3)
+    downloader = ResumableDownloader(
+        requests.Session(), temp_dir / "staging", chunk_size=8192, backoff=0
+    )
+
+    downloaded = downloader.download(server.url, temp_dir / "file")
+
+    assert downloaded.path.read_bytes() == PAYLOAD
+    # md5 is computed across resumed attempts
+    assert downloaded.md5 == hashlib.md5(PAYLOAD).hexdigest()
+    # each retry continued where the last one stopped
+    assert server.ranges == [0, 64 * 1024, 128 * 1024, 192 * 1024]
+    assert server.bytes_sent == len(PAYLOAD)
+    # staging area is cleaned up
+    assert list((temp_dir / "staging").iterdir()) == []
+
+
+def test_download_resumes_across_downloader_instances(flaky_server, temp_dir):
+    server = flaky_server(drops=[64 * 1024, 0])
+    staging = temp_dir / "staging"
+
+    downloader = ResumableDownloader(
+        requests.Session(), staging, chunk_size=8192, max_retries=0, backoff=0
+    )
+    with pytest.raises(TransferError):
+        # first attempt progressed, second did not and retries are exhausted
+        downloader.download(server.url, temp_dir / "file")
+
+    # simulate server restart
+    downloader = ResumableDownloader(requests.Session(), staging, backoff=0)
+    downloaded = downloader.download(server.url, temp_dir / "file")
+
+    assert downloaded.path.read_bytes() == PAYLOAD
+    assert downloaded.md5 == hashlib.md5(PAYLOAD).hexdigest()
+    assert server.ranges == [0, 64 * 1024, 64 * 1024]
+
+
+def test_download_checksum_mismatch(flaky_server, temp_dir):
+    server = flaky_server(drops=[])
+    staging = temp_dir / "staging"
+    downloader = ResumableDownloader(requests.Session(), staging, backoff=0)
+
+    with pytest.raises(ChecksumMismatchError):
+        downloader.download(server.url, temp_dir / "file", expected_md5="0" * 32)
+
+    # corrupt download is not kept, nor resumed
+    assert not (temp_dir / "file").exists()
+    assert list(staging.iterdir()) == []
+
+
+class FakeSession:
+    """Records unzip requests. Raises, like hsclient, on the `fail_on` requests."""
+
+    def __init__(self, fail_on=()):
+        self.fail_on = set(fail_on)
+        self.attempts = 0
+        self.posts = []
+
+    def post(self, path, status_code, data=None):
+        self.attempts += 1
+        if self.attempts in self.fail_on:
+            # hsclient's error for an unexpected status code
+            raise Exception("Failed Request 500 /unzip")
+        self.posts.append(path)
+
+
+class FakeResource:
+    """Records uploaded archive member names. Raises on the `fail_on` upload attempts."""
+
+    resource_id = "a" * 32
+    _hsapi_path = f"/hsapi/resource/{'a' * 32}"
+
+    def __init__(self, fail_on=()):
+        self._hs_session = FakeSession()
+        self.fail_on = set(fail_on)
+        self.attempts = 0
+        self.uploaded = []
+
+    def file_upload(self, zip_file):
+        self.attempts += 1
+        if self.attempts in self.fail_on:
+            raise requests.exceptions.ConnectionError("connection dropped")
+
+        with ZipFile(zip_file) as zr:
+            self.uploaded.append(sorted(zr.namelist()))
+
+
+@pytest.fixture
+def contents(temp_dir):
+    contents = temp_dir / "contents"
+    (contents / "dir").mkdir(parents=True)
+    for name in ["a", "b", "dir/c", "dir/d"]:
+        (contents / name).write_bytes(b"x" * 100)
+    return contents
+
+
+def test_chunked_upload_retries_only_failed_chunk(temp_dir, contents):
+    resource = FakeResource(fail_on={2})
+    uploader = ChunkedUploader(resource, temp_dir / "state", chunk_size=200, backoff=0)
+
+    checksums = uploader.upload(
+        [contents / "a", contents / "b", contents / "dir"], contents
+    )
+
+    assert resource.uploaded == [["a", "b"], ["dir/c", "dir/d"]]
+    # files are hashed while packed
+    digest = hashlib.md5(b"x" * 100).hexdigest()
+    assert checksums == {name: digest for name in ["a", "b", "dir/c", "dir/d"]}
+    assert resource.attempts == 3
+    assert len(resource._hs_session.posts) == 2
+    assert list((temp_dir / "state").iterdir()) == []
+
+
+def test_chunked_upload_retries_unzip_without_reuploading(temp_dir, contents):
+    resource = FakeResource()
+    resource._hs_session = FakeSession(fail_on={1})
+    uploader = ChunkedUploader(resource, temp_dir / "state", chunk_size=200, backoff=0)
+
+    uploader.upload([contents / "a", contents / "b", contents / "dir"], contents)
+
+    assert resource.attempts == 2
+    assert resource._hs_session.attempts == 3
+    assert len(resource._hs_session.posts) == 2
+
+
+def test_chunked_upload_does_not_retry_programming_errors(temp_dir, contents):
+    resource = FakeResource()
+    resource.file_upload = lambda zip_file: {}["missing"]
+    uploader = ChunkedUploader(resource, temp_dir / "state", backoff=0)
+
+    with pytest.raises(KeyError):
+        uploader.upload([contents / "a"], contents)
+
+
+def test_chunked_upload_resumes_across_uploader_instances(temp_dir, contents):
+    files = [contents / "a", contents / "b", contents / "dir"]
+    resource = FakeResource(fail_on={2, 3})
+    uploader = ChunkedUploader(
+        resource, temp_dir / "state", chunk_size=200, max_retries=1, backoff=0
+    )
+    with pytest.raises(TransferError):
+        uploader.upload(files, contents)
+
+    assert resource.uploaded == [["a", "b"]]
+
+    # simulate server restart
+    uploader = ChunkedUploader(resource, temp_dir / "state", chunk_size=200)
+    checksums = uploader.upload(files, contents)
+
+    assert resource.uploaded == [["a", "b"], ["dir/c", "dir/d"]]
+    # previously uploaded chunk is neither packed nor hashed
+    assert checksums.keys() == {"dir/c", "dir/d"}
+
+
+def test_chunked_upload_skips_ignored_files(temp_dir, contents):
+    (contents / "dir" / "__pycache__").mkdir()
+    (contents / "dir" / "__pycache__" / "e.pyc").write_bytes(b"x")
+    resource = FakeResource()
+    uploader = ChunkedUploader(resource, temp_dir / "state", backoff=0)
+
+    uploader.upload([contents / "dir"], contents, ignore=IgnoreMatcher())
+
+    assert resource.uploaded == [["dir/c", "dir/d"]]
@@ -0,0 +1,62 @@
+import json
+import subprocess
+import sys
+import pytest
+from tornado.web import Application, RequestHandler
+
+from hydroshare_on_jupyter.routing import LazyRouter
+
+
+class HelloHandler(RequestHandler):
+    def get(self, name):
+        self.write({"hello": name})
+
+
+@pytest.fixture
+def loads():
+    return []
+
+
+@pytest.fixture
+def app(loads):
+    app = Application()
+
+    def load_rules():
+        loads.append(True)
+        if len(loads) == 1:
+            raise ImportError("first load fails")
+        return [(r"/syncApi/hello/(.*)", HelloHandler)]
+
+    app.router = LazyRouter(app, load_rules)
+    app.add_handlers(".*$", [(r"/syncApi(/.*)?", app.router)])
+    return app
+
+
+@pytest.mark.gen_test
+async def test_lazy_router(app, loads, http_client, base_url):
+    response = await http_client.fetch(base_url + "/syncApi/hello/a", raise_error=False)
+    # loading failed, retried on next request
+    assert response.code == 500
+    assert not app.router.loaded
+
+    response = await http_client.fetch(base_url + "/syncApi/hello/a")
+    assert json.loads(response.body) == {"hello": "a"}
+    response = await http_client.fetch(base_url + "/syncApi/hello/b")
+    assert json.loads(response.body) == {"hello": "b"}
+    assert len(loads) == 2
+
+    # not matched by loaded rules
+    response = await http_client.fetch(base_url + "/syncApi/missing", raise_error=False)
+    assert response.code == 404
+
+
+def test_import_does_not_load_handler_dependencies():
+    code = (
+        "import sys, hydroshare_on_jupyter; "
+        "print([m for m in ('hsclient', 'watchdog', 'pydantic', 'notebook', "
+        "'hydroshare_on_jupyter.server') if m in sys.modules])"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert out.strip() == "[]"
@@ -6,7 +6,7 @@ from hydroshare_on_jupyter.hydroshare_resource_cache import (
     HydroShareWithResourceCache,
 )
 from hydroshare_on_jupyter.server import LocalResourceEntityHandler
-from hydroshare_on_jupyter.session import _SessionSyncSingleton
+from hydroshare_on_jupyter.session import SessionRegistry
 import json
 import pytest
 from dataclasses import dataclass
@@ -44,7 +44,8 @@ async def mocked_login_session(http_client, base_url, monkeypatch):
     body = {"username": "test", "password": "test"}
     monkeypatch.setattr(HydroShare, "my_user_info", my_user_info_mock)
     monkeypatch.setattr(HydroShareWithResourceCache, "my_user_info", my_user_info_mock)
-    monkeypatch.setattr(_SessionSyncSingleton, "is_empty", False)
+    # do not create a sync session
+    monkeypatch.setattr(SessionRegistry, "has_sync_session", lambda *_: True)
 
     req = HTTPRequest(
         base_url + "/syncApi/login",
@@ -89,17 +90,12 @@ async def test_login_then_login_with_another_account(
 
 
 @pytest.mark.gen_test
-async def test_valid_logout(mocked_login_session, http_client, base_url):
+async def test_valid_logout(mocked_login_session, logout, http_client, base_url):
     response = await mocked_login_session  # type: HTTPResponse
     response_cookie = get_user_cookie_from_http_response(response)
     wrapper_cookie = {"Cookie": response_cookie, "content-type": "application/json"}
 
-    req = HTTPRequest(
-        base_url + "/syncApi/login",
-        method="DELETE",
-        headers=wrapper_cookie,
-    )
-    response = await http_client.fetch(req)
+    response = await logout({"Cookie": response_cookie})
     # assert successfully logged out
     assert response.code == 200
 
@@ -0,0 +1,109 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from hydroshare_on_jupyter.fs_events import Events
+from hydroshare_on_jupyter.session import SessionLimitError, SessionRegistry
+from hydroshare_on_jupyter.session_struct import SessionStruct
+from hydroshare_on_jupyter.testing.stubs import StubHydroShare
+
+RESOURCE_IDS = ["a" * 32, "b" * 32]
+N_USERS = 32
+
+
+@pytest.fixture
+def fs_root():
+    with TemporaryDirectory() as temp:
+        fs_root = Path(temp).resolve()
+        for resource_id in RESOURCE_IDS:
+            contents = fs_root / resource_id / resource_id / "data" / "contents"
+            contents.mkdir(parents=True)
+            (contents / "file").write_text(resource_id)
+        yield fs_root
+
+
+@pytest.fixture
+def registry():
+    registry = SessionRegistry()
+    yield registry
+    registry.shutdown()
+
+
+def login(registry: SessionRegistry, fs_root: Path, user_id: int, tab: int = 0):
+    cookie = f"{user_id}-{tab}".encode()
+    registry.add(
+        SessionStruct(
+            session=StubHydroShare(), cookie=cookie, id=user_id, username=str(user_id)
+        )
+    )
+    registry.new_sync_session(cookie, fs_root, StubHydroShare(), remote_poll=False)
+    return cookie
+
+
+def test_sync_session_is_shared_by_a_users_sessions(registry, fs_root):
+    first = login(registry, fs_root, user_id=1, tab=0)
+    second = login(registry, fs_root, user_id=1, tab=1)
+    other = login(registry, fs_root, user_id=2)
+
+    assert registry.get_sync_session(first) is registry.get_sync_session(second)
+    assert registry.get_sync_session(first) is not registry.get_sync_session(other)
+    assert registry.n_users == 2
+
+    sync_session = registry.get_sync_session(first)
+    registry.remove(first)
+    # user still has a session
+    assert registry.get_sync_session(second) is sync_session
+    registry.remove(second)
+    assert registry.get_sync_session(second) is None
+    assert registry.get(second).cookie is None
+    assert registry.n_users == 1
+
+
+def test_session_limit(registry, fs_root):
+    registry.add(SessionStruct(cookie=b"1", id=1), max_sessions=1)
+    with pytest.raises(SessionLimitError):
+        registry.add(SessionStruct(cookie=b"2", id=2), max_sessions=1)
+
+
+def test_user_session_limit(registry, fs_root):
+    registry.add(SessionStruct(cookie=b"1", id=1), max_user_sessions=1)
+    with pytest.raises(SessionLimitError):
+        registry.add(SessionStruct(cookie=b"2", id=1), max_user_sessions=1)
+    # other users are not limited
+    registry.add(SessionStruct(cookie=b"3", id=2), max_user_sessions=1)
+    assert registry.n_users == 2
+
+    # sessions are freed on logout
+    registry.remove(b"1")
+    registry.add(SessionStruct(cookie=b"2", id=1), max_user_sessions=1)
+
+
+def test_concurrent_users(registry, fs_root):
+    def simulate_user(user_id: int):
+        cookie = login(registry, fs_root, user_id)
+        sync_session = registry.get_sync_session(cookie)
+        for resource_id in RESOURCE_IDS:
+            sync_session.event_broker.dispatch(
+                Events.RESOURCE_FILES_LISTED, resource_id
+            )
+        return cookie, sorted(sync_session.aggregate_fs_map.local_map.resources)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(simulate_user, range(N_USERS)))
+
+    assert len(registry) == N_USERS
+    for _, resources in results:
+        assert resources == sorted(RESOURCE_IDS)
+    # watches of the same resource directories are merged on the shared observer
+    assert registry.observer.n_watches == len(RESOURCE_IDS)
+
+    # removing some users does not unschedule the watches other users rely on
+    for cookie, _ in results[: N_USERS // 2]:
+        registry.remove(cookie)
+    assert registry.observer.n_watches == len(RESOURCE_IDS)
+
+    for cookie, _ in results[N_USERS // 2 :]:
+        registry.remove(cookie)
+    assert len(registry) == 0
+    assert registry.observer.n_watches == 0
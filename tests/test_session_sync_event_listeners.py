@@ -0,0 +1,219 @@
+import pytest
+import threading
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from hydroshare_on_jupyter.fs_events import Events
+from hydroshare_on_jupyter.hydroshare_resource_cache import (
+    HydroShareWithResourceCache,
+)
+from hydroshare_on_jupyter.lib.events.event_broker import EventBroker
+from hydroshare_on_jupyter.lib.filesystem import fs_resource_map
+from hydroshare_on_jupyter.lib.filesystem.aggregate_fs_map import AggregateFSMap
+from hydroshare_on_jupyter.lib.filesystem.fs_map import LocalFSMap, RemoteFSMap
+from hydroshare_on_jupyter.lib.filesystem.fs_resource_map import RemoteFSResourceMap
+from hydroshare_on_jupyter.session_sync_event_listeners import (
+    SessionSyncEventListeners,
+)
+from hydroshare_on_jupyter.testing.stubs import StubResource
+
+RESOURCE_ID = "a" * 32
+
+
+class UntouchableRemoteFSMap(RemoteFSMap):
+    def update_resource(self, resource_id):
+        raise AssertionError("remote map should not be updated")
+
+
+@pytest.fixture
+def contents_path():
+    with TemporaryDirectory() as temp:
+        fs_root = Path(temp).resolve()
+        contents = fs_root / RESOURCE_ID / RESOURCE_ID / "data" / "contents"
+        contents.mkdir(parents=True)
+        for i in range(10):
+            (contents / f"file_{i}").write_text(str(i))
+        yield contents
+
+
+@pytest.fixture
+def listeners(contents_path):
+    fs_root = contents_path.parents[3]
+    local_map = LocalFSMap(fs_root)
+    local_map.add_resource(RESOURCE_ID)
+    agg_map = AggregateFSMap(
+        local_map=local_map, remote_map=UntouchableRemoteFSMap(fs_root, None)
+    )
+    listeners = SessionSyncEventListeners(
+        aggregate_fs_map=agg_map, event_broker=EventBroker(Events), fs_observers={}
+    )
+    listeners.setup_event_listeners()
+    return listeners
+
+
+def test_entity_download_hashes_only_written_files(
+    listeners, contents_path, monkeypatch
+):
+    hashed = []
+    compute_md5 = fs_resource_map.compute_file_md5_hexdigest
+
+    def spy(path):
+        hashed.append(path)
+        return compute_md5(path)
+
+    monkeypatch.setattr(fs_resource_map, "compute_file_md5_hexdigest", spy)
+
+    # one new and one modified file
+    (contents_path / "new").write_text("new")
+    (contents_path / "file_0").write_text("modified")
+    paths = {contents_path / "new": None, contents_path / "file_0": None}
+
+    statuses = []
+    listeners.event_broker.subscribe(Events.RESOURCE_STATUS, statuses.append)
+    listeners.event_broker.dispatch(
+        Events.RESOURCE_ENTITY_DOWNLOADED, RESOURCE_ID, paths=paths
+    )
+
+    assert hashed == list(paths)
+    resource_map = listeners.aggregate_fs_map.local_map[RESOURCE_ID]
+    assert len(resource_map) == 11
+    assert Path("data/contents/new") in resource_map
+    assert statuses == [RESOURCE_ID]
+
+
+def test_entity_download_uses_checksums_computed_while_downloading(
+    listeners, contents_path, monkeypatch
+):
+    hashed = []
+    monkeypatch.setattr(fs_resource_map, "compute_file_md5_hexdigest", hashed.append)
+
+    (contents_path / "new").write_text("new")
+    digest = "f" * 32
+    listeners.event_broker.dispatch(
+        Events.RESOURCE_ENTITY_DOWNLOADED,
+        RESOURCE_ID,
+        paths={contents_path / "new": digest},
+    )
+
+    # no file was read
+    assert hashed == []
+    resource_map = listeners.aggregate_fs_map.local_map[RESOURCE_ID]
+    assert resource_map[Path("data/contents/new")] == digest
+
+    # file system events for the downloaded file do not re-read it
+    listeners.aggregate_fs_map.local_map.update_resource_file(
+        RESOURCE_ID, contents_path / "new"
+    )
+    assert hashed == []
+
+
+def test_entity_download_waits_for_resource_lock(listeners, contents_path):
+    (contents_path / "new").write_text("new")
+    download = threading.Thread(
+        target=listeners.event_broker.dispatch,
+        args=(Events.RESOURCE_ENTITY_DOWNLOADED, RESOURCE_ID),
+        kwargs={"paths": {contents_path / "new": None}},
+    )
+    resource_map = listeners.aggregate_fs_map.local_map[RESOURCE_ID]
+
+    # i.e. held by a file system event listener
+    with listeners._resource_lock(RESOURCE_ID):
+        download.start()
+        download.join(0.1)
+        assert download.is_alive()
+        assert Path("data/contents/new") not in resource_map
+
+    download.join()
+    assert Path("data/contents/new") in resource_map
+
+
+def test_downloads_keep_cached_manifest(listeners, contents_path, monkeypatch):
+    monkeypatch.setattr(
+        HydroShareWithResourceCache,
+        "my_user_info",
+        lambda *_: {"id": 42, "username": "test"},
+    )
+    hs = HydroShareWithResourceCache(username="test", password="test")
+    listeners.aggregate_fs_map.remote_map._hydroshare = hs
+    resource = hs.resource(RESOURCE_ID, validate=False)
+    resource._parsed_checksums = {"data/contents/file_0": "0" * 32}
+
+    # a download does not change the resource on HydroShare, its manifest is not re-fetched
+    listeners.event_broker.dispatch(
+        Events.RESOURCE_ENTITY_DOWNLOADED,
+        RESOURCE_ID,
+        paths={contents_path / "file_0": "0" * 32},
+    )
+    assert resource._parsed_checksums == {"data/contents/file_0": "0" * 32}
+    assert hs.resource(RESOURCE_ID, validate=False) is resource
+
+
+def test_resource_download_seeds_local_map_from_manifest(
+    listeners, contents_path, monkeypatch
+):
+    hashed = []
+    monkeypatch.setattr(fs_resource_map, "compute_file_md5_hexdigest", hashed.append)
+    # resource is already in remote map
+    listeners.aggregate_fs_map.remote_map.data[RESOURCE_ID] = {}
+    listeners.fs_observers[RESOURCE_ID] = None
+
+    manifest = contents_path.parents[1] / "manifest-md5.txt"
+    manifest.write_text(
+        "".join(f"{i:032d}  data/contents/file_{i}\n" for i in range(10))
+    )
+    listeners.event_broker.dispatch(
+        Events.RESOURCE_DOWNLOADED, RESOURCE_ID, manifest=manifest
+    )
+
+    # no file was read
+    assert hashed == []
+    resource_map = listeners.aggregate_fs_map.local_map[RESOURCE_ID]
+    assert resource_map[Path("data/contents/file_3")] == f"{3:032d}"
+
+
+def test_upload_optimistically_updates_remote_map(listeners, contents_path):
+    manifest = {"data/contents/file_0": "0" * 32}
+    resource = StubResource(RESOURCE_ID, manifest)
+    remote_map = RemoteFSMap(contents_path.parents[3], None)
+    remote_map.data[RESOURCE_ID] = RemoteFSResourceMap.from_resource(resource)
+    listeners.aggregate_fs_map.remote_map = remote_map
+
+    statuses = []
+    listeners.event_broker.subscribe(Events.RESOURCE_STATUS, statuses.append)
+
+    # HydroShare has not yet updated its manifest
+    uploaded = {"data/contents/file_0": "1" * 32, "data/contents/dir/new": "2" * 32}
+    # hold resource lock, background verification waits
+    with listeners._resource_lock(RESOURCE_ID):
+        listeners.event_broker.dispatch(
+            Events.RESOURCE_ENTITY_UPLOADED, RESOURCE_ID, checksums=uploaded
+        )
+        resource_map = remote_map[RESOURCE_ID]
+        assert resource_map[Path("data/contents/file_0")] == "1" * 32
+        assert resource_map[Path("data/contents/dir/new")] == "2" * 32
+
+    # background verification replaces optimistic checksums with the manifest's
+    for thread in threading.enumerate():
+        if thread.name == f"verify-upload-{RESOURCE_ID}":
+            thread.join()
+    assert dict(remote_map[RESOURCE_ID]) == {Path("data/contents/file_0"): "0" * 32}
+    assert statuses == [RESOURCE_ID]
+
+
+def test_idle_resource_is_evicted_and_unwatched(listeners):
+    class FakeObserver:
+        unscheduled = []
+
+        def unschedule(self, watch):
+            self.unscheduled.append(watch)
+
+    listeners.observer = FakeObserver()
+    listeners.fs_observers[RESOURCE_ID] = "watch"
+    listeners.aggregate_fs_map.remote_map[RESOURCE_ID] = "remote"
+
+    listeners.event_broker.dispatch(Events.RESOURCE_IDLE, RESOURCE_ID)
+
+    assert FakeObserver.unscheduled == ["watch"]
+    assert listeners.fs_observers == {}
+    assert RESOURCE_ID not in listeners.aggregate_fs_map.local_map
+    assert RESOURCE_ID not in listeners.aggregate_fs_map.remote_map
@@ -0,0 +1,231 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+from tornado.httpclient import HTTPRequest
+import pytest
+
+from hydroshare_on_jupyter.lib.filesystem.aggregate_fs_map import AggregateFSMap
+from hydroshare_on_jupyter.lib.filesystem.exceptions import (
+    AggregateFSMapResourceMembershipError,
+)
+from hydroshare_on_jupyter.lib.filesystem.fs_map import LocalFSMap, RemoteFSMap
+from hydroshare_on_jupyter.lib.filesystem.fs_resource_map import (
+    LocalFSResourceMap,
+    RemoteFSResourceMap,
+)
+from hydroshare_on_jupyter.lib.filesystem.sync_state_tree import (
+    FolderSyncCounts,
+    ResourceSyncStateTree,
+    SyncCounts,
+)
+from hydroshare_on_jupyter.lib.filesystem.utilities import compute_file_md5_hexdigest
+
+RESOURCE_ID = "resource"
+
+
+def contents(path: str) -> Path:
+    return Path("data/contents") / path
+
+
+@pytest.fixture
+def resource_path():
+    with TemporaryDirectory() as temp:
+        resource_path = Path(temp).resolve() / RESOURCE_ID
+        contents_path = resource_path / RESOURCE_ID / "data" / "contents"
+        (contents_path / "a" / "b").mkdir(parents=True)
+        (contents_path / "root.txt").write_text("root")
+        (contents_path / "a" / "a.txt").write_text("aa")
+        (contents_path / "a" / "b" / "b.txt").write_text("bbb")
+        yield resource_path
+
+
+@pytest.fixture
+def local_map(resource_path):
+    return LocalFSResourceMap.from_resource_path(resource_path)
+
+
+@pytest.fixture
+def remote_map(local_map):
+    remote_map = RemoteFSResourceMap(SimpleNamespace(resource_id=RESOURCE_ID))
+    remote_map.data = dict(local_map.data)
+    return remote_map
+
+
+def file_path(resource_path: Path, path: str) -> Path:
+    return resource_path / RESOURCE_ID / contents(path)
+
+
+def test_observers(local_map):
+    changes = []
+    observer = lambda *change: changes.append(change)
+    local_map.subscribe(observer)
+
+    path = contents("x")
+    local_map[path] = "1"
+    local_map[path] = "1"
+    local_map[path] = "2"
+    del local_map[path]
+    local_map.data = {**local_map.data, path: "3"}
+    local_map.unsubscribe(observer)
+    local_map[path] = "4"
+
+    assert changes == [
+        (path, None, "1"),
+        (path, "1", "2"),
+        (path, "2", None),
+        (path, None, "3"),
+    ]
+
+
+def test_initial_counts(local_map, remote_map):
+    tree = ResourceSyncStateTree(local_map, remote_map)
+
+    root = tree.folder()
+    assert root.folder == ""
+    assert (root.in_sync, root.out_of_sync, root.only_local, root.only_remote) == (
+        3,
+        0,
+        0,
+        0,
+    )
+    assert root.bytes == len("root") + len("aa") + len("bbb")
+    assert root.synced
+    assert root.folders == {"a": SyncCounts(in_sync=2, bytes=5)}
+
+    a = tree.folder("a/")
+    assert a.folder == "a"
+    assert a.folders == {"b": SyncCounts(in_sync=1, bytes=3)}
+    assert tree.folder("a/b").folders == {}
+    assert tree.folder("missing") is None
+
+
+def test_incremental_updates(resource_path, local_map, remote_map):
+    tree = ResourceSyncStateTree(local_map, remote_map)
+
+    # modified locally
+    b = file_path(resource_path, "a/b/b.txt")
+    b.write_text("bbbb")
+    local_map.update_file(b)
+    assert tree.folder("a/b") == FolderSyncCounts(out_of_sync=1, bytes=4, folder="a/b")
+    assert tree.folder("a").folders["b"] == SyncCounts(out_of_sync=1, bytes=4)
+    assert tree.folder().bytes == 10
+
+    # only local
+    c = file_path(resource_path, "a/c/c.txt")
+    c.parent.mkdir()
+    c.write_text("c")
+    local_map.add_file(c)
+    assert tree.folder("a").folders["c"] == SyncCounts(only_local=1, bytes=1)
+
+    # uploaded
+    remote_map.data = {
+        **remote_map.data,
+        contents("a/b/b.txt"): compute_file_md5_hexdigest(b),
+        contents("a/c/c.txt"): compute_file_md5_hexdigest(c),
+    }
+    root = tree.folder()
+    assert root.in_sync == 4 and root.synced
+
+    # deleted locally
+    c.unlink()
+    local_map.delete_file(c)
+    assert tree.folder("a").folders["c"] == SyncCounts(only_remote=1)
+
+    # deleted remotely, empty folders are pruned
+    remote_map.data = {
+        k: v for k, v in remote_map.data.items() if k != contents("a/c/c.txt")
+    }
+    assert tree.folder("a/c") is None
+    assert set(tree.folder("a").folders) == {"b"}
+
+    # closed trees are not updated
+    tree.close()
+    del local_map[contents("root.txt")]
+    assert tree.folder().in_sync == 3
+
+
+def test_remote_update_replaces_data(local_map, remote_map):
+    tree = ResourceSyncStateTree(local_map, remote_map)
+    remote_map.data = {contents("a/a.txt"): "different", contents("remote.txt"): "r"}
+
+    root = tree.folder()
+    assert root.in_sync == 0
+    assert root.out_of_sync == 1
+    assert root.only_local == 2
+    assert root.only_remote == 1
+    assert root.folders == {"a": SyncCounts(out_of_sync=1, only_local=1, bytes=5)}
+
+
+def test_aggregate_map_folder_sync_state(resource_path, local_map, remote_map):
+    aggregate_map = AggregateFSMap(
+        local_map=LocalFSMap(resource_path.parent),
+        remote_map=RemoteFSMap(resource_path.parent, hydroshare=None),
+    )
+
+    with pytest.raises(AggregateFSMapResourceMembershipError):
+        aggregate_map.get_folder_sync_state(RESOURCE_ID)
+
+    aggregate_map.local_map.data[RESOURCE_ID] = local_map
+    aggregate_map.remote_map.data[RESOURCE_ID] = remote_map
+    assert aggregate_map.get_folder_sync_state(RESOURCE_ID).in_sync == 3
+    tree = aggregate_map._sync_trees[RESOURCE_ID]
+    assert aggregate_map.get_folder_sync_state(RESOURCE_ID, "a").in_sync == 2
+    assert aggregate_map._sync_trees[RESOURCE_ID] is tree
+
+    # replaced resource maps are re-observed
+    replacement = RemoteFSResourceMap(SimpleNamespace(resource_id=RESOURCE_ID))
+    aggregate_map.remote_map.data[RESOURCE_ID] = replacement
+    assert aggregate_map.get_folder_sync_state(RESOURCE_ID).only_local == 3
+    assert remote_map._observers == ()
+
+    aggregate_map.delete_resource(RESOURCE_ID)
+    assert aggregate_map._sync_trees == {}
+    assert replacement._observers == local_map._observers == ()
+
+
+@pytest.fixture
+def resources(server, data_path):
+    resource = server.add_resource({"a.csv": b"a", "folder/b.csv": b"b"})
+    contents_path = (
+        data_path / resource.resource_id / resource.resource_id / "data" / "contents"
+    )
+    (contents_path / "folder").mkdir(parents=True)
+    (contents_path / "a.csv").write_bytes(b"a")
+    (contents_path / "folder" / "b.csv").write_bytes(b"modified")
+    return [resource]
+
+
+@pytest.mark.gen_test
+async def test_sync_state_handler(server, login, logout, http_client, base_url):
+    cookie = await login()
+    (resource_id,) = server.resources
+    url = base_url + f"/syncApi/resources/{resource_id}"
+
+    # resources are synced once their files are listed
+    response = await http_client.fetch(
+        HTTPRequest(url + "/sync_state", headers=cookie), raise_error=False
+    )
+    assert response.code == 404
+    await http_client.fetch(HTTPRequest(url, headers=cookie))
+
+    response = await http_client.fetch(HTTPRequest(url + "/sync_state", headers=cookie))
+    state = json.loads(response.body)
+    assert state["folder"] == ""
+    assert (state["in_sync"], state["out_of_sync"]) == (1, 1)
+    assert state["folders"]["folder"]["out_of_sync"] == 1
+
+    response = await http_client.fetch(
+        HTTPRequest(url + "/sync_state?folder=/data/contents/folder/", headers=cookie)
+    )
+    state = json.loads(response.body)
+    assert state["folder"] == "folder"
+    assert state["out_of_sync"] == 1 and state["bytes"] == len(b"modified")
+
+    for query, code in (("folder=missing", 404), ("folder=../x", 400)):
+        response = await http_client.fetch(
+            HTTPRequest(url + f"/sync_state?{query}", headers=cookie), raise_error=False
+        )
+        assert response.code == code
+
+    await logout(cookie)
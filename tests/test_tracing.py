@@ -0,0 +1,170 @@
+import asyncio
+import json
+import threading
+from contextvars import copy_context
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import pytest
+
+from hydroshare_on_jupyter.__main__ import get_test_app
+from hydroshare_on_jupyter.fs_events import Events
+from hydroshare_on_jupyter.lib.events.event_broker import EventBroker
+from hydroshare_on_jupyter.lib.filesystem.fs_resource_map import LocalFSResourceMap
+from hydroshare_on_jupyter.lib.tracing import (
+    ChromeTraceExporter,
+    SpanExporter,
+    current_span,
+    span,
+    traced,
+    tracer,
+)
+
+
+class ListExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def by_name(self, name):
+        return [s for s in self.spans if s.name == name]
+
+
+@pytest.fixture
+def exporter():
+    exporter = ListExporter()
+    tracer.configure(exporter)
+    yield exporter
+    tracer.shutdown()
+
+
+def test_disabled():
+    assert not tracer.enabled
+    with span("a") as s:
+        assert s is None
+        assert current_span() is None
+
+
+def test_nested_spans(exporter):
+    with span("parent", key="value") as parent:
+        with span("child") as child:
+            assert current_span() is child
+        assert current_span() is parent
+    assert current_span() is None
+
+    # exported as they finish
+    assert [s.name for s in exporter.spans] == ["child", "parent"]
+    assert child.parent_id == parent.span_id
+    assert child.trace_id == parent.trace_id == parent.span_id
+    assert parent.parent_id is None
+    assert parent.attributes == {"key": "value"}
+    assert parent.start_ns <= child.start_ns <= child.end_ns <= parent.end_ns
+
+
+def test_span_records_error(exporter):
+    with pytest.raises(ValueError):
+        with span("failing"):
+            raise ValueError
+    assert exporter.spans[0].attributes["error"] == "ValueError"
+
+
+def test_traced_decorator(exporter):
+    @traced()
+    def fn(x):
+        return x + 1
+
+    assert fn(1) == 2
+    assert exporter.spans[0].name.endswith("fn")
+
+
+def test_context_propagates_to_tasks_and_threads(exporter):
+    async def child():
+        with span("task"):
+            await asyncio.sleep(0)
+
+    async def main():
+        with span("root"):
+            await asyncio.gather(child(), child())
+
+    asyncio.run(main())
+    (root,) = exporter.by_name("root")
+    assert [s.parent_id for s in exporter.by_name("task")] == [root.span_id] * 2
+
+    def in_thread():
+        with span("thread"):
+            pass
+
+    with span("root") as root:
+        thread = threading.Thread(target=copy_context().run, args=(in_thread,))
+        thread.start()
+        thread.join()
+    (thread_span,) = exporter.by_name("thread")
+    assert thread_span.parent_id == root.span_id
+    assert thread_span.thread_id != root.thread_id
+
+
+def test_chrome_trace_exporter():
+    with TemporaryDirectory() as temp:
+        path = Path(temp) / "logs" / "trace.json"
+        tracer.configure(ChromeTraceExporter(path))
+        try:
+            with span("outer.a", resource_id="abc"):
+                with span("inner.b"):
+                    pass
+        finally:
+            tracer.shutdown()
+
+        events = json.loads(path.read_text())
+
+    (metadata,) = [e for e in events if e["ph"] == "M"]
+    assert metadata["args"]["name"] == threading.current_thread().name
+    inner, outer = [e for e in events if e["ph"] == "X"]
+    assert (outer["name"], outer["cat"]) == ("outer.a", "outer")
+    assert outer["args"]["resource_id"] == "abc"
+    assert inner["args"]["parent_id"] == outer["args"]["span_id"]
+    assert outer["ts"] <= inner["ts"]
+    assert inner["dur"] <= outer["dur"]
+
+
+def test_event_broker_dispatch_spans(exporter):
+    broker = EventBroker(Events)
+    calls = []
+    broker.subscribe(Events.STATUS, calls.append)
+    broker.dispatch(Events.STATUS, "resource")
+
+    assert calls == ["resource"]
+    (dispatch,) = exporter.by_name("EventBroker.dispatch")
+    assert dispatch.attributes == {"event": "STATUS", "resource_id": "resource"}
+    (listener,) = [s for s in exporter.spans if s.parent_id == dispatch.span_id]
+    assert listener.name == "list.append"
+
+
+def test_local_resource_map_hash_spans(exporter):
+    with TemporaryDirectory() as temp:
+        resource_path = Path(temp).resolve() / "resource"
+        contents = resource_path / "resource" / "data" / "contents"
+        contents.mkdir(parents=True)
+        (contents / "a.txt").write_text("a")
+        LocalFSResourceMap.from_resource_path(resource_path)
+
+    (update,) = exporter.by_name("LocalFSResourceMap.update_resource")
+    (hashed,) = exporter.by_name("LocalFSResourceMap.hash")
+    assert hashed.parent_id == update.span_id
+    assert hashed.attributes["path"] == Path("data/contents/a.txt")
+    assert hashed.attributes["size"] == 1
+
+
+@pytest.fixture
+def app():
+    with TemporaryDirectory() as temp:
+        yield get_test_app(data_path=Path(temp))
+
+
+@pytest.mark.gen_test
+async def test_request_span(exporter, http_client, base_url):
+    await http_client.fetch(
+        base_url + "/syncApi/data_directory", raise_error=False, follow_redirects=False
+    )
+    (request,) = exporter.by_name("DataDirectoryHandler.get")
+    assert request.attributes == {"path": "/syncApi/data_directory"}